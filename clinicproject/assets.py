@@ -0,0 +1,282 @@
+"""
+Fingerprinted, precompressed static files and an in-process asset server.
+
+CompressedManifestStaticFilesStorage is Django's manifest storage (file
+names carry a content hash, e.g. css/site.3f2a9c1b7d4e.css) that also
+writes .gz and, when the optional brotli package is installed, .br copies
+of compressible files during collectstatic, so nothing is compressed per
+request.
+
+AssetMiddleware answers requests under STATIC_URL and MEDIA_URL from
+STATIC_ROOT and MEDIA_ROOT before the rest of the stack runs, which lets a
+small deployment serve everything from the application server:
+
+- hashed static files and the content-addressed image derivatives
+  (MEDIA_ROOT/derivatives/<hash>/) are cached for a year as immutable;
+  other files get ASSET_MAX_AGE and are revalidated by ETag/Last-Modified;
+- the .br or .gz copy is sent when the client accepts it;
+- single byte ranges get 206 responses (multi-range requests get the whole
+  file, which RFC 9110 allows);
+- files are returned as FileResponse, which WSGI servers that provide
+  wsgi.file_wrapper (gunicorn) send with sendfile() instead of reading
+  them through Python.
+
+Only the public parts of MEDIA_ROOT (PUBLIC_MEDIA_PREFIXES: the site images
+and their derivatives) are served; everything else under MEDIA_URL, such
+as the patient photos and clinical attachments uploaded through the admin,
+gets a 404 here and must never be exposed without access control.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, HttpResponseNotFound
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml', '.html',
+    '.ico', '.ttf', '.otf', '.eot', '.webmanifest',
+)
+# Smaller files are not worth a second request path, and a compressed copy
+# is only kept when it saves at least this fraction.
+MIN_COMPRESS_SIZE = 256
+MIN_SAVING = 0.05
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_MAX_AGE = 60 * 5
+
+# Precompressed copies, in order of preference: (Accept-Encoding token, suffix).
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Types missing from older mimetypes tables.
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+_CONTENT_ADDRESSED_MEDIA = re.compile(r'derivatives/[0-9a-f]{16}/')
+
+DEFAULT_PUBLIC_MEDIA_PREFIXES = ('images/', 'derivatives/')
+
+
+def compress_file(path):
+    """Write path.gz and path.br (if brotli is installed) next to path; return the suffixes written."""
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    encoders = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders['.br'] = lambda data: brotli.compress(data, quality=11)
+    written = []
+    for suffix, encode in encoders.items():
+        compressed = encode(data)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that precompresses the files it hashes."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed):
+            if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                compress_file(self.path(name))
+
+
+class RangeFile:
+    """A read-only view of length bytes of an open file from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets sendfile() start at the current offset; the server stops at Content-Length.
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """Return (start, end) inclusive for a single satisfiable byte range, None to ignore, or False."""
+    match = _RANGE.match(header.replace(' ', ''))
+    if not match or not (match[1] or match[2]):
+        return None
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+        if start > end or start >= size:
+            return False
+    else:
+        suffix = int(match[2])
+        if not suffix:
+            return False
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+class AssetMiddleware:
+    """Serve STATIC_URL and MEDIA_URL while SERVE_ASSETS is on; put it near the top of MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_ASSETS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_age = getattr(settings, 'ASSET_MAX_AGE', DEFAULT_MAX_AGE)
+        public_media = tuple(getattr(settings, 'PUBLIC_MEDIA_PREFIXES', DEFAULT_PUBLIC_MEDIA_PREFIXES))
+        # (URL prefix, root, hashed names, names allowed or None for all)
+        self.roots = [
+            (prefix, str(root), immutable, allowed)
+            for prefix, root, immutable, allowed in (
+                (settings.STATIC_URL, settings.STATIC_ROOT, self._hashed_static_names(), None),
+                (settings.MEDIA_URL, settings.MEDIA_ROOT, None, public_media),
+            )
+            if prefix and prefix.startswith('/') and root
+        ]
+
+    def _hashed_static_names(self):
+        """Return the hashed names in the staticfiles manifest (empty without a manifest storage)."""
+        return set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        for prefix, root, hashed, allowed in self.roots:
+            if request.path.startswith(prefix):
+                name = request.path[len(prefix):]
+                if allowed is not None and not name.startswith(allowed):
+                    # Uploads (patient photos, record attachments) are never public.
+                    return HttpResponseNotFound()
+                return self.serve(request, root, name, hashed)
+        return self.get_response(request)
+
+    def is_immutable(self, name, hashed):
+        if hashed is None:
+            return bool(_CONTENT_ADDRESSED_MEDIA.match(name))
+        return name in hashed
+
+    def serve(self, request, root, name, hashed):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        if not name or any(part.startswith('.') for part in name.split('/')):
+            return HttpResponseNotFound()
+        try:
+            path = safe_join(root, name)
+            stat_result = os.stat(path)
+        except (OSError, ValueError):
+            return HttpResponseNotFound()
+        if not stat.S_ISREG(stat_result.st_mode):
+            return HttpResponseNotFound()
+
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        range_header = request.headers.get('Range')
+        encoding = None
+        # Ranges are served from the identity file, so offsets mean the same thing to every client.
+        if not range_header and name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+            for token, suffix in ENCODINGS:
+                if token in accepted:
+                    try:
+                        encoded_stat = os.stat(path + suffix)
+                    except OSError:
+                        continue
+                    encoding, path, stat_result = token, path + suffix, encoded_stat
+                    break
+
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}{"-" + encoding if encoding else ""}"'
+        headers = {
+            'Content-Type': content_type,
+            'ETag': etag,
+            'Last-Modified': http_date(stat_result.st_mtime),
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': (
+                f'public, max-age={IMMUTABLE_MAX_AGE}, immutable' if self.is_immutable(name, hashed)
+                else f'public, max-age={self.max_age}'
+            ),
+        }
+        if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat_result.st_mtime))
+        if not_modified is not None:
+            for header in ('ETag', 'Cache-Control', 'Vary'):
+                if header in headers:
+                    not_modified[header] = headers[header]
+            return not_modified
+
+        size = stat_result.st_size
+        start, end, status = 0, size - 1, 200
+        if range_header and size and request.headers.get('If-Range', etag) == etag:
+            byte_range = parse_range(range_header, size)
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            if byte_range:
+                start, end = byte_range
+                status = 206
+                headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        headers['Content-Length'] = str(end - start + 1)
+
+        if request.method == 'HEAD':
+            response = HttpResponse(status=status)
+        else:
+            file = open(path, 'rb')
+            if status == 206:
+                file.seek(start)
+                file = RangeFile(file, end - start + 1)
+            response = FileResponse(file, status=status, content_type=content_type, filename=os.path.basename(name))
+        for header, value in headers.items():
+            response[header] = value
+        return response
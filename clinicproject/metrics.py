@@ -0,0 +1,242 @@
+"""
+Per-view request metrics: Server-Timing headers and Prometheus histograms.
+
+MetricsMiddleware times every request and, through a ContextVar holding
+the request's RequestStats, collects:
+
+- database queries and their time, via an execute wrapper on each connection;
+- template render time, via the TimedDjangoTemplates backend (outermost
+  render only, so included templates are not counted twice);
+- cache hits and misses reported with record_cache() (the page cache and
+  the services listing).
+
+Queries slower than SLOW_QUERY_SECONDS are also written to the structured
+query log (see clinicproject.queries).
+
+Each response gets a Server-Timing header and the figures are added to
+in-process histograms labelled with the resolved view name, served in the
+Prometheus text format by clinicproject.views.metrics. Every worker process
+keeps its own histograms; counters restart with the process.
+
+The cost per request is a few perf_counter() calls, one function call per
+query and a short locked update of the histograms.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from .queries import log_slow_query
+
+
+# Upper bounds of the histogram buckets.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """What one request spent on queries, templates and the cache."""
+
+    def __init__(self, request=None, slow_query_seconds=None):
+        self.request = request
+        self.slow_query_seconds = slow_query_seconds
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper: time a query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.query_time += elapsed
+            self.queries += 1
+            if self.slow_query_seconds is not None and elapsed >= self.slow_query_seconds:
+                log_slow_query(sql, elapsed, context['connection'].alias, self.request)
+
+
+def record_cache(hit):
+    """Count a cache lookup against the current request, if any."""
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """In-process metrics keyed by view name."""
+
+    HISTOGRAMS = {
+        'clinic_request_duration_seconds': ('Wall time of the request in the Django stack.', SECONDS_BUCKETS),
+        'clinic_db_queries': ('Database queries per request.', QUERY_BUCKETS),
+        'clinic_db_duration_seconds': ('Time spent in database queries per request.', SECONDS_BUCKETS),
+        'clinic_template_duration_seconds': ('Time spent rendering templates per request.', SECONDS_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}
+            self.cache = {}
+            self.histograms = {name: {} for name in self.HISTOGRAMS}
+
+    def observe(self, view, method, status, duration, stats):
+        values = {
+            'clinic_request_duration_seconds': duration,
+            'clinic_db_queries': stats.queries,
+            'clinic_db_duration_seconds': stats.query_time,
+            'clinic_template_duration_seconds': stats.template_time,
+        }
+        with self.lock:
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for result, count in (('hit', stats.cache_hits), ('miss', stats.cache_misses)):
+                if count:
+                    self.cache[view, result] = self.cache.get((view, result), 0) + count
+            for name, value in values.items():
+                histograms = self.histograms[name]
+                if view not in histograms:
+                    histograms[view] = Histogram(self.HISTOGRAMS[name][1])
+                histograms[view].observe(value)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = [
+            '# HELP clinic_requests_total Requests by view, method and status code.',
+            '# TYPE clinic_requests_total counter',
+        ]
+        with self.lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'clinic_requests_total{_labels(view=view, method=method, status=status)} {count}')
+            lines += [
+                '# HELP clinic_cache_requests_total Cache lookups by view and result.',
+                '# TYPE clinic_cache_requests_total counter',
+            ]
+            for (view, result), count in sorted(self.cache.items()):
+                lines.append(f'clinic_cache_requests_total{_labels(view=view, result=result)} {count}')
+            for name, (help_text, buckets) in self.HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for view, histogram in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_labels(view=view, le=bound)} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(view=view)} {histogram.total:g}')
+                    lines.append(f'{name}_count{_labels(view=view)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + '}'
+
+
+registry = Registry()
+
+
+def server_timing(duration, stats):
+    """Return the Server-Timing header value for a request."""
+    parts = [
+        f'app;dur={duration * 1000:.1f}',
+        f'db;dur={stats.query_time * 1000:.1f};desc="{stats.queries} queries"',
+        f'tpl;dur={stats.template_time * 1000:.1f}',
+    ]
+    if stats.cache_hits or stats.cache_misses:
+        parts.append(f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"')
+    return ', '.join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Record request metrics per resolved view; put it near the top of MIDDLEWARE.
+
+    The Server-Timing header is only sent to staff users; set
+    SERVER_TIMING_HEADER to False to keep the figures out of every response,
+    and SLOW_QUERY_SECONDS to None to stop logging slow queries.
+    Time spent streaming a response body after the view returns is not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_query_seconds = getattr(settings, 'SLOW_QUERY_SECONDS', None)
+
+    def __call__(self, request):
+        stats = RequestStats(request, self.slow_query_seconds)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            _current.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        registry.observe(view, request.method, response.status_code, duration, stats)
+        user = getattr(request, 'user', None)
+        if getattr(settings, 'SERVER_TIMING_HEADER', False) and user is not None and user.is_staff:
+            response['Server-Timing'] = server_timing(duration, stats)
+        return response
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None or stats.rendering:
+            return super().render(context, request)
+        stats.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+            stats.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for MetricsMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
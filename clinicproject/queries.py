@@ -0,0 +1,213 @@
+"""
+N+1 query detection for development and CI, and the production slow-query log.
+
+QueryInspector is a database execute wrapper that groups a request's
+queries by shape (the SQL with its parameters left out and IN lists
+collapsed). A shape run QUERY_REPEAT_THRESHOLD or more times is almost
+always a relation read inside a loop, typically a model __str__ that
+follows patient or doctor. For each repeat it notes where it came from:
+the innermost project code frames and, when a template triggered it, the
+template line. detect_n_plus_one() wraps a block (a test, a check
+command) and raises NPlusOneError; QueryInspectorMiddleware does the same
+per request when QUERY_INSPECTION is on.
+
+Slow queries are logged by MetricsMiddleware (see log_slow_query) to the
+'clinicproject.queries' logger as one JSON object per line. Only the query
+shape is logged, never parameter values, which may hold patient data.
+"""
+
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('clinicproject.queries')
+
+DEFAULT_REPEAT_THRESHOLD = 5
+
+# Project frames shown for each repeated query.
+STACK_DEPTH = 3
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_VALUES_LIST = re.compile(r'VALUES (\((?:%s, )*%s\))(?:, \((?:%s, )*%s\))+')
+_SPACE = re.compile(r'\s+')
+
+# Frames of the query instrumentation itself are left out of reports.
+_INSTRUMENTATION = {
+    os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), name))
+    for name in ('queries.py', 'metrics.py')
+}
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql):
+    """Return sql with IN lists and multi-row VALUES collapsed, so repeats compare equal."""
+    sql = _SPACE.sub(' ', sql.strip())
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _VALUES_LIST.sub(r'VALUES \1, ...', sql)
+
+
+def _project_dirs():
+    root = os.path.normcase(os.path.abspath(settings.BASE_DIR))
+    excluded = [os.path.normcase(os.path.abspath(path)) for path in sys.path if 'packages' in path]
+    return root, excluded
+
+
+def query_origin(root, excluded):
+    """Return (project frames, template line) for the query being executed."""
+    frames, template = [], None
+    frame = sys._getframe(2)
+    while frame is not None and (len(frames) < STACK_DEPTH or template is None):
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            if origin is not None:
+                template = f'{origin.template_name}:{node.token.lineno}'
+        if (
+            len(frames) < STACK_DEPTH
+            and filename.startswith(root)
+            and filename not in _INSTRUMENTATION
+            and not any(filename.startswith(path) for path in excluded)
+        ):
+            frames.append(f'{os.path.relpath(frame.f_code.co_filename, root)}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return tuple(frames), template
+
+
+class RepeatedQuery:
+    def __init__(self, shape, count, origins):
+        self.shape = shape
+        self.count = count
+        self.origins = origins
+
+    def __str__(self):
+        (frames, template), _ = self.origins.most_common(1)[0]
+        lines = [f'{self.count}x {self.shape}']
+        if template:
+            lines.append(f'    template {template}')
+        lines += [f'    at {frame}' for frame in frames]
+        return '\n'.join(lines)
+
+
+class QueryInspector:
+    """Execute wrapper grouping the queries it sees by shape."""
+
+    def __init__(self, threshold=None):
+        if threshold is None:
+            threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+        self.threshold = threshold
+        self.shapes = Counter()
+        self.origins = {}
+        self.project_dirs = _project_dirs()
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = query_shape(sql)
+        self.shapes[shape] += 1
+        # The first run of a shape is expected; only repeats need a location.
+        if self.shapes[shape] > 1:
+            self.origins.setdefault(shape, Counter())[query_origin(*self.project_dirs)] += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def installed(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def repeated(self):
+        """Return the query shapes run at least threshold times, most frequent first."""
+        return [
+            RepeatedQuery(shape, count, self.origins[shape])
+            for shape, count in self.shapes.most_common()
+            if count >= self.threshold
+        ]
+
+
+def n_plus_one_message(repeated, where=''):
+    heading = f'Repeated queries{f" in {where}" if where else ""} (likely N+1):'
+    return '\n'.join([heading, *(str(query) for query in repeated)])
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None):
+    """
+    Raise NPlusOneError if a query shape runs threshold times inside the block.
+
+        with detect_n_plus_one():
+            client.get(reverse('admin:medical_prescription_changelist'))
+    """
+    inspector = QueryInspector(threshold)
+    with inspector.installed():
+        yield inspector
+    repeated = inspector.repeated()
+    if repeated:
+        raise NPlusOneError(n_plus_one_message(repeated))
+
+
+class QueryInspectorMiddleware:
+    """
+    Report repeated queries per request while QUERY_INSPECTION is on (DEBUG, CI).
+
+    Repeats are logged as warnings; with N_PLUS_ONE_RAISE the request fails
+    with NPlusOneError instead, which makes the test client raise in tests.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with inspector.installed():
+            response = self.get_response(request)
+        repeated = inspector.repeated()
+        if repeated:
+            message = n_plus_one_message(repeated, f'{request.method} {request.path}')
+            if getattr(settings, 'N_PLUS_ONE_RAISE', False):
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
+
+
+def log_slow_query(sql, duration, alias, request=None):
+    """Write a slow query to the query log as structured data."""
+    match = getattr(request, 'resolver_match', None)
+    logger.warning('slow query', extra={'data': {
+        'event': 'slow_query',
+        'duration_ms': round(duration * 1000, 1),
+        'database': alias,
+        'view': match.view_name if match else None,
+        'path': request.path if request is not None else None,
+        'sql': query_shape(sql),
+    }})
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line, merging record.data."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'data', {}),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
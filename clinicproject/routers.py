@@ -0,0 +1,96 @@
+"""
+Database routing for an optional read replica.
+
+Reads go to the 'replica' alias only inside use_replica() (or for requests
+the ReplicaMiddleware marks as reporting), and only when that alias is
+configured. Everything else, including all writes and migrations, stays
+on 'default'.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+REPLICA_ALIAS = 'replica'
+
+# Seconds after a write during which the same client keeps reading the primary.
+REPLICA_PIN_SECONDS = 5
+PIN_COOKIE = 'db_pin_primary'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_available():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """Route ORM reads in this block to the read replica when one is configured."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Send opted-in reads to the replica; keep writes and migrations on default."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_available():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaMiddleware:
+    """
+    Serve admin changelists (reporting reads) from the replica.
+
+    After any admin write the client is pinned to the primary for a few
+    seconds, so the changelist it is redirected to does not show stale rows.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.set(False)
+
+        match = request.resolver_match
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and match is not None
+            and 'admin' in match.namespaces
+            and replica_available()
+        ):
+            response.set_cookie(PIN_COOKIE, '1', max_age=REPLICA_PIN_SECONDS, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            request.method in ('GET', 'HEAD')
+            and 'admin' in match.namespaces
+            and (match.url_name or '').endswith('_changelist')
+            and PIN_COOKIE not in request.COOKIES
+            and replica_available()
+        ):
+            # Cleared in __call__ once the response, including any
+            # TemplateResponse rendering, has been produced.
+            _replica_reads.set(True)
+        return None
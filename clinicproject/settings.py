@@ -42,6 +42,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'clinicproject.assets.AssetMiddleware',
+    'clinicproject.metrics.MetricsMiddleware',
+    'clinicproject.queries.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,7 +57,8 @@ ROOT_URLCONF = 'clinicproject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timing renders for the request metrics
+        'BACKEND': 'clinicproject.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,9 +97,10 @@ DATABASES = {
         'HOST': 'localhost',  # XAMPP MySQL host
         'PORT': '3306',  # XAMPP MySQL default port
         'OPTIONS': {
-            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+            # One init_command: a repeated key would silently drop sql_mode.
+            # charset sets the utf8mb4 connection character set.
+            'init_command': "SET sql_mode='STRICT_TRANS_TABLES', collation_connection='utf8mb4_unicode_ci'",
             'charset': 'utf8mb4',
-            'init_command': "SET NAMES utf8mb4 COLLATE utf8mb4_unicode_ci",
         }
     }
 }
@@ -140,6 +145,9 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
 
+# collectstatic output, served by clinicproject.assets.AssetMiddleware when SERVE_ASSETS is on
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -153,6 +161,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 SITE_NAME = 'Cavin Otieno Medical Clinic'
 SITE_TAGLINE = 'Professional Healthcare Services in Kenya'
 SITE_DESCRIPTION = 'Quality medical care by Cavin Otieno and team'
+CONTACT_PHONE = '+254708101604'
+CONTACT_EMAIL = 'cavin.otieno012@gmail.com'
 
 # Security Settings
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -184,3 +194,70 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     }
 }
+
+# Seconds a rendered marketing page stays in the cache (0 disables it)
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Admin search backend (dotted path); None picks MySQL FULLTEXT or SQLite
+# FTS5 to match the database, e.g. 'medical.search.InMemorySearchBackend'
+SEARCH_BACKEND = None
+
+# Public form submissions allowed per client IP: (burst, refills per minute)
+FORM_RATE_LIMIT = (5, 2)
+
+# Reverse proxies in front of the app that append to X-Forwarded-For; the
+# rate limiter takes the client IP from there instead of REMOTE_ADDR
+RATE_LIMIT_PROXY_COUNT = 0
+
+# Add a Server-Timing header (total, database and template time) to responses
+# for staff users
+SERVER_TIMING_HEADER = True
+
+# Bearer token that lets a Prometheus scraper read /metrics without a staff
+# session; empty allows staff sessions only
+METRICS_TOKEN = ''
+
+# Queries slower than this many seconds are written to the query log (None disables)
+SLOW_QUERY_SECONDS = 0.5
+
+# Group each request's queries by shape and report any shape run
+# QUERY_REPEAT_THRESHOLD times (an N+1 loop); N_PLUS_ONE_RAISE turns the
+# report into an NPlusOneError, e.g. in CI
+QUERY_INSPECTION = DEBUG
+QUERY_REPEAT_THRESHOLD = 5
+N_PLUS_ONE_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'clinicproject.queries.JsonFormatter'},
+    },
+    'handlers': {
+        'query_log': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        # Slow queries and N+1 reports, one JSON object per line on stderr
+        'clinicproject.queries': {'handlers': ['query_log'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Serve STATIC_ROOT and MEDIA_ROOT from the app (see clinicproject.assets);
+# off in development, where DEBUG serves them through static()
+SERVE_ASSETS = False
+
+# Cache lifetime in seconds for assets without a content hash in their URL
+ASSET_MAX_AGE = 60 * 5
+
+# The only parts of MEDIA_ROOT AssetMiddleware serves; uploads stay private
+PUBLIC_MEDIA_PREFIXES = ['images/', 'derivatives/']
+
+# Critical test results are reported to their doctor once no save has flagged
+# them for CRITICAL_ALERT_DEBOUNCE seconds, and never later than
+# CRITICAL_ALERT_MAX_DELAY seconds after the first (see medical.alerts)
+CRITICAL_ALERT_DEBOUNCE = 60
+CRITICAL_ALERT_MAX_DELAY = 60 * 5
+
+# Transport for appointment reminders (see medical.reminders); the default
+# keeps them in memory as a stand-in for an SMS or WhatsApp gateway
+REMINDER_TRANSPORT = 'medical.reminders.LocalTransport'
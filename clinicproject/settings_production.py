@@ -0,0 +1,82 @@
+"""
+Production settings for clinicproject, e.g. under gunicorn workers.
+
+Use with DJANGO_SETTINGS_MODULE=clinicproject.settings_production. Values
+that differ per deployment are read from the environment (see .env.example).
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+
+def env_list(name, default=''):
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
+DEBUG = False
+
+# The N+1 detector is for development and CI; slow queries are still logged.
+QUERY_INSPECTION = False
+
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', 'localhost,127.0.0.1')
+
+
+# Database
+# Each gunicorn worker (or gthread thread) keeps its MySQL connection open
+# for CONN_MAX_AGE seconds instead of reconnecting on every request, and
+# checks it is still alive before reusing it in a new request.
+
+MYSQL_OPTIONS = {
+    'init_command': "SET sql_mode='STRICT_TRANS_TABLES', collation_connection='utf8mb4_unicode_ci'",
+    'charset': 'utf8mb4',
+    'isolation_level': 'read committed',
+}
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.environ.get('MYSQL_DATABASE', 'clinic_db'),
+        'USER': os.environ.get('MYSQL_USER', 'root'),
+        'PASSWORD': os.environ.get('MYSQL_PASSWORD', ''),
+        'HOST': os.environ.get('MYSQL_HOST', 'localhost'),
+        'PORT': os.environ.get('MYSQL_PORT', '3306'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': MYSQL_OPTIONS,
+    }
+}
+
+# Optional read replica for admin reporting reads (see clinicproject.routers).
+if os.environ.get('MYSQL_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['MYSQL_REPLICA_HOST'],
+        'PORT': os.environ.get('MYSQL_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('MYSQL_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('MYSQL_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['clinicproject.routers.ReplicaRouter']
+
+MIDDLEWARE = MIDDLEWARE + ['clinicproject.routers.ReplicaMiddleware']
+
+# Token for the Prometheus scraper reading /metrics (see clinicproject.metrics).
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Server-Timing exposes query counts and database time; off unless
+# SERVER_TIMING_HEADER=1, and even then only sent to staff.
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '0') == '1'
+
+# Static and media files: collectstatic writes fingerprinted names with .gz
+# (and, with brotli installed, .br) copies. A web server in front is
+# expected to serve them; SERVE_ASSETS=1 makes the app serve /static/ and
+# the public media (PUBLIC_MEDIA_PREFIXES) itself.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'clinicproject.assets.CompressedManifestStaticFilesStorage'},
+}
+SERVE_ASSETS = os.environ.get('SERVE_ASSETS', '0') == '1'
@@ -21,12 +21,15 @@ from django.conf.urls.static import static
 from django.contrib.sitemaps.views import sitemap
 from medical.sitemaps import StaticViewSitemap
 
+from . import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('medical.urls')),
     path('sitemap.xml', sitemap, {'sitemaps': {
         'static': StaticViewSitemap
     }}, name='django.contrib.sitemaps.views.sitemap'),
+    path('metrics', views.metrics, name='metrics'),
 ]
 
 # Serve media files during development
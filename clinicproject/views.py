@@ -3,9 +3,14 @@ Main views for the clinic project.
 Handles global error pages and core functionality.
 """
 
+from django.conf import settings
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import requires_csrf_token
-from django.http import HttpResponseServerError
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseServerError
+
+from .metrics import registry
 
 
 @requires_csrf_token
@@ -22,4 +27,19 @@ def handler500(request):
 
 def not_found(request, exception=None):
     """Custom 404 not found handler."""
-    return render(request, '404.html', status=404)
\ No newline at end of file
+    return render(request, '404.html', status=404)
+
+
+@never_cache
+def metrics(request):
+    """
+    Request metrics in the Prometheus text format.
+
+    Open to staff sessions, or to scrapers sending
+    "Authorization: Bearer <METRICS_TOKEN>" when that setting is set.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    bearer = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+    if not (request.user.is_staff or (token and constant_time_compare(bearer, token))):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -2,11 +2,200 @@
 Admin configuration for the medical app.
 """
 
-from django.contrib import admin
+import datetime
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.loader import get_template, render_to_string
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from . import timeline
 from .models import (
-    Department, Doctor, Patient, Service, Appointment, 
-    MedicalRecord, Prescription, TestResult, Page, ContactMessage
+    AnalyteValue, Department, Doctor, Patient, Service, Appointment, AppointmentReminder, AppointmentRequest,
+    MedicalRecord, Prescription, TestResult, Page, ContactMessage, OutboundEmail,
+    ClinicDashboard, CriticalResultAlert, MedicalRecordQuerySet, PatientQuerySet,
 )
+from .pagination import AFTER_VAR, BEFORE_VAR, KeysetChangeList, KeysetPaginator
+from .reporting import dashboard
+from .schedules import feed_token
+from .search import search_queryset
+from .transfer import FORMATS, IMPORTERS, export_response
+
+
+class PatientDoctorNamesMixin:
+    """
+    Show patient and doctor names from annotated columns.
+    
+    The names are computed in the changelist query itself. Subclasses still
+    list in list_select_related whatever the model's __str__ reads, since
+    the action checkbox renders str(obj) for every row.
+    """
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            patient_full_name=Concat('patient__first_name', Value(' '), 'patient__last_name'),
+            doctor_full_name=Concat(Value('Dr. '), 'doctor__first_name', Value(' '), 'doctor__last_name'),
+        )
+    
+    @admin.display(description='Patient', ordering='patient__last_name')
+    def patient_display(self, obj):
+        return obj.patient_full_name
+    
+    @admin.display(description='Doctor', ordering='doctor__last_name')
+    def doctor_display(self, obj):
+        return obj.doctor_full_name
+
+
+class KeysetPaginationMixin:
+    """
+    Page a large changelist by keyset and show an estimated total.
+    
+    Set ordering to indexed, non-null fields ending in the primary key.
+    """
+    change_list_template = 'admin/medical/keyset_change_list.html'
+    paginator = KeysetPaginator
+    show_full_result_count = False
+    
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            after=request.GET.get(AFTER_VAR), before=request.GET.get(BEFORE_VAR),
+        )
+
+
+class FullTextSearchMixin:
+    """
+    Answer the changelist search box from the search index (medical.search).
+    
+    search_fields is kept so the search box is shown and documents what is
+    indexed; the words match at word starts instead of as substrings.
+    """
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_queryset(queryset, search_term), False
+
+
+class AgeBandFilter(admin.SimpleListFilter):
+    """Filter patients by age band, as a date_of_birth range in SQL."""
+    title = 'age band'
+    parameter_name = 'age_band'
+    
+    def lookups(self, request, model_admin):
+        return [(label, label) for label, _, _ in PatientQuerySet.AGE_BANDS]
+    
+    def queryset(self, request, queryset):
+        if self.value() in dict(self.lookup_choices):
+            return queryset.in_age_band(self.value())
+        return queryset
+
+
+class FollowUpStatusFilter(admin.SimpleListFilter):
+    """Filter medical records by follow-up status relative to today."""
+    title = 'follow-up'
+    parameter_name = 'follow_up'
+    
+    def lookups(self, request, model_admin):
+        return [*MedicalRecordQuerySet.FOLLOW_UP_STATUSES, ('none', 'No follow-up')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'none':
+            return queryset.filter(follow_up_date__isnull=True)
+        if self.value() in dict(MedicalRecordQuerySet.FOLLOW_UP_STATUSES):
+            return queryset.in_follow_up_status(self.value())
+        return queryset
+
+
+class RefillDueFilter(admin.SimpleListFilter):
+    """Filter prescriptions flagged for a refill by the prescription scheduler."""
+    title = 'refill'
+    parameter_name = 'refill'
+    
+    def lookups(self, request, model_admin):
+        return [('due', 'Refill due')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'due':
+            return queryset.refill_flagged()
+        return queryset
+
+
+class ImportFileForm(forms.Form):
+    """Upload form for the bulk import admin view."""
+    file = forms.FileField()
+    format = forms.ChoiceField(choices=[(name, name.upper()) for name in FORMATS], initial='csv')
+
+
+class ImportExportMixin:
+    """
+    Bulk import from an uploaded CSV/NDJSON file and export selected rows.
+    
+    transfer_kind names the medical.transfer importer and export columns.
+    """
+    transfer_kind = None
+    actions = ['export_csv', 'export_ndjson']
+    
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'import/', self.admin_site.admin_view(self.import_view),
+                name=f'{opts.app_label}_{opts.model_name}_import',
+            ),
+            *super().get_urls(),
+        ]
+    
+    def changelist_view(self, request, extra_context=None):
+        if self.has_add_permission(request):
+            opts = self.model._meta
+            extra_context = {
+                **(extra_context or {}),
+                'import_url': reverse(f'admin:{opts.app_label}_{opts.model_name}_import'),
+            }
+        return super().changelist_view(request, extra_context)
+    
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        opts = self.model._meta
+        form = ImportFileForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            stream = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            result = IMPORTERS[self.transfer_kind]().run(stream, form.cleaned_data['format'])
+            self.message_user(request, f"Import: {result}.", messages.WARNING if result.failed else messages.SUCCESS)
+            for line_number, message in result.errors[:10]:
+                self.message_user(request, f"Line {line_number}: {message}", messages.WARNING)
+            return redirect(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': opts,
+            'form': form,
+            'title': f"Import {opts.verbose_name_plural}",
+            'help_text': IMPORTERS[self.transfer_kind].__doc__,
+        }
+        return TemplateResponse(request, 'admin/medical/import_form.html', context)
+    
+    @admin.action(description="Export selected as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(queryset, self.transfer_kind, 'csv')
+    
+    @admin.action(description="Export selected as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return export_response(queryset, self.transfer_kind, 'ndjson')
 
 
 @admin.register(Department)
@@ -24,11 +213,11 @@ class DoctorAdmin(admin.ModelAdmin):
     list_display = ['first_name', 'last_name', 'specialization', 'department', 'is_available', 'consultation_fee']
     list_filter = ['specialization', 'department', 'is_available']
     search_fields = ['first_name', 'last_name', 'license_number', 'specialization']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['schedule_feeds', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Personal Information', {
-            'fields': ('first_name', 'last_name', 'email', 'phone', 'photo')
+            'fields': ('first_name', 'last_name', 'email', 'phone')
         }),
         ('Professional Information', {
             'fields': ('license_number', 'specialization', 'department', 'experience_years', 'bio')
@@ -36,25 +225,44 @@ class DoctorAdmin(admin.ModelAdmin):
         ('Availability & Fees', {
             'fields': ('consultation_fee', 'is_available', 'available_days', 'available_time_start', 'available_time_end')
         }),
+        ('Schedule', {
+            'fields': ('schedule_feeds',),
+            'description': 'Subscribe a calendar client to the iCalendar link; anyone with it can read the schedule.',
+        }),
         ('System Fields', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    @admin.display(description='Schedule feeds')
+    def schedule_feeds(self, obj):
+        if obj.pk is None:
+            return '-'
+        token = feed_token(obj.pk)
+        return format_html(
+            '<a href="{}?token={}">iCalendar</a> &middot; <a href="{}">JSON</a>',
+            reverse('doctor_schedule_ical', args=[obj.pk]), token,
+            reverse('doctor_schedule_json', args=[obj.pk]),
+        )
 
 
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(ImportExportMixin, FullTextSearchMixin, admin.ModelAdmin):
     """Admin interface for Patient model."""
-    list_display = ['first_name', 'last_name', 'phone', 'email', 'blood_type', 'is_active', 'created_at']
-    list_filter = ['gender', 'blood_type', 'marital_status', 'is_active', 'created_at']
+    transfer_kind = 'patients'
+    list_display = ['first_name', 'last_name', 'age_display', 'phone', 'email', 'blood_type', 'is_active', 'created_at', 'timeline_link']
+    list_filter = [AgeBandFilter, 'gender', 'blood_type', 'marital_status', 'is_active', 'created_at']
     search_fields = ['first_name', 'last_name', 'phone', 'email', 'insurance_policy_number']
-    readonly_fields = ['created_at', 'updated_at', 'age']
+    readonly_fields = ['created_at', 'updated_at', 'age', 'timeline_link']
     
     fieldsets = (
         ('Personal Information', {
             'fields': ('first_name', 'last_name', 'date_of_birth', 'gender', 'blood_type', 'marital_status', 'photo')
         }),
+        ('History', {
+            'fields': ('timeline_link',)
+        }),
         ('Contact Information', {
             'fields': ('phone', 'email', 'address')
         }),
@@ -72,6 +280,75 @@ class PatientAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_age()
+    
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                '<path:object_id>/timeline/', self.admin_site.admin_view(self.timeline_view),
+                name=f'{opts.app_label}_{opts.model_name}_timeline',
+            ),
+            *super().get_urls(),
+        ]
+    
+    @admin.display(description='Age', ordering='-date_of_birth')
+    def age_display(self, obj):
+        return obj.age_years
+    
+    @admin.display(description='History')
+    def timeline_link(self, obj):
+        if obj.pk is None:
+            return '-'
+        return format_html('<a href="{}">Timeline</a>', reverse('admin:medical_patient_timeline', args=[obj.pk]))
+    
+    def timeline_view(self, request, object_id):
+        """Stream the patient's appointments, records, prescriptions and tests (see medical.timeline)."""
+        patient = self.get_object(request, unquote(object_id))
+        if patient is None:
+            raise Http404('No such patient.')
+        if not self.has_view_permission(request, patient):
+            raise PermissionDenied
+        try:
+            cursor = timeline.parse_cursor(request.GET.get(AFTER_VAR))
+        except ValueError:
+            return HttpResponseBadRequest('Invalid timeline cursor.')
+        kinds = {
+            source.kind for source in timeline.SOURCES
+            if source.model in self.admin_site._registry
+            and self.admin_site._registry[source.model].has_view_permission(request)
+        }
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': patient,
+            'title': f"Timeline: {patient.first_name} {patient.last_name}",
+            'is_first_page': cursor is None,
+        }
+        page = timeline.TimelinePage(patient.pk, cursor, kinds)
+        head, tail = render_to_string('admin/medical/patient_timeline.html', context, request).split(timeline.ENTRIES_PLACEHOLDER)
+        entry_template = get_template('admin/medical/timeline_entry.html')
+        
+        def stream():
+            # The page header goes out before the timeline queries run.
+            yield head
+            empty = True
+            for entry in page:
+                empty = False
+                yield entry_template.render({'entry': entry})
+            if empty:
+                yield '<li>No entries.</li>'
+            if page.next_cursor:
+                yield format_html(
+                    '<li class="paginator"><a href="?{}={}">Older entries</a></li>',
+                    AFTER_VAR, page.next_cursor,
+                )
+            yield tail
+        
+        # admin_view() marks the response never_cache.
+        return StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
 
 
 @admin.register(Service)
@@ -84,16 +361,19 @@ class ServiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(ImportExportMixin, KeysetPaginationMixin, PatientDoctorNamesMixin, admin.ModelAdmin):
     """Admin interface for Appointment model."""
-    list_display = ['patient', 'doctor', 'service', 'appointment_date', 'appointment_time', 'status', 'priority']
+    transfer_kind = 'appointments'
+    list_display = ['patient_display', 'doctor_display', 'service', 'appointment_date', 'appointment_time', 'status', 'priority']
+    list_select_related = ['patient', 'doctor', 'service']
     list_filter = ['status', 'priority', 'appointment_date', 'doctor']
+    ordering = ['-appointment_date', '-id']
     search_fields = [
         'patient__first_name', 'patient__last_name', 
         'doctor__first_name', 'doctor__last_name', 
         'reason_for_visit'
     ]
-    readonly_fields = ['created_at', 'updated_at', 'end_time']
+    readonly_fields = ['created_at', 'updated_at', 'end_time', 'revenue']
     
     fieldsets = (
         ('Appointment Details', {
@@ -106,18 +386,22 @@ class AppointmentAdmin(admin.ModelAdmin):
             'fields': ('reason_for_visit', 'symptoms', 'notes')
         }),
         ('System Information', {
-            'fields': ('cancelled_reason', 'created_at', 'updated_at', 'end_time'),
+            'fields': ('cancelled_reason', 'created_at', 'updated_at', 'end_time', 'revenue'),
             'classes': ('collapse',)
         }),
     )
 
 
 @admin.register(MedicalRecord)
-class MedicalRecordAdmin(admin.ModelAdmin):
+class MedicalRecordAdmin(FullTextSearchMixin, KeysetPaginationMixin, PatientDoctorNamesMixin, admin.ModelAdmin):
     """Admin interface for MedicalRecord model."""
-    list_display = ['patient', 'doctor', 'record_type', 'severity', 'record_date', 'created_at']
-    list_filter = ['record_type', 'severity', 'record_date', 'doctor']
+    list_display = ['patient_display', 'doctor_display', 'record_type', 'severity', 'record_date', 'follow_up_date', 'created_at']
+    list_select_related = ['patient']
+    list_filter = ['record_type', 'severity', FollowUpStatusFilter, 'record_date', 'doctor']
+    ordering = ['-record_date', '-id']
     search_fields = ['patient__first_name', 'patient__last_name', 'diagnosis', 'treatment_plan']
+    # A select would list every appointment, each __str__ loading its patient and doctor.
+    raw_id_fields = ['appointment']
     readonly_fields = ['created_at', 'updated_at']
     
     def has_module_permission(self, request):
@@ -145,22 +429,53 @@ class MedicalRecordAdmin(admin.ModelAdmin):
 
 
 @admin.register(Prescription)
-class PrescriptionAdmin(admin.ModelAdmin):
+class PrescriptionAdmin(PatientDoctorNamesMixin, admin.ModelAdmin):
     """Admin interface for Prescription model."""
-    list_display = ['patient', 'medication_name', 'doctor', 'status', 'prescribed_date', 'refills_remaining']
-    list_filter = ['status', 'prescribed_date', 'doctor']
+    list_display = [
+        'patient_display', 'medication_name', 'doctor_display', 'status', 'prescribed_date', 'end_date',
+        'refills_remaining', 'refill_due_display',
+    ]
+    list_select_related = ['patient']
+    list_filter = ['status', RefillDueFilter, 'prescribed_date', 'doctor']
     search_fields = ['patient__first_name', 'patient__last_name', 'medication_name', 'doctor__last_name']
-    readonly_fields = ['created_at', 'updated_at']
+    # A select would list every medical record, each __str__ loading its patient.
+    raw_id_fields = ['medical_record']
+    readonly_fields = ['refill_flagged_for', 'created_at', 'updated_at']
+    
+    @admin.display(description='Refill due', boolean=True)
+    def refill_due_display(self, obj):
+        return obj.refill_due
     
     def has_module_permission(self, request):
         """Limit prescriptions to staff users only."""
         return request.user.is_staff
 
 
+class AnalyteValueInline(admin.TabularInline):
+    """Numeric values extracted from the test result's JSON (see medical.labs)."""
+    model = AnalyteValue
+    fields = ['name', 'value', 'unit', 'range_low', 'range_high', 'flag_display']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_flag()
+    
+    @admin.display(description='Flag')
+    def flag_display(self, obj):
+        return obj.flag or '-'
+
+
 @admin.register(TestResult)
-class TestResultAdmin(admin.ModelAdmin):
+class TestResultAdmin(FullTextSearchMixin, PatientDoctorNamesMixin, admin.ModelAdmin):
     """Admin interface for TestResult model."""
-    list_display = ['patient', 'test_name', 'test_type', 'status', 'result_status', 'test_date']
+    inlines = [AnalyteValueInline]
+    list_display = ['patient_display', 'test_name', 'test_type', 'status', 'result_status', 'test_date']
+    list_select_related = ['patient']
     list_filter = ['status', 'result_status', 'test_type', 'test_date', 'doctor']
     search_fields = ['patient__first_name', 'patient__last_name', 'test_name', 'interpretation']
     readonly_fields = ['created_at', 'updated_at']
@@ -202,6 +517,132 @@ class ContactMessageAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(AppointmentRequest)
+class AppointmentRequestAdmin(admin.ModelAdmin):
+    """Admin interface for appointment requests from the booking form."""
+    list_display = [
+        'first_name', 'last_name', 'phone', 'preferred_date', 'preferred_time',
+        'service_type', 'is_emergency', 'status', 'created_at',
+    ]
+    list_filter = ['status', 'is_emergency', 'service_type', 'preferred_date', 'created_at']
+    search_fields = ['first_name', 'last_name', 'email', 'phone']
+    raw_id_fields = ['appointment']
+    readonly_fields = ['client_ip', 'created_at', 'updated_at']
+    actions = ['mark_contacted', 'mark_declined']
+    
+    fieldsets = (
+        ('Patient Details', {
+            'fields': ('first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'insurance_provider')
+        }),
+        ('Request', {
+            'fields': (
+                'preferred_date', 'preferred_time', 'service_type', 'preferred_doctor',
+                'is_emergency', 'is_first_visit', 'reason_for_visit', 'current_medications', 'allergies',
+            )
+        }),
+        ('Handling', {
+            'fields': ('status', 'appointment')
+        }),
+        ('System Fields', {
+            'fields': ('client_ip', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    @admin.action(description="Mark selected requests as contacted")
+    def mark_contacted(self, request, queryset):
+        updated = queryset.filter(status='new').update(status='contacted', updated_at=timezone.now())
+        self.message_user(request, f"{updated} request(s) marked as contacted.")
+    
+    @admin.action(description="Decline selected requests")
+    def mark_declined(self, request, queryset):
+        updated = queryset.exclude(status='booked').update(status='declined', updated_at=timezone.now())
+        self.message_user(request, f"{updated} request(s) declined.")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """Admin interface for the outbound email queue."""
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['attempts', 'claimed_at', 'last_error', 'sent_at', 'created_at', 'updated_at']
+    actions = ['requeue_emails']
+    
+    @admin.action(description="Requeue selected emails for delivery")
+    def requeue_emails(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='queued', attempts=0, next_attempt_at=timezone.now(), claimed_at=None,
+        )
+        self.message_user(request, f"{updated} email(s) requeued.")
+
+
+@admin.register(AppointmentReminder)
+class AppointmentReminderAdmin(admin.ModelAdmin):
+    """Admin interface for appointment reminders (see medical.reminders)."""
+    list_display = ['appointment', 'bucket', 'send_at', 'status', 'attempts', 'sent_at']
+    list_select_related = ['appointment__patient', 'appointment__doctor']
+    list_filter = ['status', 'bucket', 'send_at']
+    readonly_fields = [
+        'appointment', 'bucket', 'send_at', 'status', 'attempts', 'claimed_at', 'sent_at', 'last_error',
+        'created_at', 'updated_at',
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(CriticalResultAlert)
+class CriticalResultAlertAdmin(admin.ModelAdmin):
+    """Admin interface for critical test result alerts (see medical.alerts)."""
+    list_display = ['test_result', 'doctor_display', 'status', 'first_flagged_at', 'last_flagged_at', 'notified_at']
+    list_select_related = ['test_result__patient', 'test_result__doctor']
+    list_filter = ['status', 'first_flagged_at']
+    readonly_fields = ['test_result', 'status', 'first_flagged_at', 'last_flagged_at', 'notified_at', 'email']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.display(description='Doctor', ordering='test_result__doctor__last_name')
+    def doctor_display(self, obj):
+        return obj.test_result.doctor.doctor_name
+
+
+@admin.register(ClinicDashboard)
+class ClinicDashboardAdmin(admin.ModelAdmin):
+    """Operations dashboard read from the daily rollups (see medical.reporting)."""
+    PERIODS = [7, 30, 90, 365]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        if days not in self.PERIODS:
+            days = 30
+        end = timezone.localdate()
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Clinic dashboard',
+            'periods': self.PERIODS,
+            'days': days,
+            'report': dashboard(end - datetime.timedelta(days=days - 1), end),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/medical/dashboard.html', context)
+
 # Customize admin site header
 admin.site.site_header = "Cavin Otieno Medical Clinic Administration"
 admin.site.site_title = "Medical Clinic Admin"
@@ -0,0 +1,128 @@
+"""
+Critical test results reported to their doctor in debounced digests.
+
+Saving a TestResult with result_status 'critical' opens a
+CriticalResultAlert in the same transaction (see medical.signals), so the
+alert is exactly as durable as the result. Saving the result again only
+moves the alert's last_flagged_at; saving it with another result status
+clears the alert.
+
+The process_critical_alerts command picks up alerts that no save has
+touched for CRITICAL_ALERT_DEBOUNCE seconds, or that have been open for
+CRITICAL_ALERT_MAX_DELAY, groups them by the result's doctor and queues one
+digest email per doctor through the outbox. A lab import that saves
+thousands of results therefore costs two queries per save and ends in one
+email per doctor.
+
+Results changed without signals (update(), bulk_create, raw SQL) can be
+passed to flag_results() or clear_results() by id.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CriticalResultAlert
+from .outbox import queue_email
+
+
+OPEN_STATUSES = ('pending', 'sent')
+
+# Ids per UPDATE ... WHERE id IN (...).
+ID_BATCH_SIZE = 1000
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        yield ids[start:start + ID_BATCH_SIZE]
+
+
+def flag_results(test_result_ids, now=None):
+    """Open an alert for each critical test result, or refresh the pending one it has."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        for ids in _batches(test_result_ids):
+            CriticalResultAlert.objects.filter(test_result__in=ids, status='pending').update(last_flagged_at=now)
+            # Results with an open alert hit the unique open_for key and are skipped.
+            CriticalResultAlert.objects.bulk_create([
+                CriticalResultAlert(test_result_id=pk, open_for=pk, first_flagged_at=now, last_flagged_at=now)
+                for pk in ids
+            ], ignore_conflicts=True)
+
+
+def clear_results(test_result_ids):
+    """Clear the open alerts of test results that are no longer critical."""
+    for ids in _batches(test_result_ids):
+        CriticalResultAlert.objects.filter(test_result__in=ids, status__in=OPEN_STATUSES).update(
+            status='cleared', open_for=None,
+        )
+
+
+def due_alerts(now=None):
+    """Pending alerts that have been quiet for the debounce period or open for the maximum delay."""
+    now = now or timezone.now()
+    debounce = datetime.timedelta(seconds=getattr(settings, 'CRITICAL_ALERT_DEBOUNCE', 60))
+    max_delay = datetime.timedelta(seconds=getattr(settings, 'CRITICAL_ALERT_MAX_DELAY', 60 * 5))
+    return CriticalResultAlert.objects.filter(status='pending').filter(
+        Q(last_flagged_at__lte=now - debounce) | Q(first_flagged_at__lte=now - max_delay)
+    )
+
+
+def _result_line(test_result):
+    interpretation = test_result.interpretation.strip().splitlines()
+    detail = f': {interpretation[0][:200]}' if interpretation else ''
+    return f'    - {test_result.patient.patient_name}, {test_result.test_name} ({test_result.test_date}){detail}'
+
+
+def queue_digest(doctor, test_results):
+    """Queue the email listing a doctor's critical test results and return the outbox row."""
+    lines = '\n'.join(_result_line(test_result) for test_result in test_results)
+    return queue_email(
+        f'{len(test_results)} critical test result(s) - {settings.SITE_NAME}',
+        f'''
+    Dear {doctor.doctor_name},
+    
+    The following test results you ordered were marked critical:
+    
+{lines}
+    
+    Please review them in the clinic admin.
+    
+    {settings.SITE_NAME}
+    ''',
+        [doctor.email],
+    )
+
+
+def process_alerts(now=None):
+    """Queue one digest per doctor for the due alerts; return (digests, results) counts."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        alerts = list(
+            due_alerts(now)
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('test_result__patient', 'test_result__doctor')
+            .order_by('test_result__doctor', 'test_result__test_date', 'pk')
+        )
+        by_doctor, cleared = defaultdict(list), []
+        for alert in alerts:
+            if alert.test_result.result_status == 'critical':
+                by_doctor[alert.test_result.doctor_id].append(alert)
+            else:
+                # Changed by update() or raw SQL since it was flagged.
+                cleared.append(alert.pk)
+        for ids in _batches(cleared):
+            CriticalResultAlert.objects.filter(pk__in=ids).update(status='cleared', open_for=None)
+
+        for doctor_alerts in by_doctor.values():
+            email = queue_digest(
+                doctor_alerts[0].test_result.doctor, [alert.test_result for alert in doctor_alerts],
+            )
+            for ids in _batches(alert.pk for alert in doctor_alerts):
+                CriticalResultAlert.objects.filter(pk__in=ids).update(status='sent', notified_at=now, email=email)
+    return len(by_doctor), len(alerts) - len(cleared)
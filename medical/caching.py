@@ -0,0 +1,153 @@
+"""
+Full-page caching for the public marketing views.
+
+Rendered pages are stored in the default cache under a key that includes a
+site-wide content version. Saving or deleting a Page or Service bumps the
+version (see medical.signals), which retires every cached page at once.
+The version is the change timestamp, so it doubles as Last-Modified.
+
+The pages carry no per-user content, so they vary only on the URL path.
+With LocMemCache each process holds its own copy and only sees its own
+invalidations, so other processes serve a page until PAGE_CACHE_TIMEOUT
+expires it; use a shared cache backend when running several worker
+processes.
+
+The services listing is also kept as a precomputed payload of plain
+Python values, rebuilt from signals whenever a Service change is
+committed. It expires after PAGE_CACHE_TIMEOUT like the pages.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from clinicproject.metrics import record_cache
+
+from .models import Service
+
+
+VERSION_KEY = 'medical:pages:version'
+SERVICES_LISTING_KEY = 'medical:services:listing'
+
+# Font Awesome icon shown for each Service category.
+CATEGORY_ICONS = {
+    'consultation': 'stethoscope',
+    'diagnostic': 'microscope',
+    'treatment': 'prescription-bottle-alt',
+    'surgery': 'procedures',
+    'therapy': 'hand-holding-heart',
+    'preventive': 'shield-alt',
+    'emergency': 'ambulance',
+    'laboratory': 'flask',
+    'radiology': 'x-ray',
+}
+DEFAULT_CATEGORY_ICON = 'notes-medical'
+
+
+def get_page_cache_version():
+    """Return the current content version (milliseconds since the epoch)."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = int(time.time() * 1000)
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate_page_cache():
+    """Retire all cached marketing pages."""
+    cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+def _render_cached(request, entry, version):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    last_modified = version // 1000
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=last_modified, response=response,
+    )
+
+
+def cache_page_response(view_func):
+    """
+    Serve a view from the page cache, answering conditional GETs with 304.
+
+    Only successful GET/HEAD responses without cookies are stored, so pages
+    that issue a CSRF token or touch the session are always rendered fresh.
+    Set PAGE_CACHE_TIMEOUT to 0 to disable caching.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 15)
+        if not timeout or request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        version = get_page_cache_version()
+        key = f'medical:page:{version}:{request.path}'
+        entry = cache.get(key)
+        record_cache(entry is not None)
+        if entry is None:
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code != 200
+                or response.streaming
+                or response.cookies
+                or request.META.get('CSRF_COOKIE_USED')
+            ):
+                return response
+            entry = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': f'"{hashlib.md5(response.content, usedforsecurity=False).hexdigest()}"',
+            }
+            cache.set(key, entry, timeout)
+        return _render_cached(request, entry, version)
+
+    return wrapper
+
+
+def build_services_listing():
+    """Query available services and store them grouped by category."""
+    services = (
+        Service.objects
+        .filter(is_available=True)
+        .order_by('name')
+        .values(
+            'id', 'name', 'category', 'description', 'duration_minutes', 'price',
+            'requires_appointment', 'preparation_instructions',
+        )
+    )
+    grouped = {category: [] for category, _ in Service.CATEGORY_CHOICES}
+    for service in services:
+        grouped.setdefault(service['category'], []).append(service)
+
+    labels = dict(Service.CATEGORY_CHOICES)
+    listing = [
+        {
+            'category': category,
+            'label': labels.get(category, category.title()),
+            'icon': CATEGORY_ICONS.get(category, DEFAULT_CATEGORY_ICON),
+            'services': items,
+        }
+        for category, items in grouped.items()
+        if items
+    ]
+    cache.set(SERVICES_LISTING_KEY, listing, getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 15))
+    return listing
+
+
+def get_services_listing():
+    """Return the precomputed services listing, building it on a cold cache."""
+    listing = cache.get(SERVICES_LISTING_KEY)
+    record_cache(listing is not None)
+    if listing is None:
+        listing = build_services_listing()
+    return listing
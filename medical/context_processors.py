@@ -11,9 +11,9 @@ def contact_info(request):
         'site_name': getattr(settings, 'SITE_NAME', 'Medical Clinic'),
         'site_tagline': getattr(settings, 'SITE_TAGLINE', 'Professional Healthcare'),
         'site_description': getattr(settings, 'SITE_DESCRIPTION', 'Quality healthcare services'),
-        'contact_phone': '+254708101604',
+        'contact_phone': getattr(settings, 'CONTACT_PHONE', '+254708101604'),
         'whatsapp_link': 'wa.me/+254708101604',
-        'contact_email': 'cavin.otieno012@gmail.com',
+        'contact_email': getattr(settings, 'CONTACT_EMAIL', 'cavin.otieno012@gmail.com'),
         'linkedin_profile': 'https://www.linkedin.com/in/cavin-otieno-9a841260/',
         'author_name': 'Cavin Otieno',
     }
\ No newline at end of file
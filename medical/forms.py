@@ -0,0 +1,84 @@
+"""
+Public forms for appointment requests and contact messages.
+"""
+
+import datetime
+
+from django import forms
+from django.utils import timezone
+
+from .models import AppointmentRequest, ContactMessage
+
+
+# Half-hour slots offered on the booking form, 8:00 AM to 5:30 PM.
+TIME_SLOT_CHOICES = [
+    (f'{hour:02d}:{minute:02d}', f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}")
+    for hour in range(8, 18) for minute in (0, 30)
+]
+
+
+class AppointmentRequestForm(forms.ModelForm):
+    """Booking form on the appointments page."""
+    preferred_time = forms.TypedChoiceField(choices=TIME_SLOT_CHOICES, coerce=datetime.time.fromisoformat)
+    privacy = forms.BooleanField(required=True)
+
+    class Meta:
+        model = AppointmentRequest
+        fields = [
+            'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'preferred_date',
+            'preferred_time', 'service_type', 'preferred_doctor', 'reason_for_visit',
+            'current_medications', 'allergies', 'insurance_provider', 'is_emergency', 'is_first_visit',
+        ]
+
+    def clean_preferred_date(self):
+        preferred_date = self.cleaned_data['preferred_date']
+        if preferred_date < timezone.localdate():
+            raise forms.ValidationError('Please choose today or a later date.')
+        return preferred_date
+
+    def clean_date_of_birth(self):
+        date_of_birth = self.cleaned_data.get('date_of_birth')
+        if date_of_birth and date_of_birth > timezone.localdate():
+            raise forms.ValidationError('Date of birth cannot be in the future.')
+        return date_of_birth
+
+
+class ContactForm(forms.Form):
+    """Message form on the contact page, stored as a ContactMessage."""
+    SERVICE_CHOICES = [
+        ('', 'Select a service...'),
+        ('general', 'General Consultation'),
+        ('preventive', 'Preventive Care'),
+        ('pediatric', 'Pediatric Care'),
+        ('emergency', 'Emergency Care'),
+        ('chronic', 'Chronic Disease Management'),
+        ('laboratory', 'Laboratory Services'),
+        ('other', 'Other'),
+    ]
+
+    first_name = forms.CharField(max_length=100)
+    last_name = forms.CharField(max_length=100)
+    email = forms.EmailField(max_length=254)
+    phone = forms.CharField(max_length=20, required=False)
+    service = forms.ChoiceField(choices=SERVICE_CHOICES, required=False)
+    message = forms.CharField(max_length=5000)
+    privacy = forms.BooleanField(required=True)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        first_name, last_name = cleaned_data.get('first_name'), cleaned_data.get('last_name')
+        max_length = ContactMessage._meta.get_field('name').max_length
+        if first_name and last_name and len(f'{first_name} {last_name}') > max_length:
+            self.add_error('last_name', f'First and last name together must not exceed {max_length - 1} characters.')
+        return cleaned_data
+
+    def save(self):
+        data = self.cleaned_data
+        service = dict(self.SERVICE_CHOICES)[data['service']] if data['service'] else None
+        return ContactMessage.objects.create(
+            name=f"{data['first_name']} {data['last_name']}",
+            email=data['email'],
+            phone=data['phone'],
+            subject=f'Enquiry: {service}' if service else 'General enquiry',
+            message=data['message'],
+        )
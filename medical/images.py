@@ -0,0 +1,164 @@
+"""
+Responsive image derivatives for files under MEDIA_ROOT.
+
+Derivatives are generated ahead of time by the build_image_derivatives
+command and stored content-addressed under MEDIA_ROOT/derivatives/<hash>/,
+so an unchanged source is never re-encoded and a changed one gets fresh,
+cache-safe URLs. A JSON manifest maps each source path to its variants;
+the responsive_image template tag only reads that manifest.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+from PIL import Image, features
+
+
+DERIVATIVES_DIR = 'derivatives'
+MANIFEST_NAME = 'manifest.json'
+
+DERIVATIVE_WIDTHS = (160, 320, 480, 768, 1024, 1600)
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Preferred order for <picture> sources; jpeg is the <img> fallback.
+FORMATS = {
+    'avif': {'extension': 'avif', 'mime': 'image/avif', 'options': {'quality': 55}},
+    'webp': {'extension': 'webp', 'mime': 'image/webp', 'options': {'quality': 80, 'method': 6}},
+    'jpeg': {'extension': 'jpg', 'mime': 'image/jpeg', 'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+
+def available_formats():
+    """Return the output formats this Pillow build can encode."""
+    return [name for name in FORMATS if name == 'jpeg' or features.check(name)]
+
+
+def manifest_path():
+    return Path(settings.MEDIA_ROOT) / DERIVATIVES_DIR / MANIFEST_NAME
+
+
+def load_image_meta(path):
+    """Return {file_name: (width, height)} from an image_meta.json file."""
+    try:
+        with open(path) as handle:
+            entries = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    meta = {}
+    for entry in entries:
+        info = entry.get('image_info') or {}
+        if info.get('file_name') and info.get('width') and info.get('height'):
+            meta[info['file_name']] = (info['width'], info['height'])
+    return meta
+
+
+def target_widths(source_width, widths=DERIVATIVE_WIDTHS):
+    """Widths to generate for a source: every fixed width below it, plus its own."""
+    chosen = [width for width in widths if width < source_width]
+    if source_width <= max(widths):
+        chosen.append(source_width)
+    return chosen
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _plan(output_dir, width, height, widths, formats):
+    """Return [(target_width, target_height, format, output_path), ...]."""
+    return [
+        (target, max(1, round(height * target / width)), name,
+         output_dir / f"{target}.{FORMATS[name]['extension']}")
+        for target in target_widths(width, widths)
+        for name in formats
+    ]
+
+
+def build_derivatives(job):
+    """
+    Generate all variants for one source image (runs in a worker process).
+
+    job is (media_root, relative_path, known_size, widths, formats, force).
+    When known_size (from image_meta.json) is given and every variant
+    already exists, the source is hashed but never decoded.
+    Returns (relative_path, manifest_entry).
+    """
+    media_root, relative_path, known_size, widths, formats, force = job
+    media_root = Path(media_root)
+    source = media_root / relative_path
+    digest = file_digest(source)
+    output_dir = media_root / DERIVATIVES_DIR / digest
+
+    plan = None
+    if known_size and not force:
+        plan = _plan(output_dir, *known_size, widths, formats)
+        if not all(output.exists() for *_, output in plan):
+            plan = None
+
+    if plan is None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with Image.open(source) as image:
+            image.load()
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            plan = _plan(output_dir, *image.size, widths, formats)
+            resized = {}
+            for target, target_height, name, output in plan:
+                if output.exists() and not force:
+                    continue
+                if target not in resized:
+                    frame = image.convert('RGBA' if has_alpha else 'RGB')
+                    if target != image.width:
+                        frame = frame.resize((target, target_height), Image.LANCZOS)
+                    resized[target] = frame
+                frame = resized[target]
+                if name == 'jpeg' and frame.mode == 'RGBA':
+                    flattened = Image.new('RGB', frame.size, (255, 255, 255))
+                    flattened.paste(frame, mask=frame.getchannel('A'))
+                    frame = flattened
+                frame.save(output, format=name.upper(), **FORMATS[name]['options'])
+            known_size = image.size
+
+    variants = {name: [] for name in formats}
+    for target, _, name, output in plan:
+        variants[name].append([target, output.relative_to(media_root).as_posix()])
+    return relative_path, {
+        'hash': digest,
+        'width': known_size[0],
+        'height': known_size[1],
+        'variants': variants,
+    }
+
+
+def write_manifest(entries):
+    """Atomically replace the derivative manifest."""
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    with open(temporary, 'w') as handle:
+        json.dump(entries, handle, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+_manifest_cache = {}
+
+
+def get_manifest():
+    """Return the manifest, re-reading it only when the file changes."""
+    path = manifest_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {}
+    if _manifest_cache.get('mtime') != mtime:
+        with open(path) as handle:
+            _manifest_cache['entries'] = json.load(handle)
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['entries']
@@ -0,0 +1,170 @@
+"""
+Numeric lab values extracted from TestResult.values into AnalyteValue rows.
+
+TestResult.values is free-form JSON, so asking "which potassium readings
+were high?" used to mean decoding every test result. Each numeric value is
+now also stored as an AnalyteValue row (normalised analyte name, value,
+unit, reference range, patient and test date), rewritten whenever its test
+result is saved and indexed by (analyte, patient, test_date). The
+AnalyteValueQuerySet helpers flag and filter ranges in SQL.
+
+Shapes of TestResult.values that are understood:
+
+    {"Potassium": 5.8}
+    {"Potassium": "5.8 mmol/L"}
+    {"Potassium": {"value": 5.8, "unit": "mmol/L", "range": "3.5-5.1"}}
+    [{"name": "Potassium", "value": 5.8, "unit": "mmol/L", "low": 3.5, "high": 5.1}]
+
+An entry without its own range takes it from TestResult.normal_range:
+either "Name: range" pairs separated by semicolons or new lines, or, for a
+test with a single value, one range. Ranges may be written "3.5-5.1",
+"3.5 to 5.1", "<5.7" or ">= 60", optionally followed by the unit.
+Non-numeric values ("positive", "trace") are not extracted.
+
+Test results written without signals (bulk_create, update(), raw SQL,
+loaddata) are picked up by the backfill_analyte_values command.
+"""
+
+import re
+
+from django.db import transaction
+
+from .models import AnalyteValue, TestResult
+
+
+# Fields of TestResult that the extracted rows depend on.
+SOURCE_FIELDS = ('patient', 'test_date', 'values', 'normal_range')
+
+NAME_KEYS = ('analyte', 'name', 'test', 'code')
+VALUE_KEYS = ('value', 'result')
+UNIT_KEYS = ('unit', 'units')
+RANGE_KEYS = ('range', 'reference_range', 'normal_range', 'ref')
+LOW_KEYS = ('low', 'min', 'range_low')
+HIGH_KEYS = ('high', 'max', 'range_high')
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_VALUE = re.compile(r'^\s*(?:[<>]=?|[≤≥=])?\s*(-?\d+(?:\.\d+)?)\s*(.*?)\s*$')
+_BETWEEN = re.compile(rf'^\s*{_NUMBER}\s*(?:-|–|—|to)\s*{_NUMBER}\s*(.*?)\s*$', re.I)
+_UPPER = re.compile(rf'^\s*(?:<=?|≤|up to|below)\s*{_NUMBER}\s*(.*?)\s*$', re.I)
+_LOWER = re.compile(rf'^\s*(?:>=?|≥|above|over)\s*{_NUMBER}\s*(.*?)\s*$', re.I)
+_NAME = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_analyte(name):
+    """Return the analyte key for a name: lower case, runs of other characters as '_', at most 100 characters."""
+    return _NAME.sub('_', str(name).lower()).strip('_')[:100].rstrip('_')
+
+
+def _first(mapping, keys):
+    for key in keys:
+        if mapping.get(key) not in (None, ''):
+            return mapping[key]
+    return None
+
+
+def parse_value(value):
+    """Return (number, unit) for a JSON number or a string such as "5.8 mmol/L", or (None, '')."""
+    if isinstance(value, bool):
+        return None, ''
+    if isinstance(value, (int, float)):
+        return float(value), ''
+    match = _VALUE.match(str(value)) if isinstance(value, str) else None
+    if not match:
+        return None, ''
+    return float(match[1]), match[2][:30]
+
+
+def parse_range(text):
+    """Return (low, high, unit) for a reference range; a missing bound is None."""
+    text = str(text or '')
+    match = _BETWEEN.match(text)
+    if match:
+        return float(match[1]), float(match[2]), match[3][:30]
+    match = _UPPER.match(text)
+    if match:
+        return None, float(match[1]), match[2][:30]
+    match = _LOWER.match(text)
+    if match:
+        return float(match[1]), None, match[2][:30]
+    return None, None, ''
+
+
+def _named_ranges(normal_range):
+    """Return ({analyte: (low, high, unit)}, single range or None) from TestResult.normal_range."""
+    named, single = {}, None
+    for part in re.split(r'[;\n]', normal_range or ''):
+        name, colon, text = part.partition(':')
+        if colon:
+            named[normalize_analyte(name)] = parse_range(text)
+        elif part.strip() and single is None:
+            single = parse_range(part)
+    return named, single
+
+
+def _entries(values):
+    """Yield (name, raw value, details dict) for each entry of TestResult.values."""
+    if isinstance(values, dict):
+        for name, value in values.items():
+            if isinstance(value, dict):
+                yield name, _first(value, VALUE_KEYS), value
+            else:
+                yield name, value, {}
+    elif isinstance(values, list):
+        for item in values:
+            if isinstance(item, dict) and _first(item, NAME_KEYS) is not None:
+                yield _first(item, NAME_KEYS), _first(item, VALUE_KEYS), item
+
+
+def extract_values(test_result):
+    """Return unsaved AnalyteValue rows for the numeric values of a test result."""
+    named, single = _named_ranges(test_result.normal_range)
+    parsed = []
+    for name, raw, details in _entries(test_result.values):
+        analyte = normalize_analyte(name)
+        value, unit = parse_value(raw)
+        if value is None or not analyte:
+            continue
+        unit = str(_first(details, UNIT_KEYS) or unit)[:30]
+        low, high, range_unit = parse_range(_first(details, RANGE_KEYS))
+        low_value, _ = parse_value(_first(details, LOW_KEYS))
+        high_value, _ = parse_value(_first(details, HIGH_KEYS))
+        low = low_value if low_value is not None else low
+        high = high_value if high_value is not None else high
+        parsed.append([analyte, str(name)[:200], value, unit or range_unit, low, high])
+
+    rows = []
+    for analyte, name, value, unit, low, high in parsed:
+        if low is None and high is None:
+            fallback = named.get(analyte) or (single if len(parsed) == 1 else None)
+            if fallback:
+                low, high, range_unit = fallback
+                unit = unit or range_unit
+        rows.append(AnalyteValue(
+            test_result_id=test_result.pk, patient_id=test_result.patient_id,
+            test_date=test_result.test_date, analyte=analyte, name=name,
+            value=value, unit=unit, range_low=low, range_high=high,
+        ))
+    return rows
+
+
+def sync_analyte_values(test_results):
+    """Replace the analyte rows of saved test results with ones parsed from their current values."""
+    rows = [row for test_result in test_results for row in extract_values(test_result)]
+    with transaction.atomic():
+        AnalyteValue.objects.filter(test_result__in=[test_result.pk for test_result in test_results]).delete()
+        AnalyteValue.objects.bulk_create(rows)
+    return len(rows)
+
+
+def backfill(batch_size=1000):
+    """Re-extract every test result, batch_size at a time in primary key order; return (results, rows)."""
+    queryset = TestResult.objects.only('pk', *SOURCE_FIELDS).order_by('pk')
+    last_pk, results, rows = None, 0, 0
+    while True:
+        batch = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        batch = list(batch[:batch_size])
+        if not batch:
+            return results, rows
+        rows += sync_analyte_values(batch)
+        results += len(batch)
+        last_pk = batch[-1].pk
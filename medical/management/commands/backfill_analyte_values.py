@@ -0,0 +1,23 @@
+"""
+Extract the numeric values of every test result into AnalyteValue rows.
+
+Run once after deploying the analyte migration and after any change to
+test results that bypasses model signals (bulk_create, update(), raw SQL
+or loaddata). Each batch is rewritten in its own transaction, so the
+command can be stopped and run again.
+"""
+
+from django.core.management.base import BaseCommand
+
+from medical.labs import backfill
+
+
+class Command(BaseCommand):
+    help = 'Re-create the analyte value rows of all test results from their JSON values.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Test results read and written per batch.')
+
+    def handle(self, *args, **options):
+        results, rows = backfill(options['batch_size'])
+        self.stdout.write(f'Extracted {rows} analyte values from {results} test results.')
@@ -0,0 +1,120 @@
+"""
+Benchmark admin changelist pagination: COUNT(*) + OFFSET against keyset.
+
+Fills the appointment table with synthetic rows (default one million) and
+times loading page N both ways with the admin's ordering and page size.
+All rows are created inside a transaction that is rolled back at the end.
+"""
+
+import datetime
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+
+from medical.models import Appointment, Department, Doctor, Patient, Service
+from medical.pagination import KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET and keyset pagination of the appointment changelist (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Synthetic appointments to create.')
+        parser.add_argument(
+            '--pages', default='1,10,100,1000,5000',
+            help='Comma-separated page numbers to load.',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Loads per measurement.')
+
+    def handle(self, *args, **options):
+        pages = sorted(int(page) for page in options['pages'].split(','))
+        with transaction.atomic():
+            self._run(options['rows'], pages, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        department = Department.objects.create(name='Benchmark Department')
+        doctor = Doctor.objects.create(
+            first_name='Bench', last_name='Mark', phone='0700000000',
+            email='bench@example.com', license_number='BENCH-PAGE-0001',
+            specialization='general', department=department,
+        )
+        service = Service.objects.create(
+            name='Benchmark Consultation', category='consultation',
+            description='Synthetic service', duration_minutes=30, price=0,
+        )
+        patient = Patient.objects.create(
+            first_name='Bench', last_name='Patient', phone='0700000001',
+            email='patient@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+        )
+
+        first_day = datetime.date.today()
+        per_day = 40
+        batch = []
+        for number in range(rows):
+            minutes = 8 * 60 + (number % 20) * 30
+            batch.append(Appointment(
+                patient=patient, doctor=doctor, service=service,
+                appointment_date=first_day + datetime.timedelta(days=number // per_day),
+                appointment_time=datetime.time(minutes // 60, minutes % 60),
+                status='confirmed', reason_for_visit='Benchmark',
+            ))
+            if len(batch) >= 10000:
+                Appointment.objects.bulk_create(batch)
+                batch = []
+        Appointment.objects.bulk_create(batch)
+
+        # MySQL keeps InnoDB statistics current on its own (and ANALYZE TABLE
+        # would commit the transaction); elsewhere refresh them for estimates.
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Appointment._meta.db_table}')
+
+    def _time(self, load, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            count = load()
+        return (time.perf_counter() - started) * 1000 / repeat, count
+
+    def _run(self, rows, pages, repeat):
+        started = time.perf_counter()
+        self._seed(rows)
+        self.stdout.write(f'Seeded {rows} appointments in {time.perf_counter() - started:.1f}s')
+
+        model_admin = admin.site._registry[Appointment]
+        per_page = model_admin.list_per_page
+        queryset = (
+            Appointment.objects
+            .select_related(*model_admin.list_select_related)
+            .order_by(*model_admin.ordering)
+        )
+        cursor_paginator = KeysetPaginator(queryset, per_page)
+
+        self.stdout.write(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10} {'count':>9} {'estimate':>9}")
+        for number in pages:
+            if (number - 1) * per_page >= rows:
+                continue
+
+            def load_offset():
+                paginator = Paginator(queryset, per_page)
+                count = paginator.count
+                list(paginator.page(number).object_list)
+                return count
+
+            # The cursor is what the previous page's "Next" link carries.
+            after = None
+            if number > 1:
+                after = cursor_paginator.cursor_for(queryset[(number - 1) * per_page - 1])
+
+            def load_keyset():
+                paginator = KeysetPaginator(queryset, per_page, after=after)
+                count = paginator.count
+                list(paginator.page(number).object_list)
+                return count
+
+            offset_ms, count = self._time(load_offset, repeat)
+            keyset_ms, estimate = self._time(load_keyset, repeat)
+            self.stdout.write(f'{number:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f} {count:>9} {estimate:>9}')
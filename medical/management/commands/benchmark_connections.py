@@ -0,0 +1,73 @@
+"""
+Compare per-request database connection cost with and without CONN_MAX_AGE.
+
+Drives the slot lookup endpoint through the Django test client. The client
+deliberately skips close_old_connections, so it is called around each
+request here exactly as the WSGI handler does under gunicorn. The number
+of connections opened is counted via the connection_created signal.
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from medical.models import Department, Doctor
+
+
+class Command(BaseCommand):
+    help = 'Load test a DB-backed view with fresh versus persistent connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode.')
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE for the persistent run.')
+
+    def handle(self, *args, **options):
+        department = Department.objects.create(name='Connection Benchmark')
+        try:
+            doctor = Doctor.objects.create(
+                first_name='Conn', last_name='Bench', phone='0700000000',
+                email='conn@example.com', license_number='CONN-BENCH-0001',
+                specialization='general', department=department,
+                available_days='Mon,Tue,Wed,Thu,Fri,Sat,Sun',
+            )
+            day = datetime.date.today() + datetime.timedelta(days=1)
+            url = f"{reverse('appointment_slots')}?doctor={doctor.pk}&date={day.isoformat()}"
+            self._run(url, options['requests'], options['max_age'])
+        finally:
+            department.delete()
+
+    def _run(self, url, count, max_age):
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        original_max_age = connection.settings_dict['CONN_MAX_AGE']
+        connection_created.connect(count_connection)
+        self.stdout.write(f"{'CONN_MAX_AGE':>12} {'req/s':>8} {'ms/req':>8} {'connections':>12}")
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                client = Client()
+                for age in (0, max_age):
+                    connection.close()
+                    connection.settings_dict['CONN_MAX_AGE'] = age
+                    opened.clear()
+                    started = time.perf_counter()
+                    for _ in range(count):
+                        close_old_connections()
+                        client.get(url)
+                        close_old_connections()
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'{age:>12} {count / elapsed:>8.0f} {elapsed * 1000 / count:>8.3f} {len(opened):>12}'
+                    )
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original_max_age
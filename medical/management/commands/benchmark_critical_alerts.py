@@ -0,0 +1,95 @@
+"""
+Benchmark critical result alerting under a bulk lab update.
+
+Creates synthetic test results spread over a number of doctors, saves each
+of them as critical several times, as a lab integration resending results
+would, and then runs the alert worker once the debounce period has passed.
+Reports the cost of the alert bookkeeping per save and how many digests
+were queued compared with one email per save. All rows are created inside
+a transaction that is rolled back at the end.
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from medical import alerts
+from medical.models import CriticalResultAlert, Department, Doctor, OutboundEmail, Patient, TestResult
+
+
+class Command(BaseCommand):
+    help = 'Save many critical test results and count the doctor digests they produce (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=5000, help='Synthetic test results to save as critical.')
+        parser.add_argument('--doctors', type=int, default=20, help='Doctors to spread them over.')
+        parser.add_argument('--saves', type=int, default=3, help='Times each result is saved.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['results'], options['doctors'], options['saves'])
+            transaction.set_rollback(True)
+
+    def _seed(self, results, doctors):
+        department = Department.objects.create(name='Alert Benchmark')
+        doctor_list = [
+            Doctor.objects.create(
+                first_name='Bench', last_name=f'Doctor{number}', phone='0700000000',
+                email=f'doctor{number}@example.com', license_number=f'BENCH-ALERTS-{number:04d}',
+                specialization='general', department=department,
+            )
+            for number in range(doctors)
+        ]
+        patients = Patient.objects.bulk_create([
+            Patient(
+                first_name='Bench', last_name=f'Patient{number}', phone='0700000001',
+                email='patient@example.com', date_of_birth=datetime.date(1970, 1, 1), gender='O',
+            )
+            for number in range(max(results // 5, 1))
+        ])
+        return TestResult.objects.bulk_create([
+            TestResult(
+                patient=patients[number % len(patients)], doctor=doctor_list[number % doctors],
+                test_name='Potassium', test_type='blood', status='in_progress',
+                interpretation='Potassium 6.9 mmol/L',
+            )
+            for number in range(results)
+        ], batch_size=2000)
+
+    def _run(self, results, doctors, saves):
+        test_results = self._seed(results, doctors)
+        emails_before = OutboundEmail.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            test_results[0].result_status = 'critical'
+            test_results[0].save(update_fields=['result_status'])
+        alert_queries = sum(1 for query in queries if 'criticalresultalert' in query['sql'])
+
+        started = time.perf_counter()
+        for _ in range(saves):
+            for test_result in test_results:
+                test_result.status = 'completed'
+                test_result.result_status = 'critical'
+                test_result.save(update_fields=['status', 'result_status', 'updated_at'])
+        save_seconds = time.perf_counter() - started
+        pending = CriticalResultAlert.objects.filter(status='pending').count()
+
+        started = time.perf_counter()
+        later = timezone.now() + datetime.timedelta(days=1)
+        digests, reported = alerts.process_alerts(later)
+        process_ms = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f'{results * saves} saves of {results} results in {save_seconds:.1f}s '
+            f'({save_seconds * 1e6 / (results * saves):.0f} us each, {alert_queries} alert queries per save)'
+        )
+        self.stdout.write(f'{pending} pending alert(s) after the saves')
+        self.stdout.write(
+            f'{digests} digest(s) for {reported} result(s) queued in {process_ms:.0f} ms '
+            f'({OutboundEmail.objects.count() - emails_before} outbox rows, '
+            f'instead of {results * saves} emails sent while saving)'
+        )
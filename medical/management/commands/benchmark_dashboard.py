@@ -0,0 +1,115 @@
+"""
+Benchmark the clinic dashboard: rollup tables against scanning appointments.
+
+Fills the appointment table with synthetic history (default one million
+rows over two years), builds the rollups, and times the dashboard report
+both from the rollups and computed directly from the appointment table.
+All rows are created inside a transaction that is rolled back at the end.
+"""
+
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from medical import reporting
+from medical.models import Appointment, AppointmentRollup, Department, Doctor, Patient, Service
+
+
+class Command(BaseCommand):
+    help = 'Compare dashboard reports from the rollups with the same reports over appointments (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Synthetic appointments to create.')
+        parser.add_argument('--days', type=int, default=730, help='Days of history to spread them over.')
+        parser.add_argument('--repeat', type=int, default=5, help='Reports per measurement.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['rows'], options['days'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, rows, days):
+        random.seed(0)
+        department = Department.objects.create(name='Dashboard Benchmark')
+        doctors = [
+            Doctor.objects.create(
+                first_name='Bench', last_name=f'Doctor{number}', phone='0700000000',
+                email='bench@example.com', license_number=f'BENCH-DASH-{number:04d}',
+                specialization='general', department=department, consultation_fee=Decimal('500.00'),
+            )
+            for number in range(20)
+        ]
+        services = [
+            Service.objects.create(
+                name=f'Benchmark Service {number}', category='consultation',
+                description='Synthetic service', duration_minutes=30, price=Decimal(1000 + number * 250),
+            )
+            for number in range(10)
+        ]
+        patient = Patient.objects.create(
+            first_name='Bench', last_name='Patient', phone='0700000001',
+            email='patient@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+        )
+        statuses = ['completed'] * 6 + ['cancelled', 'no_show', 'confirmed', 'pending']
+        first_day = datetime.date.today() - datetime.timedelta(days=days - 1)
+        batch = []
+        for number in range(rows):
+            doctor, service, status = random.choice(doctors), random.choice(services), random.choice(statuses)
+            batch.append(Appointment(
+                patient=patient, doctor=doctor, service=service,
+                appointment_date=first_day + datetime.timedelta(days=number % days),
+                appointment_time=datetime.time(8 + number % 10), status=status,
+                revenue=service.price + doctor.consultation_fee if status == 'completed' else None,
+                reason_for_visit='Benchmark',
+            ))
+            if len(batch) >= 10000:
+                Appointment.objects.bulk_create(batch)
+                batch = []
+        Appointment.objects.bulk_create(batch)
+
+    def _direct_report(self, start, end):
+        """The dashboard figures computed from the appointment table itself."""
+        appointments = Appointment.objects.filter(appointment_date__gte=start, appointment_date__lte=end)
+        completed = Q(status='completed')
+        sums = {
+            'appointment_count': Count('id'),
+            'completed_count': Count('id', filter=completed),
+            'cancelled_count': Count('id', filter=Q(status='cancelled')),
+            'no_show_count': Count('id', filter=Q(status='no_show')),
+            'revenue_total': Sum('revenue', filter=completed),
+        }
+        return {
+            'totals': appointments.aggregate(**sums),
+            'by_doctor': list(appointments.values('doctor_id', 'doctor__first_name', 'doctor__last_name').annotate(**sums).order_by()),
+            'by_service': list(appointments.values('service_id', 'service__name').annotate(**sums).order_by()),
+            'by_day': list(appointments.values('appointment_date').annotate(**sums).order_by()),
+        }
+
+    def _time(self, report, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            report()
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    def _run(self, rows, days, repeat):
+        started = time.perf_counter()
+        self._seed(rows, days)
+        self.stdout.write(f'Seeded {rows} appointments in {time.perf_counter() - started:.1f}s')
+        started = time.perf_counter()
+        reporting.rebuild()
+        self.stdout.write(
+            f'Built {AppointmentRollup.objects.count()} rollup rows in {time.perf_counter() - started:.1f}s'
+        )
+
+        end = datetime.date.today()
+        self.stdout.write(f"{'period':>8} {'appointments ms':>16} {'rollups ms':>11}")
+        for period in (7, 30, 365):
+            start = end - datetime.timedelta(days=period - 1)
+            direct_ms = self._time(lambda: self._direct_report(start, end), repeat)
+            rollup_ms = self._time(lambda: reporting.dashboard(start, end), repeat)
+            self.stdout.write(f'{period:>7}d {direct_ms:>16.1f} {rollup_ms:>11.1f}')
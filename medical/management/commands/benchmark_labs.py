@@ -0,0 +1,134 @@
+"""
+Benchmark lab queries on the analyte table against decoding TestResult.values.
+
+Creates synthetic test results (default 50,000 panels over 2,000 patients,
+five analytes each) with their analyte rows, then times finding every
+high or low potassium reading and one patient's HbA1c trend, both by
+reading and parsing the JSON of every test result and through
+AnalyteValue's indexed queries. All rows are created inside a transaction
+that is rolled back at the end.
+"""
+
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from medical import labs
+from medical.models import AnalyteValue, Department, Doctor, Patient, TestResult
+
+
+# analyte: (unit, low, high, typical value)
+PANEL = {
+    'Potassium': ('mmol/L', 3.5, 5.1, 4.3),
+    'Sodium': ('mmol/L', 135, 145, 140),
+    'Creatinine': ('umol/L', 60, 110, 85),
+    'Glucose': ('mmol/L', 3.9, 7.8, 5.5),
+    'HbA1c': ('%', None, 5.7, 5.4),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare lab queries on the analyte table with decoding test result JSON (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=50000, help='Synthetic test results to create.')
+        parser.add_argument('--patients', type=int, default=2000, help='Patients to spread them over.')
+        parser.add_argument('--repeat', type=int, default=5, help='Queries per measurement.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['results'], options['patients'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, results, patients):
+        random.seed(0)
+        department = Department.objects.create(name='Lab Benchmark')
+        doctor = Doctor.objects.create(
+            first_name='Bench', last_name='Doctor', phone='0700000000', email='bench@example.com',
+            license_number='BENCH-LABS-0001', specialization='general', department=department,
+        )
+        patient_ids = [
+            patient.pk for patient in Patient.objects.bulk_create([
+                Patient(
+                    first_name='Bench', last_name=f'Patient{number}', phone='0700000001',
+                    email='patient@example.com', date_of_birth=datetime.date(1970, 1, 1), gender='O',
+                )
+                for number in range(patients)
+            ])
+        ]
+        first_day = datetime.date.today() - datetime.timedelta(days=730)
+        batch = []
+        for number in range(results):
+            values = {
+                name: {'value': round(random.gauss(typical, typical * 0.12), 1), 'unit': unit}
+                for name, (unit, low, high, typical) in PANEL.items()
+            }
+            batch.append(TestResult(
+                patient_id=patient_ids[number % patients], doctor=doctor, test_name='Metabolic panel',
+                test_type='blood', status='completed', test_date=first_day + datetime.timedelta(days=number % 730),
+                values=values,
+                normal_range='; '.join(
+                    f'{name}: {low}-{high}' if low is not None else f'{name}: <{high}'
+                    for name, (unit, low, high, typical) in PANEL.items()
+                ),
+            ))
+            if len(batch) >= 5000:
+                TestResult.objects.bulk_create(batch)
+                batch = []
+        TestResult.objects.bulk_create(batch)
+        return patient_ids[0]
+
+    def _json_abnormal(self, analyte):
+        """High or low readings of analyte found by decoding every test result's values."""
+        found = []
+        for test_result in TestResult.objects.only(*labs.SOURCE_FIELDS).iterator(chunk_size=2000):
+            for row in labs.extract_values(test_result):
+                if row.analyte == analyte and (
+                    (row.range_low is not None and row.value < row.range_low)
+                    or (row.range_high is not None and row.value > row.range_high)
+                ):
+                    found.append(row)
+        return found
+
+    def _json_trend(self, patient_id, analyte):
+        readings = []
+        for test_result in TestResult.objects.filter(patient_id=patient_id).only(*labs.SOURCE_FIELDS):
+            readings += [row for row in labs.extract_values(test_result) if row.analyte == analyte]
+        return sorted(readings, key=lambda row: row.test_date)
+
+    def _time(self, query, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            count = len(query())
+        return (time.perf_counter() - started) * 1000 / repeat, count
+
+    def _run(self, results, patients, repeat):
+        started = time.perf_counter()
+        patient_id = self._seed(results, patients)
+        self.stdout.write(f'Seeded {results} test results in {time.perf_counter() - started:.1f}s')
+        started = time.perf_counter()
+        _, rows = labs.backfill()
+        self.stdout.write(f'Extracted {rows} analyte values in {time.perf_counter() - started:.1f}s')
+
+        queries = [
+            (
+                'abnormal potassium',
+                lambda: self._json_abnormal('potassium'),
+                lambda: list(AnalyteValue.objects.abnormal('potassium')),
+            ),
+            (
+                'HbA1c trend',
+                lambda: self._json_trend(patient_id, 'hba1c'),
+                lambda: list(AnalyteValue.objects.trend(patient_id, 'hba1c')),
+            ),
+        ]
+        self.stdout.write(f"{'query':<20} {'rows':>6} {'JSON ms':>10} {'analyte table ms':>17}")
+        for label, json_query, table_query in queries:
+            json_ms, count = self._time(json_query, max(repeat // 5, 1))
+            table_ms, table_count = self._time(table_query, repeat)
+            if count != table_count:
+                self.stderr.write(f'{label}: {count} rows from JSON, {table_count} from the analyte table')
+            self.stdout.write(f'{label:<20} {table_count:>6} {json_ms:>10.1f} {table_ms:>17.1f}')
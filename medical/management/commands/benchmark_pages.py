@@ -0,0 +1,46 @@
+"""
+Benchmark the marketing pages with and without the page cache.
+
+Uses the Django test client, so it measures the full middleware and view
+stack in-process without a network server.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+# The contact and appointment pages carry a CSRF token, so they are never cached.
+PAGES = ['home', 'about', 'services']
+
+
+class Command(BaseCommand):
+    help = 'Report requests/sec for the marketing pages before and after page caching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per page and mode.')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        self.stdout.write(f"{'page':<14} {'uncached r/s':>13} {'cached r/s':>11} {'304 r/s':>9}")
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            for name in PAGES:
+                url = reverse(name)
+                with override_settings(PAGE_CACHE_TIMEOUT=0):
+                    uncached = self._rate(client, url, count)
+                cache.clear()
+                cached = self._rate(client, url, count)
+                etag = client.get(url)['ETag']
+                revalidated = self._rate(client, url, count, HTTP_IF_NONE_MATCH=etag)
+                self.stdout.write(f'{name:<14} {uncached:>13.0f} {cached:>11.0f} {revalidated:>9.0f}')
+
+    def _rate(self, client, url, count, **headers):
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(url, **headers)
+        return count / (time.perf_counter() - started)
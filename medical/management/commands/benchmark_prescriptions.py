@@ -0,0 +1,110 @@
+"""
+Benchmark the nightly prescription scheduler.
+
+Creates active prescriptions (default one million) with end dates spread
+from two months ago to a year ahead and zero to three refills, then times
+a scheduler run, a second run that finds nothing left to do, and, on a
+sample of the same work, saving each due prescription one by one. All
+rows are created inside a transaction that is rolled back at the end.
+"""
+
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from medical import prescriptions
+from medical.models import Department, Doctor, MedicalRecord, Patient, Prescription
+
+
+class Command(BaseCommand):
+    help = 'Time the prescription scheduler on synthetic active prescriptions (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prescriptions', type=int, default=1000000, help='Active prescriptions to create.')
+        parser.add_argument('--patients', type=int, default=10000, help='Patients to spread them over.')
+        parser.add_argument('--batch-size', type=int, default=prescriptions.BATCH_SIZE, help='Prescriptions per UPDATE.')
+        parser.add_argument('--sample', type=int, default=2000, help='Prescriptions saved one by one for comparison.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['prescriptions'], options['patients'], options['batch_size'], options['sample'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count, patients, today):
+        random.seed(0)
+        department = Department.objects.create(name='Prescription Benchmark')
+        doctor = Doctor.objects.create(
+            first_name='Bench', last_name='Doctor', phone='0700000000', email='bench@example.com',
+            license_number='BENCH-RX-0001', specialization='general', department=department,
+        )
+        patient_list = Patient.objects.bulk_create([
+            Patient(
+                first_name='Bench', last_name=f'Patient{number}', phone='0700000001',
+                email='patient@example.com', date_of_birth=datetime.date(1970, 1, 1), gender='O',
+            )
+            for number in range(patients)
+        ], batch_size=5000)
+        records = MedicalRecord.objects.bulk_create([
+            MedicalRecord(patient=patient, doctor=doctor, record_type='consultation', diagnosis='Benchmark')
+            for patient in patient_list
+        ], batch_size=5000)
+        batch = []
+        for number in range(count):
+            record = records[number % patients]
+            end_date = today + datetime.timedelta(days=random.randint(-60, 365))
+            batch.append(Prescription(
+                patient_id=record.patient_id, doctor=doctor, medical_record=record,
+                medication_name='Benchmark', dosage='1', frequency='1', duration='30 days',
+                instructions='Benchmark', start_date=end_date - datetime.timedelta(days=30),
+                end_date=end_date, refills_remaining=random.randint(0, 3),
+            ))
+            if len(batch) >= 10000:
+                Prescription.objects.bulk_create(batch)
+                batch = []
+        Prescription.objects.bulk_create(batch)
+
+    def _save_one_by_one(self, today, sample):
+        """Apply the same transitions to up to sample due prescriptions with save(); return seconds per row."""
+        rows = list(Prescription.objects.ended(today)[:sample // 2])
+        rows += list(Prescription.objects.refills_due(today)[:sample - len(rows)])
+        started = time.perf_counter()
+        with transaction.atomic():
+            for prescription in rows:
+                if prescription.end_date < today and prescription.refills_remaining == 0:
+                    prescription.status = 'completed'
+                else:
+                    prescription.refill_flagged_for = prescription.end_date
+                prescription.save()
+            transaction.set_rollback(True)
+        return (time.perf_counter() - started) / max(len(rows), 1)
+
+    def _run(self, count, patients, batch_size, sample):
+        today = timezone.localdate()
+        started = time.perf_counter()
+        self._seed(count, patients, today)
+        self.stdout.write(f'Seeded {count} active prescriptions in {time.perf_counter() - started:.1f}s')
+
+        per_row = self._save_one_by_one(today, sample)
+        started = time.perf_counter()
+        counts = prescriptions.run_scheduler(today, batch_size=batch_size)
+        first = time.perf_counter() - started
+        changed = counts['completed'] + counts['refills_flagged']
+        started = time.perf_counter()
+        again = prescriptions.run_scheduler(today, batch_size=batch_size)
+        second = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Scheduler: completed {counts['completed']}, flagged {counts['refills_flagged']} refills "
+            f'in {first:.1f}s ({changed / max(first, 1e-9):,.0f} rows/s)'
+        )
+        self.stdout.write(
+            f"Second run: {again['completed'] + again['refills_flagged']} changes in {second:.2f}s"
+        )
+        self.stdout.write(
+            f'Saving one by one: {per_row * 1000:.2f} ms per prescription, '
+            f'about {per_row * changed:.0f}s for the same {changed} changes'
+        )
@@ -0,0 +1,125 @@
+"""
+Benchmark the appointment reminder pipeline at a steady daily volume.
+
+Creates enough appointments for --per-day reminders a day (default
+50,000, two buckets per appointment) over several days, times scheduling
+their reminders, then replays the reminder worker slot by slot with a
+simulated clock and the in-memory LocalTransport. Reports throughput per
+simulated day and the time each slot's pass took against the length of
+the slot. All rows are created inside a transaction that is rolled back at
+the end.
+"""
+
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from medical import reminders
+from medical.models import Appointment, AppointmentReminder, Department, Doctor, Patient, Service
+
+
+# Appointments are booked from 07:00 to 18:55, one every SLOT_MINUTES per doctor.
+FIRST_HOUR, LAST_HOUR = 7, 19
+
+
+class CountingTransport(reminders.LocalTransport):
+    """LocalTransport that also counts what it was handed."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_batch(self, messages):
+        self.sent += len(messages)
+        return super().send_batch(messages)
+
+
+class Command(BaseCommand):
+    help = 'Replay a steady daily reminder volume slot by slot and report throughput (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-day', type=int, default=50000, help='Reminders to send per day.')
+        parser.add_argument('--days', type=int, default=3, help='Days of appointments.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Reminders handed to the transport at once.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['per_day'], options['days'], options['batch_size'])
+            transaction.set_rollback(True)
+
+    def _seed(self, per_day, days, first_day):
+        per_doctor = (LAST_HOUR - FIRST_HOUR) * 60 // reminders.SLOT_MINUTES
+        appointments_per_day = per_day // len(reminders.BUCKET_OFFSETS)
+        doctor_count = -(-appointments_per_day // per_doctor)
+        department = Department.objects.create(name='Reminder Benchmark')
+        doctors = [
+            Doctor.objects.create(
+                first_name='Bench', last_name=f'Doctor{number}', phone='0700000000',
+                email='bench@example.com', license_number=f'BENCH-REMIND-{number:04d}',
+                specialization='general', department=department,
+            )
+            for number in range(doctor_count)
+        ]
+        service = Service.objects.create(
+            name='Reminder Benchmark', category='consultation', description='Synthetic service', price=0,
+        )
+        patients = Patient.objects.bulk_create([
+            Patient(
+                first_name='Bench', last_name=f'Patient{number}', phone=f'07{number:08d}',
+                email='patient@example.com', date_of_birth=datetime.date(1970, 1, 1), gender='O',
+            )
+            for number in range(appointments_per_day)
+        ], batch_size=5000)
+        batch = []
+        for day in range(days):
+            for number in range(appointments_per_day):
+                minutes = FIRST_HOUR * 60 + (number // doctor_count) * reminders.SLOT_MINUTES
+                batch.append(Appointment(
+                    patient=patients[number], doctor=doctors[number % doctor_count], service=service,
+                    appointment_date=first_day + datetime.timedelta(days=day),
+                    appointment_time=datetime.time(minutes // 60, minutes % 60),
+                    status='confirmed', reason_for_visit='Benchmark',
+                ))
+        return Appointment.objects.bulk_create(batch, batch_size=5000)
+
+    def _run(self, per_day, days, batch_size):
+        now = timezone.now()
+        first_day = timezone.localdate(now) + datetime.timedelta(days=2)
+        started = time.perf_counter()
+        appointments = self._seed(per_day, days, first_day)
+        self.stdout.write(f'Seeded {len(appointments)} appointments in {time.perf_counter() - started:.1f}s')
+
+        started = time.perf_counter()
+        reminders.schedule_reminders(appointments, now)
+        scheduled = AppointmentReminder.objects.filter(appointment__in=appointments).count()
+        self.stdout.write(f'Scheduled {scheduled} reminders in {time.perf_counter() - started:.1f}s')
+
+        transport = CountingTransport()
+        slot = datetime.timedelta(minutes=reminders.SLOT_MINUTES)
+        clock = reminders.next_send_at()
+        by_day, slot_ms = {}, []
+        while clock is not None:
+            sent_before = transport.sent
+            started = time.perf_counter()
+            sent, failed, skipped = reminders.process_due(batch_size, clock, transport)
+            elapsed = time.perf_counter() - started
+            day = by_day.setdefault(timezone.localdate(clock), [0, 0.0])
+            day[0] += transport.sent - sent_before
+            day[1] += elapsed
+            slot_ms.append((elapsed * 1000, sent))
+            clock = reminders.next_send_at()
+
+        self.stdout.write(f"{'send day':<12} {'reminders':>10} {'busy s':>8} {'reminders/s':>12}")
+        for day, (count, seconds) in sorted(by_day.items()):
+            self.stdout.write(f'{day.isoformat():<12} {count:>10} {seconds:>8.1f} {count / max(seconds, 1e-9):>12,.0f}')
+        timings = sorted(ms for ms, _ in slot_ms)
+        busiest = max(slot_ms, key=lambda item: item[1])
+        self.stdout.write(
+            f'{len(slot_ms)} slot passes: median {statistics.median(timings):.0f} ms, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.0f} ms, max {timings[-1]:.0f} ms '
+            f'(busiest slot: {busiest[1]} reminders in {busiest[0]:.0f} ms; a slot lasts {slot.total_seconds():.0f} s)'
+        )
+        self.stdout.write(f'{transport.sent} of {scheduled} reminders sent')
@@ -0,0 +1,89 @@
+"""
+Benchmark admin search: substring search_fields against the search index.
+
+Fills the patient table with synthetic rows (default 500,000), indexes them
+and times the patient changelist search both ways. All rows are created
+inside a transaction that is rolled back at the end.
+"""
+
+import datetime
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from medical.models import Patient
+from medical.search import get_search_backend, search_queryset
+
+
+FIRST_NAMES = ['Amina', 'Brian', 'Cynthia', 'David', 'Esther', 'Felix', 'Grace', 'Hassan', 'Irene', 'James']
+LAST_NAMES = ['Achieng', 'Barasa', 'Chege', 'Kamau', 'Mwangi', 'Njoroge', 'Odhiambo', 'Otieno', 'Wanjiru', 'Wekesa']
+
+
+class Command(BaseCommand):
+    help = 'Compare substring and indexed admin search on a large patient table (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=500000, help='Synthetic patients to create.')
+        parser.add_argument('--repeat', type=int, default=5, help='Searches per measurement.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['patients'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, total):
+        batch = []
+        for number in range(total):
+            first_name = FIRST_NAMES[number % len(FIRST_NAMES)]
+            last_name = f'{LAST_NAMES[number // len(FIRST_NAMES) % len(LAST_NAMES)]}{number}'
+            batch.append(Patient(
+                first_name=first_name, last_name=last_name,
+                phone=f'07{number:08d}', email=f'{first_name.lower()}.{number}@example.com',
+                date_of_birth=datetime.date(1990, 1, 1), gender='O',
+                insurance_policy_number=f'POL{number:07d}',
+            ))
+            if len(batch) >= 5000:
+                Patient.objects.bulk_create(batch)
+                batch = []
+        Patient.objects.bulk_create(batch)
+
+    def _time(self, search, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            queryset = search()
+            count = queryset.count()
+            list(queryset[:100])
+        return (time.perf_counter() - started) * 1000 / repeat, count
+
+    def _run(self, total, repeat):
+        started = time.perf_counter()
+        self._seed(total)
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(
+            f'Seeded and indexed {total} patients with {type(backend).__name__} '
+            f'in {time.perf_counter() - started:.1f}s'
+        )
+
+        model_admin = admin.site._registry[Patient]
+        queryset = Patient.objects.all()
+        middle = total // 2
+        terms = [
+            f'{LAST_NAMES[middle // len(FIRST_NAMES) % len(LAST_NAMES)]}{middle}',
+            f'{FIRST_NAMES[middle % len(FIRST_NAMES)]} {LAST_NAMES[middle // len(FIRST_NAMES) % len(LAST_NAMES)]}{middle}',
+            f'POL{middle:07d}',
+            f'+2547{middle:08d}',
+            f'07{middle:08d}',
+        ]
+
+        self.stdout.write(f"{'term':>28} {'substring ms':>13} {'index ms':>9} {'hits':>5} {'indexed':>7}")
+        for term in terms:
+            substring_ms, substring_count = self._time(
+                lambda: admin.ModelAdmin.get_search_results(model_admin, None, queryset, term)[0], repeat,
+            )
+            index_ms, index_count = self._time(lambda: search_queryset(queryset, term), repeat)
+            self.stdout.write(
+                f'{term:>28} {substring_ms:>13.2f} {index_ms:>9.2f} {substring_count:>5} {index_count:>7}'
+            )
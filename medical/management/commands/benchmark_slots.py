@@ -0,0 +1,87 @@
+"""
+Benchmark the appointment slot engine against a growing appointment table.
+
+All synthetic rows are created inside a transaction that is rolled back at
+the end, so the command is safe to run against a development database.
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from medical.models import Appointment, Department, Doctor, Patient, Service
+from medical.scheduling import get_available_slots
+
+
+class Command(BaseCommand):
+    help = 'Measure slot lookup time as the appointment table grows (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma-separated appointment counts per doctor to measure at.',
+        )
+        parser.add_argument('--repeat', type=int, default=200, help='Lookups per measurement.')
+        parser.add_argument('--per-day', type=int, default=16, help='Bookings per synthetic day.')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with transaction.atomic():
+            self._run(sizes, options['repeat'], options['per_day'])
+            transaction.set_rollback(True)
+
+    def _run(self, sizes, repeat, per_day):
+        department = Department.objects.create(name='Benchmark Department')
+        doctor = Doctor.objects.create(
+            first_name='Bench', last_name='Mark', phone='0700000000',
+            email='bench@example.com', license_number='BENCH-0001',
+            specialization='general', department=department,
+            available_days='Mon,Tue,Wed,Thu,Fri,Sat,Sun',
+            available_time_start=datetime.time(8, 0),
+            available_time_end=datetime.time(18, 0),
+        )
+        service = Service.objects.create(
+            name='Benchmark Consultation', category='consultation',
+            description='Synthetic service', duration_minutes=30, price=0,
+        )
+        patient = Patient.objects.create(
+            first_name='Bench', last_name='Patient', phone='0700000001',
+            email='patient@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+        )
+
+        target_day = datetime.date.today() + datetime.timedelta(days=1)
+        first_day = target_day
+        created = 0
+
+        self.stdout.write(f"{'appointments':>14} {'mean ms':>10} {'queries':>8} {'slots':>6}")
+        for size in sizes:
+            batch = []
+            while created < size:
+                day = first_day + datetime.timedelta(days=created // per_day)
+                minutes = 8 * 60 + (created % per_day) * 30
+                batch.append(Appointment(
+                    patient=patient, doctor=doctor, service=service,
+                    appointment_date=day,
+                    appointment_time=datetime.time(minutes // 60, minutes % 60),
+                    end_time=datetime.time((minutes + 30) // 60, (minutes + 30) % 60),
+                    status='confirmed', reason_for_visit='Benchmark',
+                ))
+                created += 1
+                if len(batch) >= 5000:
+                    Appointment.objects.bulk_create(batch)
+                    batch = []
+            Appointment.objects.bulk_create(batch)
+
+            with CaptureQueriesContext(connection) as queries:
+                slots = get_available_slots(doctor, target_day, service)
+            query_count = len(queries)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                get_available_slots(doctor, target_day, service)
+            mean_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            self.stdout.write(f'{size:>14} {mean_ms:>10.3f} {query_count:>8} {len(slots):>6}')
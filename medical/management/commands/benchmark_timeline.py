@@ -0,0 +1,136 @@
+"""
+Benchmark the patient timeline against loading a patient's whole history.
+
+Creates patients with growing histories (appointments, medical records,
+prescriptions and test results spread evenly) and times the first and a
+middle page of medical.timeline, with their query counts, next to reading
+all four tables for the patient and sorting in Python. All rows are created
+inside a transaction that is rolled back at the end.
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from medical import timeline
+from medical.models import (
+    Appointment, Department, Doctor, MedicalRecord, Patient, Prescription,
+    Service, TestResult,
+)
+
+
+class Command(BaseCommand):
+    help = 'Time timeline pages for patients with short and long histories (data is rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+            help='History lengths (entries per patient) to measure.',
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Reads per measurement.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['sizes'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, entries, doctors, service):
+        patient = Patient.objects.create(
+            first_name='Bench', last_name=f'History{entries}', phone='0700000001',
+            email='patient@example.com', date_of_birth=datetime.date(1960, 1, 1), gender='O',
+        )
+        first_day = datetime.date.today() - datetime.timedelta(days=3650)
+        per_source = entries // 4
+
+        def day(number):
+            return first_day + datetime.timedelta(days=number * 3650 // per_source)
+
+        def doctor(number):
+            return doctors[number % len(doctors)]
+
+        Appointment.objects.bulk_create([
+            Appointment(
+                patient=patient, doctor=doctor(number), service=service, appointment_date=day(number),
+                appointment_time=datetime.time(9), end_time=datetime.time(9, 30),
+                status='completed', reason_for_visit='Benchmark',
+            )
+            for number in range(per_source)
+        ], batch_size=2000)
+        records = MedicalRecord.objects.bulk_create([
+            MedicalRecord(
+                patient=patient, doctor=doctor(number), record_type='consultation',
+                diagnosis='Benchmark', record_date=day(number),
+            )
+            for number in range(per_source)
+        ], batch_size=2000)
+        Prescription.objects.bulk_create([
+            Prescription(
+                patient=patient, doctor=doctor(number), medical_record=records[number],
+                medication_name='Benchmark', dosage='1', frequency='1', duration='1',
+                instructions='Benchmark', prescribed_date=day(number),
+            )
+            for number in range(per_source)
+        ], batch_size=2000)
+        TestResult.objects.bulk_create([
+            TestResult(
+                patient=patient, doctor=doctor(number), test_name='Benchmark',
+                test_type='Benchmark', test_date=day(number),
+            )
+            for number in range(per_source)
+        ], batch_size=2000)
+        return patient
+
+    def _full_history(self, patient):
+        """Every entry of all four tables for the patient, sorted newest first in Python."""
+        entries = []
+        for rank, source in enumerate(timeline.SOURCES):
+            rows = source.model.objects.filter(patient=patient).select_related(*source.related)
+            entries += [timeline.Entry(source, rank, obj) for obj in rows]
+        entries.sort(key=timeline.Entry.sort_key, reverse=True)
+        return entries[:timeline.PAGE_SIZE]
+
+    def _time(self, read, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            read()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            read()
+        return (time.perf_counter() - started) * 1000 / repeat, len(queries)
+
+    def _run(self, sizes, repeat):
+        department = Department.objects.create(name='Timeline Benchmark')
+        doctors = [
+            Doctor.objects.create(
+                first_name='Bench', last_name=f'Doctor{number}', phone='0700000000',
+                email='bench@example.com', license_number=f'BENCH-TIMELINE-{number:02d}',
+                specialization='general', department=department,
+            )
+            for number in range(10)
+        ]
+        service = Service.objects.create(
+            name='Timeline Benchmark', category='consultation', description='Synthetic service', price=0,
+        )
+        self.stdout.write(
+            f"{'entries':>8} {'first page ms':>14} {'queries':>8} {'middle page ms':>15} {'full history ms':>16}"
+        )
+        for entries in sizes:
+            patient = self._seed(entries, doctors, service)
+            first_ms, queries = self._time(lambda: list(timeline.TimelinePage(patient.pk)), repeat)
+            middle = self._middle_cursor(patient, entries)
+            middle_ms, _ = self._time(lambda: list(timeline.TimelinePage(patient.pk, middle)), repeat)
+            full_ms, _ = self._time(lambda: self._full_history(patient), max(repeat // 10, 1))
+            self.stdout.write(f'{entries:>8} {first_ms:>14.2f} {queries:>8} {middle_ms:>15.2f} {full_ms:>16.1f}')
+
+    def _middle_cursor(self, patient, entries):
+        """Follow next_cursor halfway through the history."""
+        cursor = None
+        for _ in range(entries // 2 // timeline.PAGE_SIZE):
+            page = timeline.TimelinePage(patient.pk, cursor)
+            list(page)
+            if not page.next_cursor:
+                break
+            cursor = timeline.parse_cursor(page.next_cursor)
+        return cursor
@@ -0,0 +1,68 @@
+"""
+Generate responsive image derivatives at deploy time.
+
+Each source under MEDIA_ROOT/<source-dir> is resized to the fixed widths in
+medical.images.DERIVATIVE_WIDTHS and encoded to every supported format in a
+process pool; the manifest read by the responsive_image tag is then rewritten.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from medical.images import (
+    DERIVATIVE_WIDTHS, SOURCE_EXTENSIONS, available_formats, build_derivatives,
+    load_image_meta, write_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = 'Build resized WebP/AVIF/JPEG variants of media images and their manifest.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source-dir', default='images', help='Directory under MEDIA_ROOT to process.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes.')
+        parser.add_argument(
+            '--widths', default=','.join(str(width) for width in DERIVATIVE_WIDTHS),
+            help='Comma-separated output widths.',
+        )
+        parser.add_argument('--force', action='store_true', help='Re-encode variants that already exist.')
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT)
+        source_dir = media_root / options['source_dir']
+        if not source_dir.is_dir():
+            raise CommandError(f'{source_dir} does not exist.')
+
+        widths = tuple(sorted(int(width) for width in options['widths'].split(',')))
+        formats = available_formats()
+        meta = load_image_meta(source_dir / 'image_meta.json')
+        sources = sorted(
+            path for path in source_dir.iterdir()
+            if path.suffix.lower() in SOURCE_EXTENSIONS
+        )
+        jobs = [
+            (
+                str(media_root),
+                path.relative_to(media_root).as_posix(),
+                meta.get(path.name),
+                widths,
+                formats,
+                options['force'],
+            )
+            for path in sources
+        ]
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            entries = dict(pool.map(build_derivatives, jobs))
+
+        write_manifest(entries)
+        variant_count = sum(
+            len(variants) for entry in entries.values() for variants in entry['variants'].values()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(entries)} image(s), {variant_count} variant(s) in {', '.join(formats)}."
+        ))
@@ -0,0 +1,129 @@
+"""
+Check that medical admin changelists issue a constant number of queries.
+
+Each changelist is rendered against a small and a larger set of synthetic
+rows (created inside a transaction that is rolled back) and the query
+counts are compared; any growth with the row count means an N+1 pattern.
+With the larger set, the changelist, add and change views are also run
+under the repeated-query detector (clinicproject.queries), which names the
+code and template line behind any query repeated --threshold times.
+"""
+
+import datetime
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from clinicproject.queries import QueryInspector, n_plus_one_message
+from medical.models import (
+    Appointment, Department, Doctor, MedicalRecord, Patient, Prescription,
+    Service, TestResult,
+)
+
+
+MODELS = [Appointment, MedicalRecord, Prescription, TestResult]
+
+
+class Command(BaseCommand):
+    help = 'Fail if any medical admin changelist query count grows with the number of rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=5, help='Rows for the first measurement.')
+        parser.add_argument('--large', type=int, default=50, help='Rows for the second measurement.')
+        parser.add_argument('--threshold', type=int, default=None, help='Repeats of one query shape that fail a view.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            results = self._run(options['small'], options['large'])
+            repeats = self._find_repeats(options['threshold'])
+            transaction.set_rollback(True)
+
+        failures = []
+        for model, small, large in results:
+            name = str(model._meta.verbose_name_plural)
+            status = 'OK  ' if small == large else 'FAIL'
+            self.stdout.write(f'{status}  {name}: {small} queries -> {large} queries')
+            if small != large:
+                failures.append(name)
+        for view, repeated in repeats:
+            self.stdout.write(f'FAIL  {n_plus_one_message(repeated, view)}')
+            failures.append(view)
+        if failures:
+            raise CommandError(f"N+1 queries in: {', '.join(failures)}.")
+
+    def _run(self, small, large):
+        department = Department.objects.create(name='Admin Query Check')
+        service = Service.objects.create(
+            name='Admin Query Check', category='consultation',
+            description='Synthetic service', price=0,
+        )
+        self._created = 0
+        counts = {model: [] for model in MODELS}
+        for total in (small, large):
+            self._seed(total - self._created, department, service)
+            for model in MODELS:
+                counts[model].append(self._count_queries(model))
+        return [(model, *counts[model]) for model in MODELS]
+
+    def _seed(self, rows, department, service):
+        """Create rows with a distinct patient and doctor each, so lookups cannot be shared."""
+        day = datetime.date.today()
+        for _ in range(rows):
+            number = self._created
+            self._created += 1
+            patient = Patient.objects.create(
+                first_name='Patient', last_name=str(number), phone='0700000000',
+                email='patient@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+            )
+            doctor = Doctor.objects.create(
+                first_name='Doctor', last_name=str(number), phone='0700000000',
+                email='doctor@example.com', license_number=f'ADMIN-CHECK-{number}',
+                specialization='general', department=department,
+            )
+            Appointment.objects.bulk_create([Appointment(
+                patient=patient, doctor=doctor, service=service,
+                appointment_date=day, appointment_time=datetime.time(9, 0),
+                end_time=datetime.time(9, 30), reason_for_visit='Check',
+            )])
+            record = MedicalRecord.objects.create(
+                patient=patient, doctor=doctor, record_type='consultation', diagnosis='Check',
+            )
+            Prescription.objects.create(
+                patient=patient, doctor=doctor, medical_record=record,
+                medication_name='Check', dosage='1', frequency='1', duration='1', instructions='Check',
+            )
+            TestResult.objects.create(
+                patient=patient, doctor=doctor, test_name='Check', test_type='Check',
+            )
+
+    def _count_queries(self, model):
+        request = RequestFactory().get('/')
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = admin.site._registry[model].changelist_view(request)
+            response.render()
+        return len(queries)
+
+    def _find_repeats(self, threshold):
+        """Return (view, repeated queries) for each admin view with a repeated query shape."""
+        request = RequestFactory().get('/')
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        found = []
+        for model in MODELS:
+            model_admin = admin.site._registry[model]
+            views = {
+                'changelist': lambda: model_admin.changelist_view(request),
+                'add': lambda: model_admin.add_view(request),
+                'change': lambda: model_admin.change_view(request, str(model.objects.latest('pk').pk)),
+            }
+            for name, view in views.items():
+                inspector = QueryInspector(threshold)
+                with inspector.installed():
+                    view().render()
+                if inspector.repeated():
+                    found.append((f'{model._meta.verbose_name} {name} view', inspector.repeated()))
+        return found
@@ -0,0 +1,179 @@
+"""
+Query-plan regression check for the medical app's hot query shapes.
+
+Runs EXPLAIN for the slot engine lookup, the admin changelist querysets,
+the age and follow-up lookups, the lab value queries, the due critical
+result alerts, the prescription scheduler queues, the due appointment
+reminders and the patient timeline seeks on the configured database
+(SQLite or MySQL) and fails when the expected index is not part of the
+plan. Intended for CI after migrations; the few rows needed to activate
+the admin filters are rolled back.
+"""
+
+import datetime
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from medical import alerts, scheduling, timeline
+from medical.models import (
+    AnalyteValue, Appointment, AppointmentReminder, Department, Doctor, MedicalRecord, Patient, Prescription,
+    TestResult,
+)
+
+
+TIMELINE_INDEXES = {
+    'appointment': 'appt_patient_date_idx',
+    'record': 'record_patient_date_idx',
+    'prescription': 'rx_patient_date_idx',
+    'test': 'test_patient_date_idx',
+}
+
+class Command(BaseCommand):
+    help = 'Verify that hot query shapes are served by the medical app indexes.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            failures = self._run()
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} query shape(s) missed their index on {connection.vendor}.")
+        self.stdout.write(self.style.SUCCESS(f'All query plans use their indexes on {connection.vendor}.'))
+
+    def _run(self):
+        # Related-field admin filters only apply when they offer two or more choices.
+        department = Department.objects.create(name='Query Plan Check')
+        doctor, _ = [
+            Doctor.objects.create(
+                first_name='Plan', last_name='Check', phone='0700000000',
+                email='plan@example.com', license_number=f'PLAN-CHECK-{number}',
+                specialization='general', department=department,
+            )
+            for number in range(2)
+        ]
+        patient = Patient.objects.create(
+            first_name='Plan', last_name='Check', phone='0700000001',
+            email='plan@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+        )
+
+        day = datetime.date.today()
+        day_range = {
+            'gte': day.isoformat(),
+            'lt': (day + datetime.timedelta(days=1)).isoformat(),
+        }
+
+        checks = [
+            (
+                'slot engine bookings',
+                scheduling.bookings_queryset([doctor.pk], day),
+                'appt_doctor_date_status_idx',
+            ),
+            (
+                'upcoming active bookings for a doctor',
+                Appointment.objects.filter(
+                    doctor=doctor, appointment_date__gte=day, status__in=Appointment.ACTIVE_STATUSES,
+                ).order_by('appointment_date', 'appointment_time'),
+                'appt_doctor_date_status_idx',
+            ),
+            (
+                'appointment changelist',
+                self._changelist_queryset(Appointment, {
+                    'doctor__id__exact': str(doctor.pk),
+                    'appointment_date__gte': day_range['gte'],
+                    'appointment_date__lt': day_range['lt'],
+                    'status__exact': 'confirmed',
+                }),
+                'appt_doctor_date_status_idx',
+            ),
+            (
+                'medical record changelist',
+                self._changelist_queryset(MedicalRecord, {
+                    'patient__id__exact': str(patient.pk),
+                    'record_date__gte': day_range['gte'],
+                    'record_date__lt': day_range['lt'],
+                }),
+                'record_patient_date_idx',
+            ),
+            (
+                'test result changelist',
+                self._changelist_queryset(TestResult, {
+                    'patient__id__exact': str(patient.pk),
+                    'status__exact': 'completed',
+                    'test_date__gte': day_range['gte'],
+                    'test_date__lt': day_range['lt'],
+                }),
+                'test_patient_status_date_idx',
+            ),
+            (
+                'patients in an age band',
+                Patient.objects.in_age_band('18-39'),
+                'patient_dob_idx',
+            ),
+            (
+                'follow-ups due this week',
+                MedicalRecord.objects.follow_ups_due_this_week().order_by('follow_up_date'),
+                'record_follow_up_idx',
+            ),
+        ]
+        checks += [
+            (
+                'abnormal readings of an analyte',
+                AnalyteValue.objects.abnormal('potassium', start=day),
+                'analyte_patient_date_idx',
+            ),
+            (
+                "one patient's analyte trend",
+                AnalyteValue.objects.trend(patient, 'hba1c'),
+                'analyte_patient_date_idx',
+            ),
+            (
+                'critical result alerts due',
+                alerts.due_alerts(),
+                'critical_alert_due_idx',
+            ),
+            (
+                'ended prescriptions',
+                Prescription.objects.ended(day).order_by('end_date', 'pk'),
+                'rx_status_end_date_idx',
+            ),
+            (
+                'prescription refills due',
+                Prescription.objects.refills_due(day).order_by('end_date', 'pk'),
+                'rx_status_end_date_idx',
+            ),
+            (
+                'appointment reminders due',
+                AppointmentReminder.objects.filter(status='pending', send_at__lte=timezone.now()).order_by('send_at', 'pk'),
+                'reminder_due_idx',
+            ),
+        ]
+        # Each timeline source, seeking from a cursor in the middle of the source order.
+        cursor = (day, 1, 1)
+        for rank, source in enumerate(timeline.SOURCES):
+            checks.append((
+                f'patient timeline {source.kind}s',
+                source.queryset(patient.pk, cursor, rank, timeline.PAGE_SIZE + 1),
+                TIMELINE_INDEXES[source.kind],
+            ))
+
+        failures = []
+        for label, queryset, index_name in checks:
+            plan = queryset.explain()
+            if index_name in plan:
+                self.stdout.write(f'OK    {label}: {index_name}')
+            else:
+                failures.append(label)
+                self.stdout.write(f'FAIL  {label}: expected {index_name}\n{plan}')
+        return failures
+
+    def _changelist_queryset(self, model, params):
+        """Build the admin changelist queryset for model filtered by params."""
+        request = RequestFactory().get('/', params)
+        request.user = User(is_active=True, is_staff=True, is_superuser=True)
+        changelist = admin.site._registry[model].get_changelist_instance(request)
+        return changelist.queryset
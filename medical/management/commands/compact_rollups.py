@@ -0,0 +1,41 @@
+"""
+Nightly maintenance of the reporting rollups.
+
+Merges the delta rows appended by appointment signals into one row per
+day, doctor and service. With --rebuild, recomputes the rollups of a date
+range (or all history) from the appointment table instead; run it once
+after deploying the rollup migration and after changes that bypass model
+signals, such as QuerySet.update() or raw SQL.
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medical import reporting
+from medical.models import AppointmentRollup
+
+
+class Command(BaseCommand):
+    help = 'Compact the daily appointment rollups, or rebuild them from the appointment table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute from appointments instead of compacting.')
+        parser.add_argument('--start', help='First appointment date to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', help='Last appointment date to rebuild (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.date.fromisoformat(options['start']) if options['start'] else None
+            end = datetime.date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--start and --end must be YYYY-MM-DD dates.')
+
+        if options['rebuild']:
+            reporting.rebuild(start, end)
+            self.stdout.write(f'Rebuilt the rollups ({AppointmentRollup.objects.count()} rows).')
+        else:
+            if start or end:
+                raise CommandError('--start and --end only apply with --rebuild.')
+            days = reporting.compact()
+            self.stdout.write(f'Compacted {days} day(s) ({AppointmentRollup.objects.count()} rows).')
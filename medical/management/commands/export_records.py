@@ -0,0 +1,36 @@
+"""
+Export patients or appointments as CSV or NDJSON.
+
+The table is read in chunks and written as it goes, so memory use does not
+grow with the number of rows. The output can be loaded with import_records.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand
+
+from medical.models import Appointment, Patient
+from medical.transfer import FORMATS, export_rows
+
+
+MODELS = {
+    'patients': Patient,
+    'appointments': Appointment,
+}
+
+
+class Command(BaseCommand):
+    help = 'Stream patients or appointments to a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(MODELS), help='What to export.')
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help="File to write, or '-' for standard output.")
+
+    def handle(self, *args, **options):
+        rows = export_rows(MODELS[options['kind']].objects.all(), options['kind'], options['format'])
+        if options['output'] == '-':
+            sys.stdout.writelines(rows)
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as stream:
+            stream.writelines(rows)
@@ -0,0 +1,41 @@
+"""
+Import patients or appointments from a CSV or NDJSON file.
+
+Rows are validated and inserted in batches; invalid rows are reported and
+skipped. Import patients before the appointments that refer to them.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medical.transfer import BATCH_SIZE, FORMATS, IMPORTERS
+
+
+class Command(BaseCommand):
+    help = 'Bulk import patients or appointments from CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='What the file contains.')
+        parser.add_argument('path', help="File to read, or '-' for standard input.")
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows validated and inserted per batch.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if format not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {path}; pass --format {' or '.join(FORMATS)}.")
+
+        importer = IMPORTERS[options['kind']]()
+        if path == '-':
+            result = importer.run(sys.stdin, format, options['batch_size'])
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                result = importer.run(stream, format, options['batch_size'])
+
+        for line_number, message in sorted(result.errors):
+            self.stderr.write(f'Line {line_number}: {message}')
+        if result.failed > len(result.errors):
+            self.stderr.write(f'... and {result.failed - len(result.errors)} more rejected rows.')
+        self.stdout.write(f"{options['kind'].capitalize()}: {result}")
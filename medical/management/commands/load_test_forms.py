@@ -0,0 +1,127 @@
+"""
+Load test for the public appointment and contact forms.
+
+Posts valid submissions through the full middleware and view stack (Django
+test client, one per thread) for a fixed time, each from its own client IP,
+and reports sustained submissions per second with latency percentiles.
+It then floods the form from a single IP to show the rate limiter turning
+requests away once the bucket is empty. Everything the test created,
+including queued notification emails, is deleted afterwards.
+
+On SQLite, concurrent writers queue on the database lock; use a generous
+"timeout" in DATABASES OPTIONS or --workers 1.
+"""
+
+import datetime
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from medical.models import AppointmentRequest, ContactMessage, OutboundEmail
+
+
+EMAIL_DOMAIN = 'loadtest.invalid'
+
+
+def appointment_payload(number):
+    return {
+        'first_name': 'Load', 'last_name': f'Test{number}', 'email': f'user{number}@{EMAIL_DOMAIN}',
+        'phone': '0700000000', 'preferred_date': (timezone.localdate() + datetime.timedelta(days=1)).isoformat(),
+        'preferred_time': '09:30', 'service_type': 'general', 'reason_for_visit': 'Load test',
+        'privacy': 'on',
+    }
+
+
+def contact_payload(number):
+    return {
+        'first_name': 'Load', 'last_name': f'Test{number}', 'email': f'user{number}@{EMAIL_DOMAIN}',
+        'service': 'general', 'message': 'Load test', 'privacy': 'on',
+    }
+
+
+FORMS = {
+    'appointments': appointment_payload,
+    'contact': contact_payload,
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure sustained form submissions/sec and check the per-IP rate limit (data is deleted).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10, help='Duration of each throughput run.')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent clients.')
+        parser.add_argument('--flood', type=int, default=20, help='Requests sent from one IP in the rate limit check.')
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                self.stdout.write(f"{'form':<14} {'submissions':>11} {'per sec':>8} {'p50 ms':>7} {'p95 ms':>7} {'errors':>6}")
+                for name, payload in FORMS.items():
+                    self._throughput(name, payload, options['seconds'], options['workers'])
+                for name, payload in FORMS.items():
+                    self._flood(name, payload, options['flood'])
+        finally:
+            AppointmentRequest.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            ContactMessage.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            OutboundEmail.objects.filter(created_at__gte=started, body__contains='Load Test').delete()
+
+    def _throughput(self, name, payload, seconds, workers):
+        url = reverse(name)
+        numbers = itertools.count()
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            client = Client()
+            latencies, errors = [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    with lock:
+                        number = next(numbers)
+                    # A distinct address per submission keeps the limiter out of the measurement.
+                    address = f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'
+                    began = time.perf_counter()
+                    response = client.post(url, payload(number), REMOTE_ADDR=address)
+                    latencies.append((time.perf_counter() - began) * 1000)
+                    if response.status_code != 302:
+                        errors += 1
+            finally:
+                connection.close()
+            return latencies, errors
+
+        cache.clear()
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = [future.result() for future in [pool.submit(worker) for _ in range(workers)]]
+        elapsed = time.perf_counter() - began
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f'{name:<14} {len(latencies):>11} {len(latencies) / elapsed:>8.1f} '
+            f'{statistics.median(latencies) if latencies else 0:>7.1f} {p95:>7.1f} {errors:>6}'
+        )
+
+    def _flood(self, name, payload, requests):
+        cache.clear()
+        client = Client()
+        statuses = [
+            client.post(reverse(name), payload(1000000 + number), REMOTE_ADDR='192.0.2.1').status_code
+            for number in range(requests)
+        ]
+        accepted = statuses.count(302)
+        limited = statuses.count(429)
+        self.stdout.write(f'{name}: {requests} posts from one IP -> {accepted} accepted, {limited} rate limited')
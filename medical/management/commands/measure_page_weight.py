@@ -0,0 +1,110 @@
+"""
+Report what the public pages make a first-time visitor download.
+
+For each page it counts the stylesheets, scripts and fonts the HTML pulls
+in, how many of them block the first paint, the origins they come from and
+their gzip-compressed size. Images are left out (see build_image_derivatives);
+fonts are counted once per file their stylesheets reference, although
+browsers only fetch the ones the page's text needs. Assets on other origins
+are counted but not sized.
+
+Run it after vendor_assets (and collectstatic, to size the hashed files)
+to compare against the CDN setup.
+"""
+
+import gzip
+import os
+import re
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+PAGES = ['home', 'about', 'services', 'contact', 'appointments']
+
+TAG = re.compile(r'<(link|script)\b([^>]*)>')
+ATTRIBUTE = re.compile(r'([\w-]+)="([^"]*)"')
+NOSCRIPT = re.compile(r'<noscript>.*?</noscript>', re.S)
+HEAD_END = '</head>'
+FONT_URL = re.compile(r'url\(["\']?([^"\')]+\.woff2)["\']?\)')
+
+
+def local_file(url):
+    """Return the file behind a STATIC_URL url, preferring the collected copy, or None."""
+    if not url.startswith(settings.STATIC_URL):
+        return None
+    name = url[len(settings.STATIC_URL):]
+    if settings.STATIC_ROOT:
+        path = os.path.join(settings.STATIC_ROOT, name)
+        if os.path.isfile(path):
+            return path
+    return finders.find(name)
+
+
+def compressed_size(data, url):
+    # Fonts and images are already compressed and are sent as they are.
+    if url.endswith('.woff2'):
+        return len(data)
+    return len(gzip.compress(data, compresslevel=9))
+
+
+class Command(BaseCommand):
+    help = 'Report asset requests, origins and compressed bytes for the public pages.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'page':<14} {'requests':>8} {'blocking':>8} {'origins':>7} {'html KB':>8} {'assets KB':>9}  external"
+        )
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            for name in PAGES:
+                html = client.get(reverse(name)).content
+                assets = self._assets(html.decode())
+                sized = [size for _, _, size in assets if size is not None]
+                external = [url for url, _, size in assets if size is None]
+                origins = {urlsplit(url).netloc for url in external} | {''}
+                blocking = sum(1 for _, is_blocking, _ in assets if is_blocking)
+                self.stdout.write(
+                    f'{name:<14} {len(assets):>8} {blocking:>8} {len(origins):>7} '
+                    f'{len(gzip.compress(html)) / 1024:>8.1f} {sum(sized) / 1024:>9.1f}  {len(external)}'
+                )
+
+    def _assets(self, html):
+        """Return (url, render-blocking, compressed size or None) for each asset the page loads."""
+        head_end = html.find(HEAD_END)
+        assets, seen = [], set()
+        for match in TAG.finditer(NOSCRIPT.sub('', html)):
+            attributes = dict(ATTRIBUTE.findall(match[2]))
+            if match[1] == 'script':
+                url = attributes.get('src')
+                blocking = url and match.start() < head_end and 'defer' not in match[2] and 'async' not in match[2]
+            elif attributes.get('rel') == 'stylesheet':
+                url, blocking = attributes.get('href'), True
+            elif attributes.get('rel') == 'preload' and attributes.get('as') == 'style':
+                url, blocking = attributes.get('href'), False
+            else:
+                continue
+            if url and url not in seen:
+                seen.add(url)
+                assets += self._measure(url, bool(blocking), seen)
+        return assets
+
+    def _measure(self, url, blocking, seen):
+        path = local_file(url)
+        if path is None:
+            return [(url, blocking, None)]
+        with open(path, 'rb') as file:
+            data = file.read()
+        assets = [(url, blocking, compressed_size(data, url))]
+        if url.endswith('.css'):
+            for font in FONT_URL.findall(data.decode('utf-8', 'replace')):
+                font_url = urljoin(url, font)
+                if font_url not in seen:
+                    seen.add(font_url)
+                    assets += self._measure(font_url, False, seen)
+        return assets
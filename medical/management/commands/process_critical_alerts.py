@@ -0,0 +1,29 @@
+"""
+Queue digests of critical test results for their doctors.
+
+Run once a minute from cron, or with --loop as a long-running worker
+process, next to process_email_outbox, which delivers the digests.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from medical.alerts import process_alerts
+
+
+class Command(BaseCommand):
+    help = 'Queue one email per doctor for critical test results that have settled.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new alerts.')
+        parser.add_argument('--interval', type=float, default=15.0, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            digests, results = process_alerts()
+            if digests or not options['loop']:
+                self.stdout.write(f'Queued {digests} digest(s) for {results} critical result(s).')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+"""
+Deliver queued outbound email.
+
+Run once from cron, or with --loop as a long-running worker process.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from medical.outbox import MAX_ATTEMPTS, process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox in batches over a single connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed per batch.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=MAX_ATTEMPTS,
+            help='Attempts before a message is marked as failed.',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new messages.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = process_outbox(options['batch_size'], options['max_attempts'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'Sent {sent} email(s), {failed} failed.')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+"""
+Complete ended prescriptions and flag upcoming refills.
+
+Run nightly from cron. Re-running it, or running it after a crash, only
+applies what is still due; --date catches up on a missed night or
+previews another day.
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medical.models import PrescriptionQuerySet
+from medical.prescriptions import BATCH_SIZE, run_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Move ended prescriptions to completed and flag refills due soon, in batched UPDATEs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Run as of this day (YYYY-MM-DD) instead of today.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Prescriptions per UPDATE.')
+        parser.add_argument(
+            '--notice-days', type=int, default=PrescriptionQuerySet.REFILL_NOTICE_DAYS,
+            help='Days before the end date to flag a refill.',
+        )
+        parser.add_argument(
+            '--grace-days', type=int, default=PrescriptionQuerySet.REFILL_GRACE_DAYS,
+            help='Days after the end date before unused refills lapse.',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD.')
+        counts = run_scheduler(today, options['notice_days'], options['grace_days'], options['batch_size'])
+        self.stdout.write(
+            f"Completed {counts['completed']} prescription(s), flagged {counts['refills_flagged']} refill(s)."
+        )
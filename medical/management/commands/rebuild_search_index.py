@@ -0,0 +1,27 @@
+"""
+Rebuild the admin search index from the database.
+
+Run after deploying the search migration and after any bulk load that
+bypasses model signals (bulk_create, update(), raw SQL or loaddata --raw).
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from medical.models import SearchDocument
+from medical.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Re-create the search documents for patients, medical records and test results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows read and written per batch.')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.rebuild(options['batch_size'])
+        self.stdout.write(
+            f'Rebuilt the {type(backend).__name__} index ({SearchDocument.objects.count()} stored documents).'
+        )
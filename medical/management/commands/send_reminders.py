@@ -0,0 +1,46 @@
+"""
+Send due appointment reminders through the configured transport.
+
+Run once a minute from cron, or with --loop as a long-running worker that
+sleeps until the next reminder slot (at most --interval seconds, so
+reminders booked in the meantime are not missed). --rebuild schedules the
+reminders of upcoming appointments written without signals.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from medical import reminders
+
+
+class Command(BaseCommand):
+    help = 'Send appointment reminders that are due, in batches per send slot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Reminders handed to the transport at once.')
+        parser.add_argument('--loop', action='store_true', help='Keep sending as reminder slots come due.')
+        parser.add_argument('--interval', type=float, default=60.0, help='Longest sleep between passes with --loop.')
+        parser.add_argument('--rebuild', action='store_true', help='Schedule reminders for all upcoming appointments first.')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            checked = reminders.rebuild()
+            self.stdout.write(f'Scheduled reminders for {checked} upcoming appointment(s).')
+        while True:
+            sent, failed, skipped = reminders.process_due(options['batch_size'])
+            if sent or failed or skipped or not options['loop']:
+                self.stdout.write(f'Sent {sent} reminder(s), {failed} failed, {skipped} skipped.')
+            if not options['loop']:
+                return
+            time.sleep(self._sleep_seconds(options['interval'], retry=failed))
+
+    def _sleep_seconds(self, interval, retry):
+        """Seconds until the next slot; failed reminders are retried after a full interval."""
+        if retry:
+            return interval
+        next_slot = reminders.next_send_at()
+        if next_slot is None:
+            return interval
+        return min(max((next_slot - timezone.now()).total_seconds(), 0), interval)
@@ -0,0 +1,105 @@
+"""
+Concurrency stress check for double-booking prevention.
+
+Fires many overlapping bookings for one doctor-day through a thread pool,
+each on its own database connection, then asserts that no two accepted
+appointments overlap. The synthetic doctor and its bookings are deleted
+afterwards. On SQLite, concurrent writers queue on the database lock, so
+a generous "timeout" in DATABASES OPTIONS avoids spurious lock errors.
+"""
+
+import datetime
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from medical.models import (
+    Appointment, Department, Doctor, DoubleBookingError, Patient, Service,
+)
+
+
+class Command(BaseCommand):
+    help = 'Book overlapping appointments concurrently and assert that none overlap.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=300, help='Booking attempts to make.')
+        parser.add_argument('--workers', type=int, default=16, help='Thread pool size.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for start times.')
+
+    def handle(self, *args, **options):
+        department = Department.objects.create(name='Booking Stress Test')
+        try:
+            self._run(department, options['bookings'], options['workers'], options['seed'])
+        finally:
+            # Cascades to the doctor, its appointments and schedule buckets.
+            department.delete()
+            Service.objects.filter(name='Booking Stress Service').delete()
+            Patient.objects.filter(email='stress@example.com').delete()
+
+    def _run(self, department, bookings, workers, seed):
+        doctor = Doctor.objects.create(
+            first_name='Stress', last_name='Test', phone='0700000000',
+            email='stress@example.com', license_number='STRESS-0001',
+            specialization='general', department=department,
+        )
+        services = [
+            Service.objects.create(
+                name='Booking Stress Service', category='consultation',
+                description='Synthetic service', duration_minutes=minutes, price=0,
+            )
+            for minutes in (15, 30, 45)
+        ]
+        patient = Patient.objects.create(
+            first_name='Stress', last_name='Patient', phone='0700000001',
+            email='stress@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+        )
+        day = datetime.date.today() + datetime.timedelta(days=7)
+
+        rng = random.Random(seed)
+        attempts = [
+            (rng.choice(services), 8 * 60 + rng.randrange(0, 9 * 60, 5))
+            for _ in range(bookings)
+        ]
+
+        def book(attempt):
+            service, minutes = attempt
+            try:
+                Appointment(
+                    patient=patient, doctor=doctor, service=service,
+                    appointment_date=day,
+                    appointment_time=datetime.time(minutes // 60, minutes % 60),
+                    status='pending', reason_for_visit='Stress test',
+                ).save()
+                return 'booked'
+            except DoubleBookingError:
+                return 'rejected'
+            except OperationalError:
+                return 'error'
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(book, attempts))
+
+        booked = sorted(
+            Appointment.objects
+            .filter(doctor=doctor, appointment_date=day)
+            .values_list('appointment_time', 'end_time')
+        )
+        overlaps = 0
+        latest_end = None
+        for start, end in booked:
+            if latest_end is not None and start < latest_end:
+                overlaps += 1
+            latest_end = end if latest_end is None else max(latest_end, end)
+
+        self.stdout.write(
+            f"attempts={bookings} booked={outcomes.count('booked')} "
+            f"rejected={outcomes.count('rejected')} errors={outcomes.count('error')} "
+            f"overlaps={overlaps}"
+        )
+        if overlaps:
+            raise CommandError(f'{overlaps} overlapping appointment(s) were accepted.')
+        self.stdout.write(self.style.SUCCESS('No overlapping appointments were accepted.'))
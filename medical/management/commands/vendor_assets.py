@@ -0,0 +1,39 @@
+"""
+Self-host the Bootstrap, Font Awesome and Inter assets used by base.html.
+
+Run at deploy time before collectstatic (it needs network access); see
+medical.vendor for what is downloaded and how Font Awesome is subset.
+Re-run after adding icons to the templates.
+"""
+
+import urllib.error
+
+from django.core.management.base import BaseCommand, CommandError
+
+from medical.vendor import is_vendored, vendor_fontawesome, vendor_inter, vendor_pinned_files
+
+
+class Command(BaseCommand):
+    help = 'Download Bootstrap, Inter and a Font Awesome subset into static/vendor/.'
+
+    def handle(self, *args, **options):
+        try:
+            import brotli  # noqa: F401
+            import fontTools  # noqa: F401
+        except ImportError:
+            raise CommandError('Font Awesome subsetting needs fontTools and brotli: pip install fonttools brotli')
+
+        try:
+            sizes = vendor_pinned_files()
+            fontawesome_sizes, icons = vendor_fontawesome()
+            sizes.update(fontawesome_sizes)
+            sizes.update(vendor_inter())
+        except (urllib.error.URLError, ValueError) as error:
+            raise CommandError(f'Vendoring failed: {error}')
+        is_vendored.cache_clear()
+
+        for path, size in sorted(sizes.items()):
+            self.stdout.write(f'{size:>9,}  {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Vendored {len(sizes)} files ({icons} Font Awesome icons); run collectstatic to publish them.'
+        ))
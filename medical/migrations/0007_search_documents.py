@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+# Full-text structures over medical_searchdocument.content; see medical.search.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE medical_searchdocument_fts USING fts5("
+    "kind UNINDEXED, content, content='medical_searchdocument', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER medical_searchdocument_ai AFTER INSERT ON medical_searchdocument BEGIN "
+    "INSERT INTO medical_searchdocument_fts(rowid, kind, content) VALUES (new.id, new.kind, new.content); END",
+    "CREATE TRIGGER medical_searchdocument_ad AFTER DELETE ON medical_searchdocument BEGIN "
+    "INSERT INTO medical_searchdocument_fts(medical_searchdocument_fts, rowid, kind, content) "
+    "VALUES ('delete', old.id, old.kind, old.content); END",
+    "CREATE TRIGGER medical_searchdocument_au AFTER UPDATE ON medical_searchdocument BEGIN "
+    "INSERT INTO medical_searchdocument_fts(medical_searchdocument_fts, rowid, kind, content) "
+    "VALUES ('delete', old.id, old.kind, old.content); "
+    "INSERT INTO medical_searchdocument_fts(rowid, kind, content) VALUES (new.id, new.kind, new.content); END",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS medical_searchdocument_au',
+    'DROP TRIGGER IF EXISTS medical_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS medical_searchdocument_ai',
+    'DROP TABLE IF EXISTS medical_searchdocument_fts',
+]
+
+MYSQL_FORWARD = ['ALTER TABLE medical_searchdocument ADD FULLTEXT INDEX search_content_ft (content)']
+
+MYSQL_BACKWARD = ['ALTER TABLE medical_searchdocument DROP INDEX search_content_ft']
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Model label, e.g. medical.patient', max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('content', models.TextField()),
+                ('phone', models.CharField(blank=True, max_length=20)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'phone'], name='search_kind_phone_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'mysql': MYSQL_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'mysql': MYSQL_BACKWARD}),
+        ),
+    ]
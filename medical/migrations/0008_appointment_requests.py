@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0007_search_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100)),
+                ('last_name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=20)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('preferred_date', models.DateField()),
+                ('preferred_time', models.TimeField()),
+                ('service_type', models.CharField(choices=[('general', 'General Consultation'), ('preventive', 'Preventive Care'), ('pediatric', 'Pediatric Care'), ('emergency', 'Emergency Care'), ('chronic', 'Chronic Disease Management'), ('laboratory', 'Laboratory Services'), ('followup', 'Follow-up Visit'), ('specialist', 'Specialist Consultation'), ('other', 'Other')], max_length=20)),
+                ('preferred_doctor', models.CharField(blank=True, choices=[('', 'No preference'), ('dr_otieno', 'Dr. Cavin Otieno'), ('available', 'Any available doctor')], max_length=20)),
+                ('reason_for_visit', models.TextField()),
+                ('current_medications', models.TextField(blank=True)),
+                ('allergies', models.TextField(blank=True)),
+                ('insurance_provider', models.CharField(blank=True, max_length=100)),
+                ('is_emergency', models.BooleanField(default=False)),
+                ('is_first_visit', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('new', 'New'), ('contacted', 'Contacted'), ('booked', 'Booked'), ('declined', 'Declined')], default='new', max_length=20)),
+                ('client_ip', models.GenericIPAddressField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('appointment', models.ForeignKey(blank=True, help_text='Appointment booked for this request', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='medical.appointment')),
+            ],
+            options={
+                'verbose_name': 'Appointment Request',
+                'verbose_name_plural': 'Appointment Requests',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='appt_request_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0009_age_and_follow_up_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('appointments', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('no_shows', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('is_compacted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='medical.doctor')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='medical.service')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ClinicDashboard',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Clinic dashboard',
+                'verbose_name_plural': 'Clinic dashboard',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('medical.appointmentrollup',),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentrollup',
+            index=models.Index(fields=['date', 'doctor', 'service'], name='rollup_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentrollup',
+            index=models.Index(fields=['is_compacted', 'date'], name='rollup_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0011_patient_timeline_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyteValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analyte', models.CharField(help_text='Normalised name, e.g. potassium or hba1c', max_length=100)),
+                ('name', models.CharField(max_length=200)),
+                ('value', models.FloatField()),
+                ('unit', models.CharField(blank=True, max_length=30)),
+                ('range_low', models.FloatField(blank=True, null=True)),
+                ('range_high', models.FloatField(blank=True, null=True)),
+                ('test_date', models.DateField()),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analyte_values', to='medical.patient')),
+                ('test_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analyte_values', to='medical.testresult')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['analyte', 'patient', 'test_date'], name='analyte_patient_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0012_analyte_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CriticalResultAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('cleared', 'Cleared')], default='pending', max_length=20)),
+                ('first_flagged_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_flagged_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('email', models.ForeignKey(blank=True, help_text='Digest that reported this result', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='critical_alerts', to='medical.outboundemail')),
+                ('test_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='critical_alerts', to='medical.testresult')),
+            ],
+            options={
+                'verbose_name': 'Critical Result Alert',
+                'verbose_name_plural': 'Critical Result Alerts',
+                'indexes': [models.Index(fields=['status', 'last_flagged_at'], name='critical_alert_due_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'sent'])), fields=('test_result',), name='critical_alert_open_unique')],
+            },
+        ),
+    ]
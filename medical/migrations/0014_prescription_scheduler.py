@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0013_critical_result_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prescription',
+            name='refill_flagged_for',
+            field=models.DateField(blank=True, editable=False, help_text='End date the prescription scheduler last flagged a refill for', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['status', 'end_date'], name='rx_status_end_date_idx'),
+        ),
+    ]
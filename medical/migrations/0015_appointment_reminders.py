@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0014_prescription_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('24h', '24 hours before'), ('2h', '2 hours before')], max_length=10)),
+                ('send_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed'), ('missed', 'Missed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='medical.appointment')),
+            ],
+            options={
+                'verbose_name': 'Appointment Reminder',
+                'verbose_name_plural': 'Appointment Reminders',
+                'indexes': [models.Index(fields=['status', 'send_at'], name='reminder_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('appointment', 'bucket'), name='unique_appointment_reminder')],
+            },
+        ),
+    ]
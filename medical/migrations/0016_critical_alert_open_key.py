@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_open_for(apps, schema_editor):
+    CriticalResultAlert = apps.get_model('medical', 'CriticalResultAlert')
+    CriticalResultAlert.objects.filter(status__in=['pending', 'sent']).update(open_for=F('test_result_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0015_appointment_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='criticalresultalert',
+            name='open_for',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(set_open_for, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='criticalresultalert',
+            name='critical_alert_open_unique',
+        ),
+    ]
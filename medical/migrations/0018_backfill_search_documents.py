@@ -0,0 +1,59 @@
+import re
+
+from django.db import migrations
+
+
+# medical.search.SEARCH_FIELDS and PHONE_FIELDS as of 0007_search_documents.
+SEARCH_FIELDS = {
+    'patient': ('first_name', 'last_name', 'email', 'insurance_policy_number'),
+    'medicalrecord': ('diagnosis', 'treatment_plan'),
+    'testresult': ('test_name', 'interpretation'),
+}
+PHONE_FIELDS = {
+    'patient': 'phone',
+}
+
+BATCH_SIZE = 2000
+
+
+def normalize_phone(value):
+    """medical.search.normalize_phone."""
+    digits = re.sub(r'[^\d+]', '', value or '')
+    if len(digits.lstrip('+')) < 7:
+        return ''
+    if digits.startswith('+'):
+        return digits
+    return '+254' + (digits[1:] if digits.startswith('0') else digits)
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Index the rows saved before 0007, which only the signals would otherwise pick up."""
+    SearchDocument = apps.get_model('medical', 'SearchDocument')
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('medical', model_name)
+        kind = f'medical.{model_name}'
+        phone_field = PHONE_FIELDS.get(model_name)
+        columns = [*fields, *([phone_field] if phone_field else [])]
+        batch = []
+        for instance in model.objects.only(*columns).iterator(chunk_size=BATCH_SIZE):
+            batch.append(SearchDocument(
+                kind=kind, object_id=instance.pk,
+                content=' '.join(str(getattr(instance, field) or '') for field in fields),
+                phone=normalize_phone(getattr(instance, phone_field)) if phone_field else '',
+            ))
+            if len(batch) >= BATCH_SIZE:
+                # Objects saved since 0007 already have their document.
+                SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0016_critical_alert_open_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
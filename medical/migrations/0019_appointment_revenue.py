@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:04
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_revenue(apps, schema_editor):
+    """Store the current price plus consultation fee on the completed appointments."""
+    Appointment = apps.get_model('medical', 'Appointment')
+    Doctor = apps.get_model('medical', 'Doctor')
+    Service = apps.get_model('medical', 'Service')
+    Appointment.objects.filter(status='completed').update(revenue=(
+        Subquery(Service.objects.filter(pk=OuterRef('service_id')).values('price')[:1])
+        + Subquery(Doctor.objects.filter(pk=OuterRef('doctor_id')).values('consultation_fee')[:1])
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0018_backfill_search_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='revenue',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.RunPython(set_revenue, migrations.RunPython.noop),
+    ]
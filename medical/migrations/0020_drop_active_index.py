@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0019_appointment_revenue'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appt_active_idx',
+        ),
+    ]
@@ -1,9 +1,17 @@
-from django.db import models
+import datetime
+
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db.models.functions import ExtractYear
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class DoubleBookingError(ValidationError):
+    """Raised when an appointment overlaps another booking for the same doctor."""
+
+
 class Department(models.Model):
     """Medical departments model."""
     name = models.CharField(max_length=100, unique=True)
@@ -65,6 +73,80 @@ class Doctor(models.Model):
         return f"Dr. {self.first_name} {self.last_name}"
 
 
+def years_before(day, years):
+    """Return the date `years` before day, using Feb 28 for Feb 29 in common years."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+class PatientQuerySet(models.QuerySet):
+    """
+    Age lookups done in SQL.
+    
+    Age filters are rewritten as date_of_birth ranges, so they can use the
+    date_of_birth index; with_age() and with_age_band() annotate the values
+    for display and sorting.
+    """
+    # (label, minimum age, maximum age exclusive or None)
+    AGE_BANDS = [
+        ('0-17', 0, 18),
+        ('18-39', 18, 40),
+        ('40-64', 40, 65),
+        ('65+', 65, None),
+    ]
+    
+    def _age_condition(self, min_age=None, max_age=None, today=None):
+        """Q for min_age <= age < max_age, as a date_of_birth range."""
+        today = today or timezone.localdate()
+        condition = models.Q()
+        if min_age is not None:
+            condition &= models.Q(date_of_birth__lte=years_before(today, min_age))
+        if max_age is not None:
+            condition &= models.Q(date_of_birth__gt=years_before(today, max_age))
+        return condition
+    
+    def age_between(self, min_age=None, max_age=None, today=None):
+        """Patients aged at least min_age and younger than max_age."""
+        return self.filter(self._age_condition(min_age, max_age, today))
+    
+    def in_age_band(self, label, today=None):
+        for band, min_age, max_age in self.AGE_BANDS:
+            if band == label:
+                return self.age_between(min_age, max_age, today)
+        raise ValueError(f'Unknown age band {label!r}.')
+    
+    def with_age(self, today=None):
+        """Annotate age_years: whole years since date_of_birth."""
+        today = today or timezone.localdate()
+        birthday_ahead = models.Q(date_of_birth__month__gt=today.month) | models.Q(
+            date_of_birth__month=today.month, date_of_birth__day__gt=today.day,
+        )
+        return self.annotate(age_years=models.ExpressionWrapper(
+            today.year - ExtractYear('date_of_birth')
+            - models.Case(models.When(birthday_ahead, then=1), default=0),
+            output_field=models.IntegerField(),
+        ))
+    
+    def with_age_band(self, today=None):
+        """Annotate age_band with the AGE_BANDS label."""
+        return self.annotate(age_band=models.Case(
+            *[
+                models.When(self._age_condition(min_age, max_age, today), then=models.Value(label))
+                for label, min_age, max_age in self.AGE_BANDS
+            ],
+            output_field=models.CharField(),
+        ))
+    
+    def age_band_counts(self, today=None):
+        """Return {label: count} for every age band, in one query."""
+        return self.aggregate(**{
+            label: models.Count('pk', filter=self._age_condition(min_age, max_age, today))
+            for label, min_age, max_age in self.AGE_BANDS
+        })
+
+
 class Patient(models.Model):
     """Patient information model."""
     GENDER_CHOICES = [
@@ -113,6 +195,8 @@ class Patient(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PatientQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
@@ -125,6 +209,12 @@ class Patient(models.Model):
         from datetime import date
         today = date.today()
         return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
+    
+    class Meta:
+        indexes = [
+            # Age filters become date_of_birth ranges (see PatientQuerySet).
+            models.Index(fields=['date_of_birth'], name='patient_dob_idx'),
+        ]
 
 
 class Service(models.Model):
@@ -170,6 +260,8 @@ class Appointment(models.Model):
         ('no_show', 'No Show'),
     ]
     
+    ACTIVE_STATUSES = ('pending', 'confirmed')
+    
     PRIORITY_CHOICES = [
         ('low', 'Low'),
         ('normal', 'Normal'),
@@ -183,6 +275,8 @@ class Appointment(models.Model):
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
     end_time = models.TimeField(blank=True, null=True)
+    # Service price plus consultation fee, fixed when the appointment is completed (see medical.reporting).
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='normal')
     notes = models.TextField(blank=True)
@@ -203,13 +297,165 @@ class Appointment(models.Model):
     def doctor_name(self):
         return self.doctor.doctor_name
     
+    def clean(self):
+        from .scheduling import describe_conflict, find_conflicts
+        if self.doctor_id and self.service_id and self.appointment_date and self.appointment_time:
+            for _, other in find_conflicts([self]):
+                raise ValidationError({'appointment_time': describe_conflict(other)})
+    
     def save(self, *args, **kwargs):
+        from .reporting import set_revenue
+        from .scheduling import INACTIVE_STATUSES, describe_conflict, find_conflicts
+        set_revenue([self])
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'revenue'}
         if not self.end_time and self.service:
             from datetime import datetime, timedelta
             start_datetime = datetime.combine(self.appointment_date, self.appointment_time)
             end_datetime = start_datetime + timedelta(minutes=self.service.duration_minutes)
             self.end_time = end_datetime.time()
-        super().save(*args, **kwargs)
+        if self.status in INACTIVE_STATUSES:
+            super().save(*args, **kwargs)
+            return
+        # Serialise writers for this doctor's day, then re-check under the lock.
+        with transaction.atomic():
+            ScheduleBucket.acquire(self.doctor_id, self.appointment_date)
+            for _, other in find_conflicts([self]):
+                raise DoubleBookingError(describe_conflict(other))
+            super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            # Slot engine and admin changelist filtered by doctor/date/status.
+            models.Index(fields=['doctor', 'appointment_date', 'status'], name='appt_doctor_date_status_idx'),
+            # Keyset pagination of the admin changelist (see medical.pagination).
+            models.Index(fields=['appointment_date', 'id'], name='appt_date_id_idx'),
+            # Patient timeline (see medical.timeline).
+            models.Index(fields=['patient', 'appointment_date'], name='appt_patient_date_idx'),
+        ]
+
+
+class ScheduleBucket(models.Model):
+    """Per-doctor, per-day row locked while bookings for that day are written."""
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='schedule_buckets')
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.doctor_id} - {self.date} (v{self.version})"
+    
+    @classmethod
+    def acquire(cls, doctor_id, date):
+        """
+        Lock the bucket for doctor_id/date until the surrounding transaction ends.
+        
+        The version bump is written first so the row lock (MySQL) or write
+        lock (SQLite) is taken up front rather than upgraded from a read.
+        """
+        while True:
+            if cls.objects.filter(doctor_id=doctor_id, date=date).update(version=models.F('version') + 1):
+                return
+            try:
+                with transaction.atomic():
+                    cls.objects.create(doctor_id=doctor_id, date=date, version=1)
+                return
+            except IntegrityError:
+                # Another writer created the bucket first; lock that row instead.
+                continue
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date'], name='unique_schedule_bucket'),
+        ]
+
+
+class AppointmentReminder(models.Model):
+    """
+    A reminder to send before an appointment, kept in step with it by signals (see medical.reminders).
+    
+    send_at is the start of the send slot the reminder falls in, so the
+    reminder worker can wake once per slot and send it as one batch.
+    """
+    BUCKET_CHOICES = [
+        ('24h', '24 hours before'),
+        ('2h', '2 hours before'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('missed', 'Missed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='reminders')
+    bucket = models.CharField(max_length=10, choices=BUCKET_CHOICES)
+    send_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.appointment_id} - {self.bucket} - {self.status}"
+    
+    class Meta:
+        verbose_name = "Appointment Reminder"
+        verbose_name_plural = "Appointment Reminders"
+        constraints = [
+            models.UniqueConstraint(fields=['appointment', 'bucket'], name='unique_appointment_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'send_at'], name='reminder_due_idx'),
+        ]
+
+
+class MedicalRecordQuerySet(models.QuerySet):
+    """Follow-up lookups relative to today, done in SQL."""
+    FOLLOW_UP_STATUSES = [
+        ('overdue', 'Overdue'),
+        ('this_week', 'Due this week'),
+        ('upcoming', 'Upcoming'),
+    ]
+    
+    def _follow_up_conditions(self, today=None):
+        """Return {status: Q} for FOLLOW_UP_STATUSES; the week ends on Sunday."""
+        today = today or timezone.localdate()
+        week_end = today + datetime.timedelta(days=6 - today.weekday())
+        return {
+            'overdue': models.Q(follow_up_date__lt=today),
+            'this_week': models.Q(follow_up_date__gte=today, follow_up_date__lte=week_end),
+            'upcoming': models.Q(follow_up_date__gt=week_end),
+        }
+    
+    def follow_ups_between(self, start, end):
+        return self.filter(follow_up_date__gte=start, follow_up_date__lte=end)
+    
+    def in_follow_up_status(self, status, today=None):
+        """Records whose follow-up has the given FOLLOW_UP_STATUSES key."""
+        return self.filter(self._follow_up_conditions(today)[status])
+    
+    def follow_ups_due_this_week(self, today=None):
+        """Records with a follow-up from today to Sunday."""
+        return self.in_follow_up_status('this_week', today)
+    
+    def overdue_follow_ups(self, today=None):
+        return self.in_follow_up_status('overdue', today)
+    
+    def with_follow_up_status(self, today=None):
+        """Annotate follow_up_status with a FOLLOW_UP_STATUSES key, or None without a follow-up."""
+        return self.annotate(follow_up_status=models.Case(
+            *[
+                models.When(condition, then=models.Value(status))
+                for status, condition in self._follow_up_conditions(today).items()
+            ],
+            output_field=models.CharField(),
+        ))
 
 
 class MedicalRecord(models.Model):
@@ -249,6 +495,8 @@ class MedicalRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MedicalRecordQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.patient.patient_name} - {self.record_type} - {self.record_date}"
     
@@ -259,6 +507,46 @@ class MedicalRecord(models.Model):
     @property
     def doctor_name(self):
         return self.doctor.doctor_name
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'record_date'], name='record_patient_date_idx'),
+            models.Index(fields=['record_date', 'id'], name='record_date_id_idx'),
+            # Due and overdue follow-ups (see MedicalRecordQuerySet).
+            models.Index(fields=['follow_up_date'], name='record_follow_up_idx'),
+        ]
+
+
+class PrescriptionQuerySet(models.QuerySet):
+    """
+    The prescription scheduler's queues (see medical.prescriptions).
+    
+    Both are ranges of active prescriptions on the (status, end_date) index.
+    """
+    # Days before the end date that a prescription with refills left is flagged.
+    REFILL_NOTICE_DAYS = 7
+    # Days after the end date that unused refills lapse and the prescription completes.
+    REFILL_GRACE_DAYS = 30
+    
+    def ended(self, today=None, grace_days=None):
+        """Active prescriptions past their end date with no refills left, or past the refill grace period."""
+        today = today or timezone.localdate()
+        grace_days = self.REFILL_GRACE_DAYS if grace_days is None else grace_days
+        return self.filter(status='active', end_date__lt=today).filter(
+            models.Q(refills_remaining=0) | models.Q(end_date__lt=today - datetime.timedelta(days=grace_days))
+        )
+    
+    def refills_due(self, today=None, notice_days=None):
+        """Active prescriptions with refills left that end within notice_days, or have ended."""
+        today = today or timezone.localdate()
+        notice_days = self.REFILL_NOTICE_DAYS if notice_days is None else notice_days
+        return self.filter(
+            status='active', end_date__lte=today + datetime.timedelta(days=notice_days), refills_remaining__gt=0,
+        )
+    
+    def refill_flagged(self):
+        """Active prescriptions flagged for a refill of their current end date."""
+        return self.filter(status='active', refill_flagged_for=models.F('end_date'))
 
 
 class Prescription(models.Model):
@@ -283,10 +571,16 @@ class Prescription(models.Model):
     start_date = models.DateField(default=timezone.now)
     end_date = models.DateField(blank=True, null=True)
     refills_remaining = models.PositiveIntegerField(default=0)
+    refill_flagged_for = models.DateField(
+        blank=True, null=True, editable=False,
+        help_text="End date the prescription scheduler last flagged a refill for",
+    )
     pharmacy_notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PrescriptionQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.patient.patient_name} - {self.medication_name}"
     
@@ -297,6 +591,18 @@ class Prescription(models.Model):
     @property
     def doctor_name(self):
         return self.doctor.doctor_name
+    
+    @property
+    def refill_due(self):
+        return self.status == 'active' and self.end_date is not None and self.refill_flagged_for == self.end_date
+    
+    class Meta:
+        indexes = [
+            # Patient timeline (see medical.timeline).
+            models.Index(fields=['patient', 'prescribed_date'], name='rx_patient_date_idx'),
+            # Prescription scheduler queues (see medical.prescriptions).
+            models.Index(fields=['status', 'end_date'], name='rx_status_end_date_idx'),
+        ]
 
 
 class TestResult(models.Model):
@@ -343,6 +649,129 @@ class TestResult(models.Model):
     @property
     def doctor_name(self):
         return self.doctor.doctor_name
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'status', 'test_date'], name='test_patient_status_date_idx'),
+            # Patient timeline (see medical.timeline).
+            models.Index(fields=['patient', 'test_date'], name='test_patient_date_idx'),
+        ]
+
+
+class AnalyteValueQuerySet(models.QuerySet):
+    """
+    Reference-range flags and trends over the numeric lab values, in SQL.
+    
+    Rows missing a bound are never flagged on that side; rows with no range
+    at all get an empty flag.
+    """
+    
+    def for_analyte(self, analyte):
+        from .labs import normalize_analyte
+        return self.filter(analyte=normalize_analyte(analyte))
+    
+    def with_flag(self):
+        """Annotate flag: 'low' or 'high' outside the reference range, 'normal' inside it."""
+        return self.annotate(flag=models.Case(
+            models.When(value__lt=models.F('range_low'), then=models.Value('low')),
+            models.When(value__gt=models.F('range_high'), then=models.Value('high')),
+            models.When(
+                models.Q(range_low__isnull=False) | models.Q(range_high__isnull=False),
+                then=models.Value('normal'),
+            ),
+            default=models.Value(''),
+            output_field=models.CharField(),
+        ))
+    
+    def out_of_range(self):
+        return self.filter(models.Q(value__lt=models.F('range_low')) | models.Q(value__gt=models.F('range_high')))
+    
+    def abnormal(self, analyte, start=None, end=None):
+        """Out-of-range readings of analyte across patients, optionally between two test dates."""
+        rows = self.for_analyte(analyte).out_of_range()
+        if start:
+            rows = rows.filter(test_date__gte=start)
+        if end:
+            rows = rows.filter(test_date__lte=end)
+        return rows.with_flag()
+    
+    def trend(self, patient, analyte, start=None, end=None):
+        """One patient's readings of analyte in test date order, flagged, as dicts."""
+        rows = self.for_analyte(analyte).filter(patient=patient)
+        if start:
+            rows = rows.filter(test_date__gte=start)
+        if end:
+            rows = rows.filter(test_date__lte=end)
+        return rows.with_flag().order_by('test_date', 'id').values(
+            'test_date', 'value', 'unit', 'range_low', 'range_high', 'flag', 'test_result_id',
+        )
+
+
+class AnalyteValue(models.Model):
+    """
+    One numeric value of a test result, parsed from TestResult.values (see medical.labs).
+    
+    Rows are rewritten whenever their test result is saved. Patient and
+    test_date are copied from it, so lab queries don't touch test results.
+    """
+    test_result = models.ForeignKey(TestResult, on_delete=models.CASCADE, related_name='analyte_values')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='analyte_values')
+    analyte = models.CharField(max_length=100, help_text="Normalised name, e.g. potassium or hba1c")
+    name = models.CharField(max_length=200)
+    value = models.FloatField()
+    unit = models.CharField(max_length=30, blank=True)
+    range_low = models.FloatField(blank=True, null=True)
+    range_high = models.FloatField(blank=True, null=True)
+    test_date = models.DateField()
+    
+    objects = AnalyteValueQuerySet.as_manager()
+    
+    def __str__(self):
+        return f"{self.name} {self.value:g} {self.unit}".strip()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['analyte', 'patient', 'test_date'], name='analyte_patient_date_idx'),
+        ]
+
+
+class CriticalResultAlert(models.Model):
+    """
+    A test result saved as critical, waiting for or included in its doctor's digest (see medical.alerts).
+    
+    A test result has at most one open (pending or sent) alert, enforced by
+    the unique open_for column, so repeated saves only move
+    last_flagged_at. Saving it with another result status clears the alert,
+    and a later critical save opens a new one.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('cleared', 'Cleared'),
+    ]
+    
+    test_result = models.ForeignKey(TestResult, on_delete=models.CASCADE, related_name='critical_alerts')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # test_result_id while the alert is open, NULL once cleared; a plain
+    # unique key, since MySQL has no partial unique indexes.
+    open_for = models.BigIntegerField(blank=True, null=True, unique=True, editable=False)
+    first_flagged_at = models.DateTimeField(default=timezone.now)
+    last_flagged_at = models.DateTimeField(default=timezone.now)
+    notified_at = models.DateTimeField(blank=True, null=True)
+    email = models.ForeignKey(
+        'OutboundEmail', on_delete=models.SET_NULL, blank=True, null=True, related_name='critical_alerts',
+        help_text="Digest that reported this result",
+    )
+    
+    def __str__(self):
+        return f"{self.test_result_id} - {self.status}"
+    
+    class Meta:
+        verbose_name = "Critical Result Alert"
+        verbose_name_plural = "Critical Result Alerts"
+        indexes = [
+            models.Index(fields=['status', 'last_flagged_at'], name='critical_alert_due_idx'),
+        ]
 
 
 class Page(models.Model):
@@ -392,3 +821,157 @@ class ContactMessage(models.Model):
         verbose_name = "Contact Message"
         verbose_name_plural = "Contact Messages"
         ordering = ['-created_at']
+
+
+class AppointmentRequest(models.Model):
+    """Appointment request from the public booking form, awaiting triage by staff."""
+    SERVICE_CHOICES = [
+        ('general', 'General Consultation'),
+        ('preventive', 'Preventive Care'),
+        ('pediatric', 'Pediatric Care'),
+        ('emergency', 'Emergency Care'),
+        ('chronic', 'Chronic Disease Management'),
+        ('laboratory', 'Laboratory Services'),
+        ('followup', 'Follow-up Visit'),
+        ('specialist', 'Specialist Consultation'),
+        ('other', 'Other'),
+    ]
+    
+    DOCTOR_CHOICES = [
+        ('', 'No preference'),
+        ('dr_otieno', 'Dr. Cavin Otieno'),
+        ('available', 'Any available doctor'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('new', 'New'),
+        ('contacted', 'Contacted'),
+        ('booked', 'Booked'),
+        ('declined', 'Declined'),
+    ]
+    
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=20)
+    date_of_birth = models.DateField(blank=True, null=True)
+    preferred_date = models.DateField()
+    preferred_time = models.TimeField()
+    service_type = models.CharField(max_length=20, choices=SERVICE_CHOICES)
+    preferred_doctor = models.CharField(max_length=20, choices=DOCTOR_CHOICES, blank=True)
+    reason_for_visit = models.TextField()
+    current_medications = models.TextField(blank=True)
+    allergies = models.TextField(blank=True)
+    insurance_provider = models.CharField(max_length=100, blank=True)
+    is_emergency = models.BooleanField(default=False)
+    is_first_visit = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
+    appointment = models.ForeignKey(
+        Appointment, on_delete=models.SET_NULL, blank=True, null=True, related_name='requests',
+        help_text="Appointment booked for this request",
+    )
+    client_ip = models.GenericIPAddressField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.first_name} {self.last_name} - {self.preferred_date}"
+    
+    class Meta:
+        verbose_name = "Appointment Request"
+        verbose_name_plural = "Appointment Requests"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='appt_request_status_idx'),
+        ]
+
+
+
+class OutboundEmail(models.Model):
+    """Queued outgoing email, delivered by the process_email_outbox command."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(help_text="List of recipient addresses")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.subject} - {self.status}"
+    
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+
+class SearchDocument(models.Model):
+    """Denormalised search text for one indexed object (see medical.search)."""
+    kind = models.CharField(max_length=100, help_text="Model label, e.g. medical.patient")
+    object_id = models.BigIntegerField()
+    content = models.TextField()
+    phone = models.CharField(max_length=20, blank=True)
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'phone'], name='search_kind_phone_idx'),
+        ]
+
+
+class AppointmentRollup(models.Model):
+    """
+    Appointment counts and revenue for one day, doctor and service (see medical.reporting).
+    
+    Signal handlers append signed delta rows as appointments change; the
+    compact_rollups command merges each day's rows into one per doctor and
+    service. Reports sum whatever rows exist for a key.
+    """
+    date = models.DateField()
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='rollups')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='rollups')
+    appointments = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    no_shows = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    is_compacted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.date} - doctor {self.doctor_id} - service {self.service_id}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'doctor', 'service'], name='rollup_date_idx'),
+            models.Index(fields=['is_compacted', 'date'], name='rollup_pending_idx'),
+        ]
+
+
+class ClinicDashboard(AppointmentRollup):
+    """Admin entry point for the operations dashboard."""
+    
+    class Meta:
+        proxy = True
+        verbose_name = "Clinic dashboard"
+        verbose_name_plural = "Clinic dashboard"
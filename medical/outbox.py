@@ -0,0 +1,156 @@
+"""
+Database-backed outbox for outgoing email.
+
+Requests only insert an OutboundEmail row. The process_email_outbox command
+claims due messages in batches, delivers each batch over a single mail
+connection, retries failures with exponential backoff and parks messages
+that keep failing as 'failed' for staff to inspect in the admin.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+# Claims older than this belong to a worker that died mid-batch.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+
+def queue_email(subject, body, recipients, from_email=None):
+    """Queue an email for background delivery and return the outbox row."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def backoff_delay(attempts):
+    """Delay before the next delivery attempt after `attempts` failures."""
+    seconds = BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return datetime.timedelta(seconds=min(seconds, BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(batch_size):
+    """Mark up to batch_size due messages as sending and return them."""
+    now = timezone.now()
+    OutboundEmail.objects.filter(
+        status='sending', claimed_at__lt=now - CLAIM_TIMEOUT,
+    ).update(status='queued', claimed_at=None)
+
+    with transaction.atomic():
+        messages = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[message.pk for message in messages]).update(
+            status='sending', claimed_at=now,
+        )
+    return messages
+
+
+def _record_failure(message, error, now, max_attempts):
+    message.attempts += 1
+    message.last_error = f'{type(error).__name__}: {error}'
+    if message.attempts >= max_attempts:
+        message.status = 'failed'
+    else:
+        message.status = 'queued'
+        message.next_attempt_at = now + backoff_delay(message.attempts)
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def deliver(messages, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Send claimed messages over one connection and persist their outcome.
+
+    Returns (sent, failed) counts. Any exception while sending a message is
+    recorded against it so one bad message cannot stall the batch. After a
+    failure the connection is closed and reopened for the next message,
+    since the server may have dropped it (the SMTP backend would otherwise
+    keep writing to the dead socket). A connection passed in is left open
+    for the caller to reuse.
+    """
+    now = timezone.now()
+    owns_connection = connection is None
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            _record_failure(message, error, now, max_attempts)
+        failed = len(messages)
+    else:
+        try:
+            reconnect = False
+            for message in messages:
+                try:
+                    if reconnect:
+                        connection.open()
+                        reconnect = False
+                    EmailMessage(
+                        message.subject, message.body, message.from_email,
+                        message.recipients, connection=connection,
+                    ).send()
+                except Exception as error:
+                    _record_failure(message, error, now, max_attempts)
+                    failed += 1
+                    _close_quietly(connection)
+                    reconnect = True
+                else:
+                    message.attempts += 1
+                    message.status = 'sent'
+                    message.sent_at = now
+                    message.last_error = ''
+                    sent += 1
+        finally:
+            if owns_connection:
+                connection.close()
+
+    for message in messages:
+        message.claimed_at = None
+        message.updated_at = now
+    OutboundEmail.objects.bulk_update(messages, [
+        'status', 'attempts', 'next_attempt_at', 'claimed_at',
+        'last_error', 'sent_at', 'updated_at',
+    ])
+    return sent, failed
+
+
+def process_outbox(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Drain all due messages batch by batch; return (sent, failed) totals."""
+    total_sent = total_failed = 0
+    connection = get_connection()
+    try:
+        while True:
+            messages = claim_batch(batch_size)
+            if not messages:
+                break
+            sent, failed = deliver(messages, max_attempts, connection)
+            total_sent += sent
+            total_failed += failed
+            if sent == 0 and failed:
+                # The mail server is refusing everything; leave the rest for later.
+                break
+    finally:
+        connection.close()
+    return total_sent, total_failed
@@ -0,0 +1,248 @@
+"""
+Keyset pagination and estimated counts for large admin changelists.
+
+The stock admin paginator runs an exact COUNT(*) and fetches each page with
+OFFSET, both of which slow down as the table grows. KeysetPaginator instead
+seeks from the last row of the previous page (WHERE (date, id) < (...)),
+so with a matching index every page costs the same, and it reports totals
+from the database's table statistics rather than counting.
+
+Keyset paging applies when the changelist is ordered by plain, non-null
+model fields ending in the primary key (e.g. -appointment_date, -id); any
+other column sort falls back to numbered OFFSET pages.
+"""
+
+from urllib.parse import quote, unquote
+
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+CURSOR_SEPARATOR = ','
+
+# Tables estimated below this size are counted exactly.
+ESTIMATE_THRESHOLD = 10000
+# Filtered changelists count at most this many rows.
+COUNT_LIMIT = 10000
+
+
+def table_row_estimate(model, using='default'):
+    """Return the planner's row estimate for model's table, or None if unavailable."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s',
+                    [table],
+                )
+                rows = [row[0] for row in cursor.fetchall()]
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                rows = [row[0] for row in cursor.fetchall()]
+            elif connection.vendor == 'sqlite':
+                # sqlite_stat1 only exists once ANALYZE has run; the first
+                # number of each index's stat is its row count.
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+                rows = [int(row[0].split()[0]) for row in cursor.fetchall()]
+            else:
+                return None
+    except DatabaseError:
+        return None
+    rows = [row for row in rows if row is not None and row >= 0]
+    return max(rows) if rows else None
+
+
+class KeysetPage(Page):
+    """A page whose neighbours are known from the seek query, not the count."""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_cursor(self):
+        return self.paginator.cursor_for(self.object_list[-1])
+
+    def previous_cursor(self):
+        return self.paginator.cursor_for(self.object_list[0])
+
+
+class KeysetPaginator(Paginator):
+    """
+    Paginator that seeks from a cursor and estimates its count.
+
+    after/before are cursors taken from KeysetPage.next_cursor() and
+    previous_cursor(); without either, page numbers are served with OFFSET.
+    object_list must be an ordered QuerySet.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, after=None, before=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.after = after
+        self.before = before
+        self.current_page = None
+        self.count_accuracy = None
+
+    @cached_property
+    def keys(self):
+        """Return [(field, descending), ...] for the ordering, or None if it can't be seeked."""
+        opts = self.object_list.model._meta
+        keys = []
+        for item in self.object_list.query.order_by:
+            if not isinstance(item, str):
+                return None
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = opts.pk.name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null:
+                return None
+            if any(field == seen for seen, _ in keys):
+                continue
+            keys.append((field, descending))
+        if not keys or keys[-1][0] != opts.pk:
+            return None
+        return keys
+
+    @cached_property
+    def count(self):
+        """
+        Estimate unfiltered totals from table statistics; cap filtered ones at COUNT_LIMIT.
+
+        count_accuracy is then 'exact', 'estimated' or 'capped'.
+        """
+        queryset = self.object_list
+        if queryset.query.where:
+            count = queryset.order_by()[:COUNT_LIMIT + 1].count()
+            self.count_accuracy = 'capped' if count > COUNT_LIMIT else 'exact'
+            return min(count, COUNT_LIMIT)
+        estimate = table_row_estimate(queryset.model, queryset.db)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            self.count_accuracy = 'estimated'
+            return estimate
+        self.count_accuracy = 'exact'
+        return queryset.count()
+
+    def validate_number(self, number):
+        # Page numbers are only labels for cursor pages, and the count may
+        # be an estimate, so they are not checked against num_pages.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
+    def cursor_for(self, obj):
+        return CURSOR_SEPARATOR.join(quote(field.value_to_string(obj), safe='') for field, _ in self.keys)
+
+    def _seek(self, cursor, forward):
+        """Return a Q selecting rows that sort after (or before) cursor."""
+        parts = cursor.split(CURSOR_SEPARATOR)
+        if len(parts) != len(self.keys):
+            raise InvalidPage('Invalid cursor')
+        try:
+            values = [field.to_python(unquote(part)) for (field, _), part in zip(self.keys, parts)]
+        except ValidationError:
+            raise InvalidPage('Invalid cursor')
+
+        condition = Q()
+        for index in reversed(range(len(self.keys))):
+            field, descending = self.keys[index]
+            lookup = 'lt' if descending == forward else 'gt'
+            step = Q(**{f'{field.name}__{lookup}': values[index]})
+            if index < len(self.keys) - 1:
+                step |= Q(**{field.name: values[index]}) & condition
+            condition = step
+
+        # The redundant bound on the leading key lets the planner seek into
+        # the index instead of scanning it and filtering on the OR.
+        field, descending = self.keys[0]
+        lookup = 'lte' if descending == forward else 'gte'
+        return Q(**{f'{field.name}__{lookup}': values[0]}) & condition
+
+    def page(self, number):
+        if self.keys is None or not (self.after or self.before):
+            self.current_page = self._offset_page(number)
+            return self.current_page
+
+        number = self.validate_number(number)
+        queryset = self.object_list
+        if self.after:
+            rows = list(queryset.filter(self._seek(self.after, forward=True))[:self.per_page + 1])
+            has_next, has_previous = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            reverse = queryset.filter(self._seek(self.before, forward=False)).reverse()
+            rows = list(reverse[:self.per_page + 1])
+            has_next, has_previous = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            if not has_previous:
+                number = 1
+        self.current_page = KeysetPage(rows, number, self, has_next, has_previous)
+        return self.current_page
+
+    def _offset_page(self, number):
+        """Serve a numbered page, finding the next page by over-fetching one row."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise InvalidPage('That page contains no results')
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], number, self, has_next, number > 1)
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that ignores cursor parameters as filters and exposes page links."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting and filtering links start again from the first page.
+        remove = [*(remove or []), AFTER_VAR, BEFORE_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        super().get_results(request)
+        page = self.paginator.current_page
+        self.keyset = self.paginator.keys is not None
+        self.next_page_url = self.previous_page_url = self.first_page_url = None
+        if page is None or not page.object_list:
+            return
+        if page.has_next():
+            params = {PAGE_VAR: page.number + 1}
+            if self.keyset:
+                params[AFTER_VAR] = page.next_cursor()
+            self.next_page_url = self.get_query_string(params)
+        if page.has_previous():
+            if self.keyset:
+                params = {PAGE_VAR: max(page.number - 1, 1), BEFORE_VAR: page.previous_cursor()}
+            else:
+                params = {PAGE_VAR: page.number - 1}
+            self.previous_page_url = self.get_query_string(params)
+            self.first_page_url = self.get_query_string()
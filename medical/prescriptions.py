@@ -0,0 +1,71 @@
+"""
+Nightly prescription scheduler: completes ended prescriptions and flags
+upcoming refills.
+
+Both queues are ranges of active prescriptions on the (status, end_date)
+index (see PrescriptionQuerySet):
+
+    ended        past end_date with no refills left, or past the refill
+                 grace period with refills unused -> status 'completed'
+    refills_due  refills left and ending within the notice period
+                 -> refill_flagged_for = end_date
+
+Each queue is walked in (end_date, id) order, batch_size rows at a time,
+and every batch is applied with one UPDATE that repeats the queue's
+conditions, so rows changed since they were read are left alone. A
+transition takes a row out of its queue, which makes a run idempotent: a
+run that crashes or is interrupted leaves every batch either applied or
+untouched, and the next run simply continues with what is still due.
+
+A refill flag records the end date it was raised for, so when staff
+extend end_date for a refill the flag no longer matches
+(Prescription.refill_due is False) and the prescription is flagged again
+once its new end date comes within the notice period.
+"""
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Prescription
+
+
+BATCH_SIZE = 5000
+
+
+def _apply(queryset, changes, batch_size):
+    """Apply changes to the rows of queryset in (end_date, id) batches; return the rows updated."""
+    queryset = queryset.order_by('end_date', 'pk')
+    updated, last = 0, None
+    while True:
+        batch = queryset
+        if last is not None:
+            end_date, pk = last
+            # The redundant bound lets the planner seek into the index (see medical.pagination).
+            batch = batch.filter(
+                Q(end_date__gte=end_date) & (Q(end_date__gt=end_date) | Q(end_date=end_date, pk__gt=pk))
+            )
+        keys = list(batch.values_list('end_date', 'pk')[:batch_size])
+        if not keys:
+            return updated
+        updated += queryset.filter(pk__in=[pk for _, pk in keys]).update(**changes, updated_at=timezone.now())
+        last = keys[-1]
+
+
+def complete_ended(today=None, grace_days=None, batch_size=BATCH_SIZE):
+    """Mark ended prescriptions as completed; return how many changed."""
+    return _apply(Prescription.objects.ended(today, grace_days), {'status': 'completed'}, batch_size)
+
+
+def flag_refills(today=None, notice_days=None, batch_size=BATCH_SIZE):
+    """Flag prescriptions with refills left that end soon; return how many were newly flagged."""
+    queryset = Prescription.objects.refills_due(today, notice_days).exclude(refill_flagged_for=F('end_date'))
+    return _apply(queryset, {'refill_flagged_for': F('end_date')}, batch_size)
+
+
+def run_scheduler(today=None, notice_days=None, grace_days=None, batch_size=BATCH_SIZE):
+    """Run both transitions for today; return {'completed': n, 'refills_flagged': n}."""
+    today = today or timezone.localdate()
+    return {
+        'completed': complete_ended(today, grace_days, batch_size),
+        'refills_flagged': flag_refills(today, notice_days, batch_size),
+    }
@@ -0,0 +1,81 @@
+"""
+Per-client token-bucket rate limiting backed by the default cache.
+
+Each client IP gets a bucket of `capacity` tokens that refills at `rate`
+tokens per second; a request spends one token and is refused while the
+bucket is empty. The bucket is stored as (tokens, timestamp) and refilled
+lazily on the next request, so idle clients cost nothing.
+
+Reads and writes are not atomic, so concurrent requests from one client
+on several workers may occasionally spend the same token; the limit is
+meant to stop floods, not to count exactly. With LocMemCache each process
+keeps its own buckets; use a shared cache when running several workers.
+"""
+
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+KEY_PREFIX = 'medical:ratelimit'
+
+# (capacity, refill per minute) when FORM_RATE_LIMIT is not set.
+DEFAULT_LIMIT = (5, 2)
+
+
+def client_ip(request):
+    """
+    Return the client address.
+
+    Behind RATE_LIMIT_PROXY_COUNT trusted reverse proxies, each appending to
+    X-Forwarded-For, the client is the entry that many places from the end.
+    """
+    proxies = getattr(settings, 'RATE_LIMIT_PROXY_COUNT', 0)
+    if proxies:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class TokenBucket:
+    """A token bucket for one scope; take() spends a token for a client key."""
+
+    def __init__(self, scope, capacity, per_minute):
+        self.scope = scope
+        self.capacity = capacity
+        self.rate = per_minute / 60
+
+    def take(self, key, now=None):
+        """Spend a token; return 0 if allowed, else the seconds until one is available."""
+        now = time.time() if now is None else now
+        cache_key = f'{KEY_PREFIX}:{self.scope}:{key}'
+        tokens, updated = cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return math.ceil((1 - tokens) / self.rate)
+        # Keep the bucket until it would have refilled completely.
+        cache.set(cache_key, (tokens - 1, now), math.ceil(self.capacity / self.rate))
+        return 0
+
+
+def rate_limit(scope, methods=('POST',)):
+    """
+    Refuse requests over the FORM_RATE_LIMIT (capacity, per minute) budget per client IP.
+
+    Refused requests reach the view with request.rate_limited set to the
+    Retry-After seconds, so it can answer 429 in its own format.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            request.rate_limited = 0
+            if request.method in methods:
+                capacity, per_minute = getattr(settings, 'FORM_RATE_LIMIT', DEFAULT_LIMIT)
+                request.rate_limited = TokenBucket(scope, capacity, per_minute).take(client_ip(request))
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
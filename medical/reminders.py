@@ -0,0 +1,328 @@
+"""
+Appointment reminders, precomputed into send slots and sent in batches.
+
+Every active appointment gets one AppointmentReminder per bucket (24 and 2
+hours before it starts). Its send_at is rounded down to a SLOT_MINUTES
+slot, and the (status, send_at) index makes the due reminders one range
+scan. The post_save signal on Appointment keeps the rows in step
+(schedule_reminders): a rescheduled appointment moves its reminders, a
+cancelled one cancels them, and a bucket whose time has already passed
+when the appointment is booked is skipped.
+
+The send_reminders worker sleeps until the next slot, claims the due
+reminders batch by batch and hands each batch to the REMINDER_TRANSPORT.
+Reminders still unsent after half their lead time (12 hours late for the
+24h bucket) are marked missed instead of being sent late. Failures are
+retried on the next pass, up to MAX_ATTEMPTS.
+
+Transports take a batch of ReminderMessages and report the ones that
+failed. LocalTransport keeps messages in memory as a stand-in for an SMS or
+WhatsApp gateway, and EmailTransport queues them through the email outbox;
+a gateway transport subclasses BaseTransport.
+
+Appointments written without signals (bulk_create, update(), raw SQL) are
+picked up by `send_reminders --rebuild`.
+"""
+
+import collections
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Appointment, AppointmentReminder
+from .outbox import queue_email
+from .search import normalize_phone
+
+
+logger = logging.getLogger(__name__)
+
+BUCKET_OFFSETS = {
+    '24h': datetime.timedelta(hours=24),
+    '2h': datetime.timedelta(hours=2),
+}
+SLOT_MINUTES = 5
+MAX_ATTEMPTS = 3
+
+# Claims older than this belong to a worker that died mid-batch.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+# Appointment ids per SELECT ... WHERE appointment_id IN (...).
+ID_BATCH_SIZE = 1000
+
+
+ReminderMessage = collections.namedtuple('ReminderMessage', ['reminder_id', 'to', 'text'])
+
+
+class BaseTransport:
+    """Interface shared by the reminder transports."""
+
+    def address(self, patient):
+        """Return where to send the patient's reminders, or '' if there is nowhere."""
+        raise NotImplementedError
+
+    def send_batch(self, messages):
+        """Send ReminderMessages; return {reminder_id: error} for the ones that failed."""
+        raise NotImplementedError
+
+
+class LocalTransport(BaseTransport):
+    """
+    Stand-in for an SMS or WhatsApp gateway.
+
+    Messages to the patient's phone number are logged and kept in
+    LocalTransport.outbox (the most recent OUTBOX_SIZE, shared by the process).
+    """
+    OUTBOX_SIZE = 1000
+    outbox = collections.deque(maxlen=OUTBOX_SIZE)
+
+    def address(self, patient):
+        return normalize_phone(patient.phone)
+
+    def send_batch(self, messages):
+        for message in messages:
+            logger.info('Reminder to %s: %s', message.to, message.text)
+        self.outbox.extend(messages)
+        return {}
+
+
+class EmailTransport(BaseTransport):
+    """Queue reminders as emails to the patient through the outbox (see medical.outbox)."""
+
+    def address(self, patient):
+        return patient.email
+
+    def send_batch(self, messages):
+        for message in messages:
+            queue_email(f'Appointment reminder - {settings.SITE_NAME}', message.text, [message.to])
+        return {}
+
+
+_transport = None
+
+
+def get_transport():
+    """Return the configured reminder transport (one instance per process)."""
+    global _transport
+    if _transport is None:
+        _transport = import_string(getattr(settings, 'REMINDER_TRANSPORT', 'medical.reminders.LocalTransport'))()
+    return _transport
+
+
+def send_slot(appointment, offset):
+    """Start of the slot in which the reminder offset before appointment is due."""
+    start = timezone.make_aware(datetime.datetime.combine(appointment.appointment_date, appointment.appointment_time))
+    due = start - offset
+    return due.replace(minute=due.minute - due.minute % SLOT_MINUTES, second=0, microsecond=0)
+
+
+def _planned(reminder, send_at, now):
+    """Apply the wanted send_at (None if the appointment is inactive) to reminder; return whether it changed."""
+    if send_at is None:
+        if reminder.status == 'pending':
+            reminder.status = 'cancelled'
+            return True
+        return False
+    if send_at == reminder.send_at and reminder.status not in ('cancelled', 'missed'):
+        return False
+    if send_at <= now:
+        # Moved into the past, or revived too late to be sent.
+        if reminder.status == 'pending':
+            reminder.status = 'cancelled'
+            return True
+        return False
+    if reminder.status == 'sending':
+        # Rescheduled while a worker sends it; the next save moves it.
+        return False
+    reminder.send_at = send_at
+    reminder.status = 'pending'
+    reminder.attempts = 0
+    reminder.last_error = ''
+    return True
+
+
+def schedule_reminders(appointments, now=None):
+    """Create, move or cancel the reminders of saved appointments to match their time and status."""
+    now = now or timezone.now()
+    appointments = [appointment for appointment in appointments if appointment.pk]
+    for start in range(0, len(appointments), ID_BATCH_SIZE):
+        batch = appointments[start:start + ID_BATCH_SIZE]
+        existing = {
+            (reminder.appointment_id, reminder.bucket): reminder
+            for reminder in AppointmentReminder.objects.filter(appointment__in=[appointment.pk for appointment in batch])
+        }
+        created, changed = [], []
+        for appointment in batch:
+            active = appointment.status in Appointment.ACTIVE_STATUSES
+            for bucket, offset in BUCKET_OFFSETS.items():
+                send_at = send_slot(appointment, offset) if active else None
+                reminder = existing.get((appointment.pk, bucket))
+                if reminder is None:
+                    if send_at is not None and send_at > now:
+                        created.append(AppointmentReminder(appointment=appointment, bucket=bucket, send_at=send_at))
+                elif _planned(reminder, send_at, now):
+                    reminder.updated_at = now
+                    changed.append(reminder)
+        AppointmentReminder.objects.bulk_create(created, ignore_conflicts=True)
+        AppointmentReminder.objects.bulk_update(changed, ['send_at', 'status', 'attempts', 'last_error', 'updated_at'])
+
+
+def schedule_created_reminders(appointments, now=None):
+    """
+    schedule_reminders for appointments just inserted with bulk_create.
+
+    Backends that do not return ids from bulk_create (MySQL) leave them
+    without a pk, so active ones are read back by doctor, day and start
+    time, which overlap checking makes unique among active bookings.
+    """
+    saved = [appointment for appointment in appointments if appointment.pk]
+    keys = {
+        (appointment.doctor_id, appointment.appointment_date, appointment.appointment_time)
+        for appointment in appointments
+        if not appointment.pk and appointment.status in Appointment.ACTIVE_STATUSES
+    }
+    if keys:
+        saved += [
+            appointment for appointment in Appointment.objects.filter(
+                doctor_id__in={doctor_id for doctor_id, _, _ in keys},
+                appointment_date__in={day for _, day, _ in keys},
+                status__in=Appointment.ACTIVE_STATUSES,
+            ).only('pk', 'doctor', 'appointment_date', 'appointment_time', 'status')
+            if (appointment.doctor_id, appointment.appointment_date, appointment.appointment_time) in keys
+        ]
+    schedule_reminders(saved, now)
+
+
+def rebuild(batch_size=2000, now=None):
+    """Schedule reminders for every upcoming appointment; return how many appointments were checked."""
+    now = now or timezone.now()
+    queryset = Appointment.objects.filter(
+        appointment_date__gte=timezone.localdate(now),
+    ).only('pk', 'appointment_date', 'appointment_time', 'status').order_by('pk')
+    last_pk, checked = None, 0
+    while True:
+        batch = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        batch = list(batch[:batch_size])
+        if not batch:
+            return checked
+        schedule_reminders(batch, now)
+        checked += len(batch)
+        last_pk = batch[-1].pk
+
+
+def reminder_text(reminder):
+    appointment = reminder.appointment
+    days = (appointment.appointment_date - timezone.localdate(reminder.send_at)).days
+    when = {0: 'today', 1: 'tomorrow'}.get(days, f'on {appointment.appointment_date:%d %b}')
+    return (
+        f'Reminder: {appointment.patient.first_name}, you have an appointment with '
+        f'{appointment.doctor.doctor_name} {when} at {appointment.appointment_time:%H:%M}. '
+        f'To reschedule, call {settings.CONTACT_PHONE}. - {settings.SITE_NAME}'
+    )
+
+
+def next_send_at():
+    """Slot of the earliest pending reminder, or None."""
+    return AppointmentReminder.objects.filter(status='pending').aggregate(next=Min('send_at'))['next']
+
+
+def mark_missed(now):
+    """Mark pending reminders more than half their lead time late as missed; return how many."""
+    missed = 0
+    for bucket, offset in BUCKET_OFFSETS.items():
+        missed += AppointmentReminder.objects.filter(
+            status='pending', bucket=bucket, send_at__lt=now - offset / 2,
+        ).update(status='missed', updated_at=now)
+    return missed
+
+
+def claim_batch(batch_size, now, exclude=()):
+    """Mark up to batch_size due reminders, other than exclude, as sending and return them."""
+    AppointmentReminder.objects.filter(
+        status='sending', claimed_at__lt=now - CLAIM_TIMEOUT,
+    ).update(status='pending', claimed_at=None)
+
+    with transaction.atomic():
+        reminders = list(
+            AppointmentReminder.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('appointment__patient', 'appointment__doctor')
+            .filter(status='pending', send_at__lte=now)
+            .exclude(pk__in=exclude)
+            .order_by('send_at', 'pk')[:batch_size]
+        )
+        AppointmentReminder.objects.filter(pk__in=[reminder.pk for reminder in reminders]).update(
+            status='sending', claimed_at=now,
+        )
+    return reminders
+
+
+def deliver(reminders, transport, now):
+    """Send claimed reminders in one transport batch and store the outcome; return (sent, failed, skipped)."""
+    stale, messages, failures, unreachable = [], [], {}, set()
+    for reminder in reminders:
+        appointment = reminder.appointment
+        offset = BUCKET_OFFSETS[reminder.bucket]
+        if appointment.status not in Appointment.ACTIVE_STATUSES or send_slot(appointment, offset) != reminder.send_at:
+            # Changed by update() or raw SQL since the reminder was scheduled.
+            stale.append(reminder)
+            continue
+        to = transport.address(appointment.patient)
+        if to:
+            messages.append(ReminderMessage(reminder.pk, to, reminder_text(reminder)))
+        else:
+            failures[reminder.pk] = 'No address for this patient.'
+            unreachable.add(reminder.pk)
+    if messages:
+        try:
+            failures.update(transport.send_batch(messages))
+        except Exception as error:
+            failures.update((message.reminder_id, f'{type(error).__name__}: {error}') for message in messages)
+
+    sent = [message.reminder_id for message in messages if message.reminder_id not in failures]
+    AppointmentReminder.objects.filter(pk__in=sent).update(
+        status='sent', attempts=F('attempts') + 1, sent_at=now, claimed_at=None, last_error='', updated_at=now,
+    )
+    failed, sent_ids = [], set(sent)
+    for reminder in reminders:
+        if reminder.pk not in failures:
+            reminder.status = 'sent' if reminder.pk in sent_ids else 'cancelled'
+            continue
+        reminder.attempts += 1
+        retry = reminder.attempts < MAX_ATTEMPTS and reminder.pk not in unreachable
+        reminder.status = 'pending' if retry else 'failed'
+        reminder.last_error = failures[reminder.pk]
+        reminder.claimed_at = None
+        reminder.updated_at = now
+        failed.append(reminder)
+    AppointmentReminder.objects.bulk_update(failed, ['status', 'attempts', 'last_error', 'claimed_at', 'updated_at'])
+    if stale:
+        AppointmentReminder.objects.filter(pk__in=[reminder.pk for reminder in stale]).update(
+            status='cancelled', claimed_at=None, updated_at=now,
+        )
+        schedule_reminders([reminder.appointment for reminder in stale], now)
+    return len(sent), len(failed), len(stale)
+
+
+def process_due(batch_size=500, now=None, transport=None):
+    """Send every due reminder batch by batch; return (sent, failed, skipped) totals."""
+    now = now or timezone.now()
+    transport = transport or get_transport()
+    mark_missed(now)
+    totals, retry_later = [0, 0, 0], set()
+    while True:
+        reminders = claim_batch(batch_size, now, retry_later)
+        if not reminders:
+            break
+        counts = deliver(reminders, transport, now)
+        # Failed reminders go back to pending; retry them on the next pass, not in this one.
+        retry_later.update(reminder.pk for reminder in reminders if reminder.status == 'pending')
+        totals = [total + count for total, count in zip(totals, counts)]
+        if counts[0] == 0 and counts[1]:
+            # The transport is refusing everything; leave the rest for the next pass.
+            break
+    return tuple(totals)
@@ -0,0 +1,239 @@
+"""
+Daily appointment rollups and the reports built on them.
+
+AppointmentRollup keeps, per appointment date, doctor and service, the
+number of appointments, how many were completed, cancelled or missed, and
+the revenue of completed visits. An appointment's revenue (Service.price
+plus the doctor's consultation fee) is stored on it when it is completed
+(set_revenue), so the delta withdrawing a visit subtracts exactly what was
+added even if the prices have changed since.
+
+Every saved or deleted appointment appends signed delta rows (-1 for its
+previous state, +1 for the new one), so writers never contend for a shared
+counter row. The nightly compact_rollups command merges each day's rows
+into one per doctor and service. Reports sum all rows for their date range,
+so they read at most a few rows per day, doctor and service however many
+appointments there are.
+
+Appointments written without signals (bulk_create, QuerySet.update(), raw
+SQL) are not counted until rebuild() recomputes their dates; the importer
+records its rows itself.
+"""
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Appointment, AppointmentRollup, Doctor, Service
+
+
+STATE_FIELDS = ('appointment_date', 'doctor_id', 'service_id', 'status', 'revenue')
+STATUS_COUNTERS = {
+    'completed': 'completed',
+    'cancelled': 'cancelled',
+    'no_show': 'no_shows',
+}
+COUNTERS = ('appointments', 'completed', 'cancelled', 'no_shows', 'revenue')
+
+# Delta rows younger than this may belong to an open transaction, so
+# compaction leaves them for the next run.
+COMPACTION_DELAY = datetime.timedelta(minutes=5)
+
+
+def appointment_state(appointment):
+    """Return the fields of an appointment that its rollup depends on."""
+    return {field: getattr(appointment, field) for field in STATE_FIELDS}
+
+
+def set_revenue(appointments):
+    """
+    Store the revenue of completed appointments that have none yet; clear it on the others.
+
+    The amount is the current service price plus consultation fee and is
+    kept for as long as the appointment stays completed.
+    """
+    pending = []
+    for appointment in appointments:
+        if appointment.status != 'completed':
+            appointment.revenue = None
+        elif appointment.revenue is None:
+            pending.append(appointment)
+    if not pending:
+        return
+    fees = dict(Doctor.objects.filter(pk__in={appointment.doctor_id for appointment in pending}).values_list('pk', 'consultation_fee'))
+    prices = dict(Service.objects.filter(pk__in={appointment.service_id for appointment in pending}).values_list('pk', 'price'))
+    for appointment in pending:
+        appointment.revenue = fees.get(appointment.doctor_id, 0) + prices.get(appointment.service_id, 0)
+
+
+def record_states(changes):
+    """
+    Append the rollup deltas for (state, sign) pairs, merged per key.
+
+    sign is +1 for a state being added and -1 for one being removed.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for state, sign in changes:
+        row = totals[state['appointment_date'], state['doctor_id'], state['service_id']]
+        row['appointments'] += sign
+        counter = STATUS_COUNTERS.get(state['status'])
+        if counter:
+            row[counter] += sign
+        if state['status'] == 'completed':
+            row['revenue'] += sign * (state['revenue'] or 0)
+    AppointmentRollup.objects.bulk_create([
+        AppointmentRollup(date=date, doctor_id=doctor_id, service_id=service_id, **row)
+        for (date, doctor_id, service_id), row in totals.items()
+        if any(row.values())
+    ])
+
+
+def record_change(old_state, new_state):
+    """Record one appointment moving from old_state to new_state (either may be None)."""
+    changes = []
+    if old_state:
+        changes.append((old_state, -1))
+    if new_state:
+        changes.append((new_state, 1))
+    record_states(changes)
+
+
+def record_appointments(appointments):
+    """Record newly created appointments, e.g. after bulk_create."""
+    record_states([(appointment_state(appointment), 1) for appointment in appointments])
+
+
+# Annotation names for the summed counters (they can't reuse the field names).
+SUM_NAMES = {
+    'appointments': 'appointment_count',
+    'completed': 'completed_count',
+    'cancelled': 'cancelled_count',
+    'no_shows': 'no_show_count',
+    'revenue': 'revenue_total',
+}
+
+
+def _rollup_sums():
+    return {name: Sum(counter) for counter, name in SUM_NAMES.items()}
+
+
+def compact(now=None):
+    """Merge each day's settled delta rows into one row per doctor and service; return the days compacted."""
+    cutoff = (now or timezone.now()) - COMPACTION_DELAY
+    settled = AppointmentRollup.objects.filter(created_at__lt=cutoff)
+    days = list(
+        settled.filter(is_compacted=False).order_by('date').values_list('date', flat=True).distinct()
+    )
+    for day in days:
+        with transaction.atomic():
+            rows = settled.filter(date=day)
+            merged = list(rows.values('doctor_id', 'service_id').annotate(**_rollup_sums()).order_by())
+            rows.delete()
+            AppointmentRollup.objects.bulk_create([
+                AppointmentRollup(
+                    date=day, doctor_id=row['doctor_id'], service_id=row['service_id'], is_compacted=True,
+                    **{counter: row[name] for counter, name in SUM_NAMES.items()},
+                )
+                for row in merged
+                if any(row[name] for name in SUM_NAMES.values())
+            ])
+    return len(days)
+
+
+def rebuild(start=None, end=None):
+    """Recompute the rollups of appointments dated start..end (all when omitted) from the table."""
+    appointments = Appointment.objects.all()
+    rollups = AppointmentRollup.objects.all()
+    if start:
+        appointments = appointments.filter(appointment_date__gte=start)
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        appointments = appointments.filter(appointment_date__lte=end)
+        rollups = rollups.filter(date__lte=end)
+
+    completed = Q(status='completed')
+    totals = (
+        appointments
+        .values('appointment_date', 'doctor_id', 'service_id')
+        .annotate(
+            appointments=Count('id'),
+            completed=Count('id', filter=completed),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            no_shows=Count('id', filter=Q(status='no_show')),
+            revenue=Coalesce(
+                Sum('revenue', filter=completed),
+                Value(Decimal('0')), output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in totals.iterator(chunk_size=2000):
+            batch.append(AppointmentRollup(date=row.pop('appointment_date'), is_compacted=True, **row))
+            if len(batch) >= 2000:
+                AppointmentRollup.objects.bulk_create(batch)
+                batch = []
+        AppointmentRollup.objects.bulk_create(batch)
+
+
+def _with_rates(row):
+    attended = row['completed_count'] + row['no_show_count']
+    row['no_show_rate'] = row['no_show_count'] * 100 / attended if attended else None
+    return row
+
+
+def _add(total, row):
+    for name in SUM_NAMES.values():
+        total[name] = total.get(name, 0) + (row[name] or 0)
+    return total
+
+
+def dashboard(start, end):
+    """
+    Return the dashboard figures for appointments dated start..end, read from the rollups.
+
+    Two grouped scans of the rollup rows in range, one per doctor and
+    service pair and one per day; the per-doctor, per-service and overall
+    figures are summed from the pairs in Python.
+    """
+    rows = AppointmentRollup.objects.filter(date__gte=start, date__lte=end)
+    sums = _rollup_sums()
+    pairs = list(rows.values('doctor_id', 'service_id').annotate(**sums).order_by())
+    by_day = list(rows.values('date').annotate(**sums).order_by('date'))
+
+    doctors = {
+        row['pk']: row for row in
+        Doctor.objects.filter(pk__in={pair['doctor_id'] for pair in pairs}).values('pk', 'first_name', 'last_name')
+    }
+    services = dict(Service.objects.filter(pk__in={pair['service_id'] for pair in pairs}).values_list('pk', 'name'))
+    totals, by_doctor, by_service = {}, {}, {}
+    for pair in pairs:
+        _add(totals, pair)
+        doctor = doctors[pair['doctor_id']]
+        _add(by_doctor.setdefault(pair['doctor_id'], {
+            'doctor_id': pair['doctor_id'], 'first_name': doctor['first_name'], 'last_name': doctor['last_name'],
+        }), pair)
+        _add(by_service.setdefault(pair['service_id'], {
+            'service_id': pair['service_id'], 'name': services[pair['service_id']],
+        }), pair)
+    return {
+        'start': start,
+        'end': end,
+        'totals': _with_rates(_add(totals, dict.fromkeys(SUM_NAMES.values(), 0))),
+        'by_doctor': sorted(
+            (_with_rates(row) for row in by_doctor.values() if row['appointment_count']),
+            key=lambda row: -row['appointment_count'],
+        ),
+        'by_service': sorted(
+            (_with_rates(row) for row in by_service.values() if row['appointment_count']),
+            key=lambda row: (-row['revenue_total'], -row['appointment_count']),
+        ),
+        'by_day': [row for row in by_day if row['appointment_count']],
+    }
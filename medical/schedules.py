@@ -0,0 +1,217 @@
+"""
+Read-only doctor schedules as an iCalendar feed and a paginated JSON API.
+
+Each request first runs one aggregate query over the doctor's appointments
+in the requested window (latest updated_at of the appointments, their
+patients and services, plus the row count). That gives the strong ETag and
+Last-Modified, so a client polling an unchanged schedule gets a 304 without
+the appointments being read. Otherwise the appointments are fetched in one
+query joined to their patient and service.
+
+Rows changed with QuerySet.update() or raw SQL keep their old updated_at
+and are not picked up until something else in the window changes.
+
+Schedules name patients, so they are served to staff sessions or with the
+per-doctor feed token shown in the doctor admin (for calendar clients that
+cannot log in). Tokens are signed with SECRET_KEY; rotating it revokes them.
+"""
+
+import datetime
+import hashlib
+
+from django.core.signing import Signer
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .models import Appointment, Doctor
+
+
+FEED_TOKEN_SALT = 'medical.schedules.feed'
+
+# Default window around today, and the longest window a request may ask for.
+DAYS_BEFORE = 30
+DAYS_AFTER = 90
+MAX_DAYS = 366
+
+PAGE_SIZE = 100
+
+# Bump when the output format changes so cached copies are refetched.
+FORMAT_VERSION = 1
+
+ICAL_STATUSES = {
+    'pending': 'TENTATIVE',
+    'confirmed': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+    'no_show': 'CANCELLED',
+}
+
+
+def feed_token(doctor_id):
+    return Signer(salt=FEED_TOKEN_SALT).signature(str(doctor_id))
+
+
+def check_feed_token(doctor_id, token):
+    return bool(token) and constant_time_compare(token, feed_token(doctor_id))
+
+
+def parse_window(params):
+    """Return (start, end) dates from the start/end query parameters, raising ValueError."""
+    today = timezone.localdate()
+    start = datetime.date.fromisoformat(params['start']) if params.get('start') else today - datetime.timedelta(days=DAYS_BEFORE)
+    end = datetime.date.fromisoformat(params['end']) if params.get('end') else start + datetime.timedelta(days=DAYS_BEFORE + DAYS_AFTER)
+    if end < start or (end - start).days > MAX_DAYS:
+        raise ValueError(f'end must be on or after start and at most {MAX_DAYS} days later.')
+    return start, end
+
+
+def window_filter(start, end, prefix=''):
+    return Q(**{f'{prefix}appointment_date__gte': start, f'{prefix}appointment_date__lte': end})
+
+
+def get_schedule_state(doctor_id, start, end):
+    """
+    Return the doctor with the change markers of their appointments in the window.
+
+    One query: the doctor row grouped with aggregates over the joined
+    appointments, patients and services. None if the doctor doesn't exist.
+    """
+    in_window = window_filter(start, end, 'appointments__')
+    return (
+        Doctor.objects
+        .filter(pk=doctor_id)
+        .only('first_name', 'last_name', 'specialization', 'updated_at')
+        .annotate(
+            appointment_count=Count('appointments', filter=in_window),
+            appointments_changed=Max('appointments__updated_at', filter=in_window),
+            patients_changed=Max('appointments__patient__updated_at', filter=in_window),
+            services_changed=Max('appointments__service__updated_at', filter=in_window),
+        )
+        .first()
+    )
+
+
+def _change_stamps(doctor):
+    return [
+        doctor.updated_at, doctor.appointments_changed,
+        doctor.patients_changed, doctor.services_changed,
+    ]
+
+
+def last_modified(doctor):
+    """Return the latest change to the doctor or their scheduled appointments."""
+    return max(stamp for stamp in _change_stamps(doctor) if stamp is not None)
+
+
+def schedule_etag(doctor, *parts):
+    """Return a strong ETag for the doctor's schedule state and the response variant in parts."""
+    values = [FORMAT_VERSION, doctor.pk, doctor.appointment_count, *_change_stamps(doctor), *parts]
+    key = '|'.join(str(value) for value in values)
+    return f'"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def get_appointments(doctor_id, start, end):
+    """Return the doctor's appointments in the window, joined to patient and service."""
+    return (
+        Appointment.objects
+        .filter(window_filter(start, end), doctor_id=doctor_id)
+        .select_related('patient', 'service')
+        .only(
+            'appointment_date', 'appointment_time', 'end_time', 'status', 'priority',
+            'reason_for_visit', 'updated_at', 'created_at',
+            'patient__first_name', 'patient__last_name',
+            'service__name', 'service__duration_minutes',
+        )
+        .order_by('appointment_date', 'appointment_time', 'id')
+    )
+
+
+def appointment_span(appointment):
+    """Return aware (start, end) datetimes for an appointment in the clinic's time zone."""
+    tz = timezone.get_current_timezone()
+    start = datetime.datetime.combine(appointment.appointment_date, appointment.appointment_time)
+    if appointment.end_time:
+        end = datetime.datetime.combine(appointment.appointment_date, appointment.end_time)
+    else:
+        end = start + datetime.timedelta(minutes=appointment.service.duration_minutes)
+    return timezone.make_aware(start, tz), timezone.make_aware(end, tz)
+
+
+def patient_label(appointment):
+    return f'{appointment.patient.first_name} {appointment.patient.last_name}'
+
+
+def appointment_data(appointment):
+    start, end = appointment_span(appointment)
+    return {
+        'id': appointment.pk,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'status': appointment.status,
+        'priority': appointment.priority,
+        'patient': {'id': appointment.patient_id, 'name': patient_label(appointment)},
+        'service': {'id': appointment.service_id, 'name': appointment.service.name},
+        'reason_for_visit': appointment.reason_for_visit,
+        'updated_at': appointment.updated_at.isoformat(),
+    }
+
+
+def _ical_text(value):
+    """Escape a TEXT value (RFC 5545 section 3.3.11)."""
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def _ical_time(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _fold(line):
+    """Fold a content line to 75 octets, continuation lines starting with a space."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Don't split a multi-byte character.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts)
+
+
+def render_ical(doctor, appointments, domain):
+    """Return the iCalendar text for the doctor's appointments."""
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Clinic//Doctor schedules//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_ical_text(doctor.doctor_name)}',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT1M',
+    ]
+    for appointment in appointments:
+        start, end = appointment_span(appointment)
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:appointment-{appointment.pk}@{domain}',
+            f'DTSTAMP:{_ical_time(appointment.updated_at)}',
+            f'CREATED:{_ical_time(appointment.created_at)}',
+            f'LAST-MODIFIED:{_ical_time(appointment.updated_at)}',
+            f'DTSTART:{_ical_time(start)}',
+            f'DTEND:{_ical_time(end)}',
+            f'SUMMARY:{_ical_text(f"{appointment.service.name} - {patient_label(appointment)}")}',
+            f'DESCRIPTION:{_ical_text(appointment.reason_for_visit)}',
+            f'STATUS:{ICAL_STATUSES.get(appointment.status, "CONFIRMED")}',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
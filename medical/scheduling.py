@@ -0,0 +1,331 @@
+"""
+Appointment slot engine for the medical app.
+
+Free slots are derived with interval arithmetic: the booked intervals for a
+doctor's day are fetched in a single query, merged, and subtracted from the
+doctor's working hours. No per-slot database lookups are made.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Appointment, DoubleBookingError, ScheduleBucket, Service
+from .reporting import set_revenue
+
+
+# Grid on which slot start times are offered (matches the booking form).
+SLOT_INTERVAL_MINUTES = 30
+
+# Statuses that no longer occupy the doctor's calendar.
+INACTIVE_STATUSES = ['cancelled']
+
+# Fallback working hours when a doctor has no explicit times set,
+# mirroring utils.is_business_hours (0=Monday, 6=Sunday).
+DEFAULT_WORKING_HOURS = {
+    0: (datetime.time(8, 0), datetime.time(17, 0)),
+    1: (datetime.time(8, 0), datetime.time(17, 0)),
+    2: (datetime.time(8, 0), datetime.time(17, 0)),
+    3: (datetime.time(8, 0), datetime.time(17, 0)),
+    4: (datetime.time(8, 0), datetime.time(17, 0)),
+    5: (datetime.time(9, 0), datetime.time(14, 0)),
+}
+
+DAY_ABBREVIATIONS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def _to_minutes(value):
+    """Convert a time to minutes since midnight."""
+    return value.hour * 60 + value.minute
+
+
+def _from_minutes(minutes):
+    """Convert minutes since midnight back to a time."""
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def parse_available_days(available_days):
+    """Return the set of weekday numbers listed in Doctor.available_days."""
+    weekdays = set()
+    for token in (available_days or '').split(','):
+        token = token.strip().lower()[:3]
+        if token in DAY_ABBREVIATIONS:
+            weekdays.add(DAY_ABBREVIATIONS.index(token))
+    return weekdays
+
+
+def get_working_hours(doctor, day):
+    """Return (start, end) minutes the doctor works on day, or None."""
+    weekday = day.weekday()
+    days = parse_available_days(doctor.available_days)
+    if days and weekday not in days:
+        return None
+
+    if doctor.available_time_start and doctor.available_time_end:
+        start, end = doctor.available_time_start, doctor.available_time_end
+    elif weekday in DEFAULT_WORKING_HOURS:
+        start, end = DEFAULT_WORKING_HOURS[weekday]
+    else:
+        return None
+
+    start, end = _to_minutes(start), _to_minutes(end)
+    if end <= start:
+        return None
+    return start, end
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+def subtract_intervals(window, busy):
+    """Return the free gaps of window once the merged busy intervals are removed."""
+    window_start, window_end = window
+    gaps = []
+    cursor = window_start
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        gaps.append((cursor, window_end))
+    return gaps
+
+
+def slots_in_gaps(gaps, duration, origin, interval=SLOT_INTERVAL_MINUTES, not_before=None):
+    """Yield slot start minutes on the grid anchored at origin that fit in gaps."""
+    for gap_start, gap_end in gaps:
+        if not_before is not None:
+            gap_start = max(gap_start, not_before)
+        offset = (gap_start - origin) % interval
+        start = gap_start if offset == 0 else gap_start + interval - offset
+        while start + duration <= gap_end:
+            yield start
+            start += interval
+
+
+def bookings_queryset(doctor_ids, day):
+    """Return the (doctor_id, start, end, duration) rows that occupy doctors' calendars on day."""
+    return (
+        Appointment.objects
+        .filter(doctor_id__in=doctor_ids, appointment_date=day)
+        .exclude(status__in=INACTIVE_STATUSES)
+        .values_list('doctor_id', 'appointment_time', 'end_time', 'service__duration_minutes')
+    )
+
+
+def booked_intervals(doctor_ids, day):
+    """
+    Return {doctor_id: [(start, end), ...]} of active bookings on day.
+
+    Runs one query; rows without end_time fall back to the service duration.
+    """
+    intervals = {doctor_id: [] for doctor_id in doctor_ids}
+    for doctor_id, start_time, end_time, duration in bookings_queryset(doctor_ids, day):
+        start = _to_minutes(start_time)
+        if end_time is not None and _to_minutes(end_time) > start:
+            end = _to_minutes(end_time)
+        else:
+            # Missing end_time, or one that wrapped past midnight.
+            end = start + (duration or SLOT_INTERVAL_MINUTES)
+        intervals[doctor_id].append((start, end))
+    return intervals
+
+
+def _free_slots(doctor, day, duration, busy, interval):
+    """Compute free slot start times for one doctor from pre-fetched bookings."""
+    hours = get_working_hours(doctor, day)
+    if hours is None:
+        return []
+
+    not_before = None
+    now = timezone.localtime()
+    if day < now.date():
+        return []
+    if day == now.date():
+        not_before = _to_minutes(now.time()) + 1
+
+    gaps = subtract_intervals(hours, merge_intervals(busy))
+    return [
+        _from_minutes(start)
+        for start in slots_in_gaps(gaps, duration, hours[0], interval, not_before)
+    ]
+
+
+def get_available_slots(doctor, day, service=None, interval=SLOT_INTERVAL_MINUTES):
+    """Return the free slot start times for doctor on day."""
+    duration = service.duration_minutes if service else interval
+    if not doctor.is_available:
+        return []
+    busy = booked_intervals([doctor.pk], day)[doctor.pk]
+    return _free_slots(doctor, day, duration, busy, interval)
+
+
+def get_available_slots_for_doctors(doctors, day, service=None, interval=SLOT_INTERVAL_MINUTES):
+    """Return {doctor: [slot, ...]} for several doctors with a single bookings query."""
+    doctors = [doctor for doctor in doctors if doctor.is_available]
+    duration = service.duration_minutes if service else interval
+    busy = booked_intervals([doctor.pk for doctor in doctors], day)
+    return {
+        doctor: _free_slots(doctor, day, duration, busy[doctor.pk], interval)
+        for doctor in doctors
+    }
+
+
+def is_slot_available(doctor, day, start_time, duration):
+    """Check whether [start_time, start_time + duration) is free for doctor."""
+    hours = get_working_hours(doctor, day)
+    if hours is None:
+        return False
+    start = _to_minutes(start_time)
+    end = start + duration
+    if start < hours[0] or end > hours[1]:
+        return False
+    for busy_start, busy_end in booked_intervals([doctor.pk], day)[doctor.pk]:
+        if busy_start < end and start < busy_end:
+            return False
+    return True
+
+
+def appointment_interval(appointment):
+    """Return the (start, end) minutes an appointment occupies."""
+    start = _to_minutes(appointment.appointment_time)
+    if appointment.end_time is not None and _to_minutes(appointment.end_time) > start:
+        return start, _to_minutes(appointment.end_time)
+    return start, start + (appointment.service.duration_minutes or SLOT_INTERVAL_MINUTES)
+
+
+def describe_conflict(other):
+    """Human-readable message for a booking that blocks a new one."""
+    start, end = appointment_interval(other)
+    return (
+        f"The doctor is already booked from {_from_minutes(start):%H:%M} "
+        f"to {_from_minutes(end % (24 * 60)):%H:%M} on {other.appointment_date}."
+    )
+
+
+def find_conflicts(appointments):
+    """
+    Return [(appointment, blocking_appointment), ...] for a batch of bookings.
+
+    Existing bookings for every (doctor, day) in the batch are fetched in one
+    query; bookings within the batch are also checked against each other.
+    """
+    candidates = [
+        appointment for appointment in appointments
+        if appointment.status not in INACTIVE_STATUSES
+    ]
+    if not candidates:
+        return []
+
+    keys = {(appointment.doctor_id, appointment.appointment_date) for appointment in candidates}
+    existing = (
+        Appointment.objects
+        .filter(
+            doctor_id__in={doctor_id for doctor_id, _ in keys},
+            appointment_date__in={day for _, day in keys},
+        )
+        .exclude(status__in=INACTIVE_STATUSES)
+        .exclude(pk__in=[appointment.pk for appointment in candidates if appointment.pk])
+        .select_related('service')
+        .only(
+            'doctor', 'appointment_date', 'appointment_time', 'end_time',
+            'service__duration_minutes',
+        )
+    )
+    booked = defaultdict(list)
+    for other in existing:
+        key = (other.doctor_id, other.appointment_date)
+        if key in keys:
+            booked[key].append((appointment_interval(other), other))
+
+    conflicts = []
+    for appointment in candidates:
+        key = (appointment.doctor_id, appointment.appointment_date)
+        start, end = appointment_interval(appointment)
+        for (other_start, other_end), other in booked[key]:
+            if other_start < end and start < other_end:
+                conflicts.append((appointment, other))
+                break
+        else:
+            booked[key].append(((start, end), appointment))
+    return conflicts
+
+
+def set_end_times(appointments):
+    """Fill in missing end_time values using one query for service durations."""
+    pending = [appointment for appointment in appointments if appointment.end_time is None]
+    durations = dict(
+        Service.objects
+        .filter(pk__in={appointment.service_id for appointment in pending})
+        .values_list('pk', 'duration_minutes')
+    ) if pending else {}
+    for appointment in pending:
+        start = datetime.datetime.combine(appointment.appointment_date, appointment.appointment_time)
+        duration = durations.get(appointment.service_id) or SLOT_INTERVAL_MINUTES
+        appointment.end_time = (start + datetime.timedelta(minutes=duration)).time()
+
+
+def _lock_buckets(appointments):
+    """Lock the schedule bucket of every active booking, in a stable order so batches cannot deadlock."""
+    keys = sorted({
+        (appointment.doctor_id, appointment.appointment_date)
+        for appointment in appointments
+        if appointment.status not in INACTIVE_STATUSES
+    })
+    for doctor_id, day in keys:
+        ScheduleBucket.acquire(doctor_id, day)
+
+
+def book_appointments(appointments, batch_size=None):
+    """
+    Insert a batch of appointments, rejecting the whole batch on any overlap.
+
+    Appointment.save is bypassed, so end_time and revenue are computed here.
+    """
+    appointments = list(appointments)
+    set_end_times(appointments)
+    set_revenue(appointments)
+    with transaction.atomic():
+        _lock_buckets(appointments)
+        conflicts = find_conflicts(appointments)
+        if conflicts:
+            raise DoubleBookingError([
+                describe_conflict(other) for _, other in conflicts
+            ])
+        return Appointment.objects.bulk_create(appointments, batch_size=batch_size)
+
+
+def book_available_appointments(appointments, batch_size=None):
+    """
+    Insert the appointments of a batch that do not overlap an existing booking.
+
+    Returns (created, conflicts) where conflicts is the find_conflicts list
+    of bookings left out.
+    """
+    appointments = list(appointments)
+    set_end_times(appointments)
+    set_revenue(appointments)
+    with transaction.atomic():
+        _lock_buckets(appointments)
+        conflicts = find_conflicts(appointments)
+        blocked = {id(appointment) for appointment, _ in conflicts}
+        created = Appointment.objects.bulk_create(
+            [appointment for appointment in appointments if id(appointment) not in blocked],
+            batch_size=batch_size,
+        )
+    return created, conflicts
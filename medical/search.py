@@ -0,0 +1,316 @@
+"""
+Full-text search for the patient, medical record and test result admins.
+
+Each indexed object is reduced to a document: the text of its
+SEARCH_FIELDS plus a normalised phone number. A search backend stores the
+documents and answers queries where every word must match the start of a
+word in the document (so "jo sm" finds "John Smith"):
+
+- MySQLFullTextBackend: SearchDocument rows with a FULLTEXT index.
+- SQLiteFTSBackend: SearchDocument rows mirrored into an FTS5 table.
+- InMemorySearchBackend: an inverted index held in each process.
+
+SEARCH_BACKEND picks a backend by dotted path; by default the one matching
+the database is used, or the in-memory index for other databases. Signal
+handlers (medical.signals) keep the index current on save and delete; rows
+written with bulk_create, update() or raw SQL need rebuild_search_index.
+"""
+
+import bisect
+import re
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, F, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import MedicalRecord, Patient, SearchDocument, TestResult
+from .utils import format_phone_number
+
+
+SEARCH_FIELDS = {
+    Patient: ('first_name', 'last_name', 'email', 'insurance_policy_number'),
+    MedicalRecord: ('diagnosis', 'treatment_plan'),
+    TestResult: ('test_name', 'interpretation'),
+}
+PHONE_FIELDS = {
+    Patient: 'phone',
+}
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+PHONE_RE = re.compile(r'^\+?[\d\s().-]{7,}$')
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def normalize_phone(value):
+    """Return value in the format_phone_number form, or '' if it is not a phone number."""
+    digits = re.sub(r'[^\d+]', '', value or '')
+    if len(digits.lstrip('+')) < 7:
+        return ''
+    return format_phone_number(digits)
+
+
+def parse_phone(term):
+    """Return the normalised phone number if the search term looks like one."""
+    return normalize_phone(term) if PHONE_RE.match(term.strip()) else ''
+
+
+def document_for(instance):
+    """Return (content, phone) for an indexed model instance."""
+    model = type(instance)
+    content = ' '.join(str(getattr(instance, field) or '') for field in SEARCH_FIELDS[model])
+    phone_field = PHONE_FIELDS.get(model)
+    phone = normalize_phone(getattr(instance, phone_field)) if phone_field else ''
+    return content, phone
+
+
+class BaseSearchBackend:
+    """Interface shared by the search backends."""
+
+    def index(self, instance):
+        """Add or refresh the document for instance."""
+        raise NotImplementedError
+
+    def index_many(self, instances):
+        """Add or refresh the documents for instances, e.g. after bulk_create."""
+        for instance in instances:
+            self.index(instance)
+
+    def remove(self, instance):
+        """Drop the document for instance."""
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=2000):
+        """Re-create every document from the database."""
+        raise NotImplementedError
+
+    def search(self, model, term):
+        """Return the pks of model matching term, as an iterable or a values() queryset."""
+        raise NotImplementedError
+
+
+class DocumentSearchBackend(BaseSearchBackend):
+    """Base for backends that keep documents in the SearchDocument table."""
+
+    # Words shorter than this are not in the full-text index.
+    min_token_length = 1
+
+    def match(self, kind, tokens):
+        """Return a Q for documents of kind containing every token as a prefix."""
+        raise NotImplementedError
+
+    def index(self, instance):
+        content, phone = document_for(instance)
+        SearchDocument.objects.update_or_create(
+            kind=instance._meta.label_lower, object_id=instance.pk,
+            defaults={'content': content, 'phone': phone},
+        )
+
+    def index_many(self, instances):
+        documents = []
+        for instance in instances:
+            content, phone = document_for(instance)
+            documents.append(SearchDocument(
+                kind=instance._meta.label_lower, object_id=instance.pk, content=content, phone=phone,
+            ))
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target.
+        with_target = connection.features.supports_update_conflicts_with_target
+        SearchDocument.objects.bulk_create(
+            documents, update_conflicts=True,
+            unique_fields=['kind', 'object_id'] if with_target else None,
+            update_fields=['content', 'phone'],
+        )
+
+    def remove(self, instance):
+        SearchDocument.objects.filter(kind=instance._meta.label_lower, object_id=instance.pk).delete()
+
+    def rebuild(self, batch_size=2000):
+        SearchDocument.objects.all().delete()
+        for model, fields in SEARCH_FIELDS.items():
+            kind = model._meta.label_lower
+            columns = [*fields, *([PHONE_FIELDS[model]] if model in PHONE_FIELDS else [])]
+            batch = []
+            for instance in model.objects.only(*columns).iterator(chunk_size=batch_size):
+                content, phone = document_for(instance)
+                batch.append(SearchDocument(kind=kind, object_id=instance.pk, content=content, phone=phone))
+                if len(batch) >= batch_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+
+    def search(self, model, term):
+        kind = model._meta.label_lower
+        words = tokenize(term)
+        tokens = [word for word in words if len(word) >= self.min_token_length]
+        if tokens:
+            condition = self.match(kind, tokens)
+        elif words:
+            # Only words too short for the index: fall back to substrings.
+            condition = Q(*[Q(content__icontains=word) for word in words], kind=kind)
+        else:
+            condition = None
+
+        phone = parse_phone(term) if model in PHONE_FIELDS else ''
+        if phone:
+            by_phone = Q(kind=kind, phone=phone)
+            condition = by_phone if condition is None else condition | by_phone
+        if condition is None:
+            return SearchDocument.objects.none().values('object_id')
+        return SearchDocument.objects.filter(condition).values('object_id')
+
+
+class MySQLFullTextBackend(DocumentSearchBackend):
+    """MATCH ... AGAINST in boolean mode on a FULLTEXT index."""
+
+    # innodb_ft_min_token_size defaults to 3.
+    min_token_length = 3
+
+    def match(self, kind, tokens):
+        query = ' '.join(f'+{token}*' for token in tokens)
+        return Q(Func(
+            F('content'), Value(query),
+            template='MATCH (%(expressions)s IN BOOLEAN MODE)', arg_joiner=') AGAINST (',
+            output_field=BooleanField(),
+        ), kind=kind)
+
+
+class SQLiteFTSBackend(DocumentSearchBackend):
+    """FTS5 prefix queries on medical_searchdocument_fts."""
+
+    def match(self, kind, tokens):
+        # kind is an UNINDEXED FTS column, so the lookup is driven by the
+        # full-text match rather than by scanning every document of kind.
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        return Q(id__in=RawSQL(
+            'SELECT rowid FROM medical_searchdocument_fts '
+            'WHERE medical_searchdocument_fts MATCH %s AND kind = %s', [query, kind],
+        ))
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+    Inverted index built from the database on first use.
+
+    Each process holds its own copy and applies only its own changes, so
+    with several worker processes another worker's edits appear after a
+    restart or rebuild; use a database backend for multi-process servers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = None
+
+    def _empty(self):
+        return {'postings': {}, 'documents': {}, 'phones': {}, 'sorted_tokens': None}
+
+    def _add(self, index, pk, content, phone):
+        tokens = set(tokenize(content))
+        index['documents'][pk] = (tokens, phone)
+        for token in tokens:
+            if token not in index['postings']:
+                index['postings'][token] = set()
+                index['sorted_tokens'] = None
+            index['postings'][token].add(pk)
+        if phone:
+            index['phones'].setdefault(phone, set()).add(pk)
+
+    def _discard(self, index, pk):
+        tokens, phone = index['documents'].pop(pk, (set(), ''))
+        for token in tokens:
+            index['postings'][token].discard(pk)
+        if phone:
+            index['phones'][phone].discard(pk)
+
+    def _get_indexes(self):
+        with self._lock:
+            if self._indexes is None:
+                indexes = {}
+                for model, fields in SEARCH_FIELDS.items():
+                    index = indexes[model] = self._empty()
+                    columns = [*fields, *([PHONE_FIELDS[model]] if model in PHONE_FIELDS else [])]
+                    for instance in model.objects.only(*columns).iterator(chunk_size=2000):
+                        self._add(index, instance.pk, *document_for(instance))
+                self._indexes = indexes
+            return self._indexes
+
+    def _apply(self, model, pk, document=None):
+        with self._lock:
+            if self._indexes is None:
+                # Not built yet; the first search will read the change from the database.
+                return
+            index = self._indexes[model]
+            self._discard(index, pk)
+            if document is not None:
+                self._add(index, pk, *document)
+
+    def index(self, instance):
+        document = document_for(instance)
+        transaction.on_commit(lambda: self._apply(type(instance), instance.pk, document))
+
+    def remove(self, instance):
+        pk = instance.pk
+        transaction.on_commit(lambda: self._apply(type(instance), pk))
+
+    def rebuild(self, batch_size=2000):
+        with self._lock:
+            self._indexes = None
+        self._get_indexes()
+
+    def _prefix_matches(self, index, token):
+        if index['sorted_tokens'] is None:
+            index['sorted_tokens'] = sorted(index['postings'])
+        tokens = index['sorted_tokens']
+        matches = set()
+        for position in range(bisect.bisect_left(tokens, token), len(tokens)):
+            if not tokens[position].startswith(token):
+                break
+            matches |= index['postings'][tokens[position]]
+        return matches
+
+    def search(self, model, term):
+        index = self._get_indexes()[model]
+        with self._lock:
+            matches = None
+            for token in tokenize(term):
+                found = self._prefix_matches(index, token)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    break
+            matches = set(matches or ())
+            phone = parse_phone(term) if model in PHONE_FIELDS else ''
+            if phone:
+                matches |= index['phones'].get(phone, set())
+        return matches
+
+
+VENDOR_BACKENDS = {
+    'mysql': MySQLFullTextBackend,
+    'sqlite': SQLiteFTSBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the configured search backend (one instance per process)."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'SEARCH_BACKEND', None)
+        backend_class = import_string(path) if path else VENDOR_BACKENDS.get(connection.vendor, InMemorySearchBackend)
+        _backend = backend_class()
+    return _backend
+
+
+def search_queryset(queryset, term):
+    """Filter queryset to objects matching term, directly or through their patient."""
+    backend = get_search_backend()
+    model = queryset.model
+    condition = Q(pk__in=backend.search(model, term))
+    if model is not Patient and any(field.name == 'patient' for field in model._meta.get_fields()):
+        condition |= Q(patient__in=backend.search(Patient, term))
+    return queryset.filter(condition)
@@ -0,0 +1,105 @@
+"""
+Signal handlers for the medical app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .alerts import clear_results, flag_results
+from .caching import build_services_listing, invalidate_page_cache
+from .labs import SOURCE_FIELDS, sync_analyte_values
+from .models import Appointment, Department, Doctor, MedicalRecord, Page, Patient, Service, TestResult
+from .reminders import schedule_reminders
+from .reporting import STATE_FIELDS, appointment_state, record_change
+from .search import get_search_backend
+
+
+@receiver([post_save, post_delete], sender=Page)
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_marketing_pages(sender, **kwargs):
+    """Drop cached marketing pages once a change to their content is committed."""
+    transaction.on_commit(invalidate_page_cache)
+
+
+@receiver([post_save, post_delete], sender=Service)
+def rebuild_services_listing(sender, **kwargs):
+    """Recompute the services listing once the change is committed."""
+    transaction.on_commit(build_services_listing)
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_save, sender=TestResult)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Refresh the search document of a saved patient, record or test result."""
+    if raw:
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Patient)
+@receiver(post_delete, sender=MedicalRecord)
+@receiver(post_delete, sender=TestResult)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Drop the search document of a deleted patient, record or test result."""
+    get_search_backend().remove(instance)
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_rollup_state(sender, instance, raw=False, **kwargs):
+    """Load the stored state of an appointment about to be updated."""
+    instance._rollup_state = None
+    if not raw and not instance._state.adding:
+        instance._rollup_state = Appointment.objects.filter(pk=instance.pk).values(*STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=Appointment)
+def update_rollups(sender, instance, raw=False, **kwargs):
+    """Move the appointment's contribution from its old state to the saved one."""
+    if raw:
+        return
+    old_state = getattr(instance, '_rollup_state', None)
+    new_state = appointment_state(instance)
+    if old_state != new_state:
+        record_change(old_state, new_state)
+
+
+@receiver(post_save, sender=Appointment)
+def update_reminders(sender, instance, raw=False, **kwargs):
+    """Create, move or cancel the appointment's reminders (see medical.reminders)."""
+    if not raw:
+        schedule_reminders([instance])
+
+
+# Deleting one of these cascades to the appointments' rollup rows as well.
+ROLLUP_PARENTS = (Department, Doctor, Service)
+
+
+@receiver(post_delete, sender=Appointment)
+def remove_from_rollups(sender, instance, origin=None, **kwargs):
+    """Withdraw a deleted appointment from the rollups."""
+    model = getattr(origin, 'model', type(origin))
+    if issubclass(model, ROLLUP_PARENTS):
+        # A delta would point at a doctor or service that is being deleted.
+        return
+    record_change(appointment_state(instance), None)
+
+
+@receiver(post_save, sender=TestResult)
+def update_analyte_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Re-extract the numeric values of a saved test result."""
+    if raw or (update_fields is not None and not set(update_fields) & {*SOURCE_FIELDS, 'patient_id'}):
+        return
+    sync_analyte_values([instance])
+
+
+@receiver(post_save, sender=TestResult)
+def flag_critical_result(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Open or refresh the critical alert of a saved test result, or clear it (see medical.alerts)."""
+    if raw or (update_fields is not None and 'result_status' not in update_fields):
+        return
+    if instance.result_status == 'critical':
+        flag_results([instance.pk])
+    elif not created:
+        clear_results([instance.pk])
@@ -0,0 +1,47 @@
+"""
+Template tags for the self-hosted vendor assets and non-blocking stylesheets.
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from medical.vendor import ASSETS, vendor_url as _vendor_url
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_url(name):
+    """
+    Return the URL of a vendor asset (see medical.vendor.ASSETS).
+
+    Usage: <script src="{% vendor_url 'bootstrap.js' %}"></script>
+    """
+    return _vendor_url(name)
+
+
+@register.simple_tag
+def async_stylesheet(path):
+    """
+    Load a stylesheet without blocking the first paint.
+
+    Usage: {% async_stylesheet 'css/pages/home.css' %}
+
+    path is a vendor asset name, a static path or an absolute URL. The
+    stylesheet is preloaded and applied once it arrives; browsers without
+    JavaScript get a normal <link> from the <noscript> fallback. Keep what
+    the page needs for its first screen in includes/critical_css.html.
+    """
+    if path in ASSETS:
+        url = _vendor_url(path)
+    elif path.startswith(('https://', 'http://', '/')):
+        url = path
+    else:
+        url = static(path)
+    return format_html(
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        url, url,
+    )
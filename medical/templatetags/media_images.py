@@ -0,0 +1,59 @@
+"""
+Template tags for pre-built responsive image derivatives.
+"""
+
+from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+from medical.images import FORMATS, get_manifest
+
+
+register = template.Library()
+
+
+def _srcset(variants):
+    return ', '.join(f'{settings.MEDIA_URL}{url} {width}w' for width, url in variants)
+
+
+@register.simple_tag
+def responsive_image(path, alt='', sizes='100vw', width=None, height=None, **attrs):
+    """
+    Render a <picture> for a MEDIA_ROOT-relative image path.
+
+    Usage: {% responsive_image 'images/happy_family_5.jpg' alt='Patient' sizes='80px' width=80 height=80 class='rounded-circle' %}
+
+    Variants come from the manifest written by build_image_derivatives; when
+    it has no entry for path, a plain <img> of the original is rendered.
+    """
+    entry = get_manifest().get(path)
+    if entry:
+        if width is None and height is None:
+            width, height = entry['width'], entry['height']
+        elif height is None:
+            height = round(int(width) * entry['height'] / entry['width'])
+        elif width is None:
+            width = round(int(height) * entry['width'] / entry['height'])
+
+    extra = format_html_join('', ' {}="{}"', sorted(attrs.items()))
+    if width is not None:
+        extra = format_html('{} width="{}"', extra, width)
+    if height is not None:
+        extra = format_html('{} height="{}"', extra, height)
+
+    if not entry or not entry['variants'].get('jpeg'):
+        return format_html('<img src="{}{}" alt="{}"{}>', settings.MEDIA_URL, path, alt, extra)
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMATS[name]['mime'], _srcset(entry['variants'][name]), sizes)
+            for name in ('avif', 'webp')
+            if entry['variants'].get(name)
+        ),
+    )
+    fallback = entry['variants']['jpeg']
+    return format_html(
+        '<picture>{}<img src="{}{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        sources, settings.MEDIA_URL, fallback[-1][1], _srcset(fallback), sizes, alt, extra,
+    )
@@ -1,3 +1,571 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import smtplib
+import tempfile
+import threading
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail, serializers
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clinicproject.assets import AssetMiddleware
+from clinicproject.queries import NPlusOneError, detect_n_plus_one, query_shape
+
+from . import outbox, reporting
+from .forms import ContactForm
+from .labs import extract_values
+from .models import (
+    AnalyteValue, Appointment, AppointmentReminder, AppointmentRollup, Department, Doctor, DoubleBookingError,
+    MedicalRecord, OutboundEmail, Patient, Prescription, SearchDocument, Service, TestResult,
+)
+from . import scheduling
+from .scheduling import book_available_appointments
+from .search import search_queryset
+from .transfer import AppointmentImporter, PatientImporter
+
+
+def create_schedule(number=0):
+    """Return a (doctor, patient, 30 minute service) for booking tests."""
+    department, _ = Department.objects.get_or_create(name='Tests')
+    doctor = Doctor.objects.create(
+        first_name='Test', last_name=str(number), phone='0700000000',
+        email='doctor@example.com', license_number=f'TEST-{number}',
+        specialization='general', department=department,
+    )
+    patient = Patient.objects.create(
+        first_name='Test', last_name=str(number), phone='0700000001',
+        email='patient@example.com', date_of_birth=datetime.date(1990, 1, 1), gender='O',
+    )
+    service = Service.objects.create(
+        name='Test Consultation', category='consultation',
+        description='Test service', duration_minutes=30, price=0,
+    )
+    return doctor, patient, service
+
+
+class QueryPlanTests(TestCase):
+    """The hot query shapes are served by their indexes (see check_query_plans)."""
+
+    def test_query_plans_use_their_indexes(self):
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+        self.assertIn('OK    slot engine bookings: appt_doctor_date_status_idx', out.getvalue())
+
+    def test_plan_check_rows_are_rolled_back(self):
+        call_command('check_query_plans', stdout=io.StringIO())
+        self.assertFalse(Appointment.objects.exists())
+        self.assertFalse(Doctor.objects.exists())
+
+
+class SlotEngineTests(SimpleTestCase):
+
+    def test_merge_intervals_joins_overlapping_and_touching(self):
+        self.assertEqual(
+            scheduling.merge_intervals([(600, 630), (480, 540), (520, 560), (560, 570), (700, 720)]),
+            [(480, 570), (600, 630), (700, 720)],
+        )
+        self.assertEqual(scheduling.merge_intervals([(480, 600), (500, 530)]), [(480, 600)])
+        self.assertEqual(scheduling.merge_intervals([]), [])
+
+    def test_subtract_intervals_returns_free_gaps(self):
+        window = (480, 1020)
+        self.assertEqual(scheduling.subtract_intervals(window, []), [window])
+        self.assertEqual(
+            scheduling.subtract_intervals(window, [(420, 500), (600, 660), (1000, 1100)]),
+            [(500, 600), (660, 1000)],
+        )
+        self.assertEqual(scheduling.subtract_intervals(window, [(400, 1100)]), [])
+
+    def test_slots_in_gaps_stay_on_the_grid(self):
+        # Gaps starting off the grid round up to the next slot anchored at origin.
+        self.assertEqual(list(scheduling.slots_in_gaps([(480, 600), (615, 700)], 30, 480)), [480, 510, 540, 570, 630, 660])
+        self.assertEqual(list(scheduling.slots_in_gaps([(480, 600)], 60, 480)), [480, 510, 540])
+        self.assertEqual(list(scheduling.slots_in_gaps([(480, 600)], 30, 480, not_before=525)), [540, 570])
+        self.assertEqual(list(scheduling.slots_in_gaps([(480, 500)], 30, 480)), [])
+
+    def test_parse_available_days(self):
+        self.assertEqual(scheduling.parse_available_days('Mon, tuesday,WED,holiday'), {0, 1, 2})
+        self.assertEqual(scheduling.parse_available_days(''), set())
+        self.assertEqual(scheduling.parse_available_days(None), set())
+
+    def test_get_working_hours(self):
+        monday, saturday, sunday = datetime.date(2026, 10, 19), datetime.date(2026, 10, 24), datetime.date(2026, 10, 25)
+        doctor = Doctor(available_days='')
+        self.assertEqual(scheduling.get_working_hours(doctor, monday), (480, 1020))
+        self.assertEqual(scheduling.get_working_hours(doctor, saturday), (540, 840))
+        self.assertIsNone(scheduling.get_working_hours(doctor, sunday))
+
+        doctor = Doctor(available_days='Sun', available_time_start=datetime.time(10), available_time_end=datetime.time(12))
+        self.assertEqual(scheduling.get_working_hours(doctor, sunday), (600, 720))
+        self.assertIsNone(scheduling.get_working_hours(doctor, monday))
+
+        doctor.available_time_end = datetime.time(9)
+        self.assertIsNone(scheduling.get_working_hours(doctor, sunday))
+
+    def test_appointment_interval(self):
+        service = Service(duration_minutes=45)
+        appointment = Appointment(service=service, appointment_time=datetime.time(9, 30))
+        self.assertEqual(scheduling.appointment_interval(appointment), (570, 615))
+        appointment.end_time = datetime.time(10, 30)
+        self.assertEqual(scheduling.appointment_interval(appointment), (570, 630))
+        # An end time at or before the start falls back to the service duration.
+        appointment.end_time = datetime.time(9, 0)
+        self.assertEqual(scheduling.appointment_interval(appointment), (570, 615))
+
+
+class DoubleBookingTests(TestCase):
+
+    def setUp(self):
+        self.doctor, self.patient, self.service = create_schedule()
+        self.day = datetime.date.today() + datetime.timedelta(days=7)
+
+    def appointment(self, hour, minute=0, **kwargs):
+        return Appointment(
+            patient=self.patient, doctor=self.doctor, service=self.service,
+            appointment_date=self.day, appointment_time=datetime.time(hour, minute),
+            reason_for_visit='Test', **kwargs,
+        )
+
+    def test_overlapping_booking_is_rejected(self):
+        self.appointment(9).save()
+        with self.assertRaises(DoubleBookingError):
+            self.appointment(9, 15).save()
+        self.appointment(9, 30).save()
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_cancelled_booking_frees_the_slot(self):
+        self.appointment(9, status='cancelled').save()
+        self.appointment(9).save()
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_batch_leaves_out_overlapping_bookings(self):
+        self.appointment(9).save()
+        created, conflicts = book_available_appointments([
+            self.appointment(9, 15), self.appointment(10), self.appointment(10, 10),
+        ])
+        self.assertEqual([appointment.appointment_time for appointment in created], [datetime.time(10)])
+        self.assertEqual(len(conflicts), 2)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Bookings racing on separate connections wait for the bucket lock and are then rejected."""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Threads need a file database; set DATABASES TEST NAME.')
+
+    def test_concurrent_overlapping_bookings_accept_one(self):
+        doctor, patient, service = create_schedule()
+        day = datetime.date.today() + datetime.timedelta(days=7)
+        start = threading.Barrier(8)
+        outcomes = []
+
+        def book(minute):
+            try:
+                start.wait()
+                Appointment(
+                    patient=patient, doctor=doctor, service=service,
+                    appointment_date=day, appointment_time=datetime.time(9, minute),
+                    reason_for_visit='Test',
+                ).save()
+                outcomes.append('booked')
+            except DoubleBookingError:
+                outcomes.append('rejected')
+            except OperationalError:
+                # A writer that did not wait for the bucket lock (SQLite: "database is locked").
+                outcomes.append('error')
+            finally:
+                connection.close()
+
+        # Every start time from 9:00 to 9:28 overlaps the others' 30 minutes.
+        threads = [threading.Thread(target=book, args=(step * 4,)) for step in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['booked'] + ['rejected'] * 7)
+        self.assertEqual(Appointment.objects.filter(doctor=doctor, appointment_date=day).count(), 1)
+
+
+class ChangelistQueryTests(TestCase):
+    """Admin changelists run the same number of queries however many rows a page shows."""
+    CHANGELISTS = ['appointment', 'medicalrecord', 'prescription', 'testresult', 'patient', 'doctor']
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.created = 0
+
+    def add_rows(self, count):
+        """Add count rows to every changelist, each with its own doctor and patient."""
+        day = datetime.date.today()
+        for _ in range(count):
+            self.created += 1
+            doctor, patient, service = create_schedule(self.created)
+            Appointment.objects.create(
+                patient=patient, doctor=doctor, service=service, appointment_date=day,
+                appointment_time=datetime.time(9, 0), reason_for_visit='Test',
+            )
+            record = MedicalRecord.objects.create(
+                patient=patient, doctor=doctor, record_type='consultation', diagnosis='Test',
+            )
+            Prescription.objects.create(
+                patient=patient, doctor=doctor, medical_record=record,
+                medication_name='Test', dosage='1', frequency='1', duration='1', instructions='Test',
+            )
+            TestResult.objects.create(patient=patient, doctor=doctor, test_name='Test', test_type='blood')
+
+    def get_changelist(self, name):
+        response = self.client.get(reverse(f'admin:medical_{name}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_rows(2)
+        counts = {}
+        for name in self.CHANGELISTS:
+            with CaptureQueriesContext(connection) as queries:
+                self.get_changelist(name)
+            counts[name] = len(queries)
+
+        self.add_rows(10)
+        for name in self.CHANGELISTS:
+            with self.subTest(changelist=name), self.assertNumQueries(counts[name]):
+                self.get_changelist(name)
+
+
+class NPlusOneDetectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(6):
+            doctor, patient, _ = create_schedule(number)
+            TestResult.objects.create(patient=patient, doctor=doctor, test_name='Test', test_type='blood')
+
+    def test_relation_read_in_a_loop_raises(self):
+        with self.assertRaises(NPlusOneError) as raised:
+            with detect_n_plus_one():
+                [str(test_result) for test_result in TestResult.objects.all()]
+        message = str(raised.exception)
+        self.assertIn('6x SELECT', message)
+        self.assertIn('medical_patient', message)
+        self.assertIn('medical/models.py', message)
+
+    def test_select_related_passes(self):
+        with detect_n_plus_one() as inspector:
+            [str(test_result) for test_result in TestResult.objects.select_related('patient')]
+        self.assertEqual(inspector.repeated(), [])
+
+    def test_repeats_below_threshold_pass(self):
+        with detect_n_plus_one(threshold=7):
+            [str(test_result) for test_result in TestResult.objects.all()]
+
+    def test_in_lists_share_a_shape(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s)'),
+            query_shape('SELECT * FROM t\nWHERE id IN (%s)'),
+        )
+
+
+class AppointmentImportReminderTests(TestCase):
+
+    def setUp(self):
+        self.doctor, self.patient, self.service = create_schedule()
+        day = datetime.date.today() + datetime.timedelta(days=7)
+        self.csv = '\n'.join([
+            'patient,doctor,service,appointment_date,appointment_time,reason_for_visit,status',
+            f'{self.patient.pk},{self.doctor.license_number},{self.service.pk},{day},09:00,Test,pending',
+            f'{self.patient.pk},{self.doctor.license_number},{self.service.pk},{day},10:00,Test,confirmed',
+            f'{self.patient.pk},{self.doctor.license_number},{self.service.pk},{day},11:00,Test,cancelled',
+        ])
+
+    def assert_reminders_scheduled(self):
+        result = AppointmentImporter().run(io.StringIO(self.csv), 'csv')
+        self.assertEqual((result.created, result.failed), (3, 0))
+        reminders = AppointmentReminder.objects.filter(status='pending')
+        self.assertEqual(reminders.count(), 4)
+        self.assertEqual(
+            set(reminders.values_list('appointment__appointment_time', flat=True)),
+            {datetime.time(9), datetime.time(10)},
+        )
+
+    def test_imported_appointments_get_reminders(self):
+        self.assert_reminders_scheduled()
+
+    def test_reminders_without_bulk_insert_ids(self):
+        # MySQL does not return the ids of bulk_create rows.
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.assert_reminders_scheduled()
+
+
+class AnalyteValueTests(TestCase):
+
+    def test_long_analyte_names_fit_the_column(self):
+        doctor, patient, _ = create_schedule()
+        name = 'Free thyroxine (FT4), measured by electrochemiluminescence immunoassay, fasting sample ' * 3
+        test_result = TestResult.objects.create(
+            patient=patient, doctor=doctor, test_name='Thyroid panel', test_type='blood',
+            values={name: '14.2 pmol/L'},
+        )
+        [row] = extract_values(test_result)
+        self.assertLessEqual(len(row.analyte), AnalyteValue._meta.get_field('analyte').max_length)
+        self.assertFalse(row.analyte.endswith('_'))
+        self.assertEqual(list(AnalyteValue.objects.for_analyte(name).values_list('value', flat=True)), [14.2])
+
+
+class AssetMiddlewareTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        for name in ('images/logo.png', 'medical_records/report.pdf', 'patients/photo.jpg'):
+            os.makedirs(os.path.join(media.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media.name, name), 'wb') as file:
+                file.write(b'data')
+        settings = override_settings(SERVE_ASSETS=True, MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = AssetMiddleware(lambda request: None)
+
+    def get(self, path):
+        return self.middleware(RequestFactory().get(path))
+
+    def test_public_media_is_served(self):
+        response = self.get('/media/images/logo.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'data')
+
+    def test_uploads_are_not_served(self):
+        for path in ('/media/medical_records/report.pdf', '/media/patients/photo.jpg', '/media/images/../patients/photo.jpg'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).status_code, 404)
+
+
+class ServerTimingTests(TestCase):
+
+    def test_header_is_only_sent_to_staff(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+        self.client.force_login(User.objects.create_user('clinician'))
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertIn('db;dur=', self.client.get(reverse('about'))['Server-Timing'])
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_turned_off(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+
+
+class PatientImportSearchTests(TestCase):
+    CSV = '\n'.join([
+        'first_name,last_name,phone,email,date_of_birth,gender',
+        'Wanjiru,Kamau,0711000001,wanjiru@example.com,1985-04-02,F',
+        'Otieno,Odhiambo,0711000002,otieno@example.com,1979-11-20,M',
+    ])
+
+    def assert_import_indexed(self):
+        _, existing, _ = create_schedule()
+        document = SearchDocument.objects.get(kind='medical.patient', object_id=existing.pk)
+        result = PatientImporter().run(io.StringIO(self.CSV), 'csv')
+        self.assertEqual(result.created, 2)
+        self.assertEqual(search_queryset(Patient.objects.all(), 'wanj kam').get().last_name, 'Kamau')
+        self.assertEqual(search_queryset(Patient.objects.all(), 'odhiambo').get().first_name, 'Otieno')
+        # Only the imported rows were indexed; the existing document was left alone.
+        self.assertTrue(SearchDocument.objects.filter(pk=document.pk).exists())
+
+    def test_imported_patients_are_indexed(self):
+        self.assert_import_indexed()
+
+    def test_imported_patients_are_indexed_without_bulk_insert_ids(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.assert_import_indexed()
+
+    def test_fixture_loading_leaves_the_index_alone(self):
+        _, patient, _ = create_schedule()
+        fixture = serializers.serialize('json', [patient])
+        SearchDocument.objects.all().delete()
+        for instance in serializers.deserialize('json', fixture):
+            instance.save()
+        self.assertFalse(SearchDocument.objects.exists())
+
+
+class RollupRevenueTests(TestCase):
+
+    def setUp(self):
+        self.doctor, patient, self.service = create_schedule()
+        self.doctor.consultation_fee = Decimal('500.00')
+        self.doctor.save()
+        self.service.price = Decimal('1000.00')
+        self.service.save()
+        self.appointment = Appointment.objects.create(
+            patient=patient, doctor=self.doctor, service=self.service, appointment_date=datetime.date.today(),
+            appointment_time=datetime.time(9), reason_for_visit='Test',
+        )
+
+    def rollup_revenue(self):
+        return AppointmentRollup.objects.aggregate(total=Sum('revenue'))['total']
+
+    def test_withdrawn_visit_subtracts_the_revenue_it_added(self):
+        self.appointment.status = 'completed'
+        self.appointment.save()
+        self.assertEqual(self.appointment.revenue, Decimal('1500.00'))
+        self.assertEqual(self.rollup_revenue(), Decimal('1500.00'))
+
+        self.service.price = Decimal('4000.00')
+        self.service.save()
+        self.appointment.status = 'no_show'
+        self.appointment.save(update_fields=['status'])
+        self.assertEqual(self.rollup_revenue(), 0)
+        self.assertIsNone(Appointment.objects.get().revenue)
+
+        self.appointment.status = 'completed'
+        self.appointment.save()
+        self.assertEqual(self.rollup_revenue(), Decimal('4500.00'))
+        reporting.rebuild()
+        self.assertEqual(self.rollup_revenue(), Decimal('4500.00'))
+
+
+class DroppingBackend(BaseEmailBackend):
+    """
+    Mail backend whose server drops the connection after DROP_AFTER messages.
+
+    Like Django's SMTP backend, open() does nothing while a connection is
+    set, and sending on a dropped connection fails until it is closed.
+    """
+    DROP_AFTER = 1
+    sent = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connected = self.dropped = False
+        self.count = 0
+
+    def open(self):
+        if self.connected:
+            return False
+        self.connected, self.dropped, self.count = True, False, 0
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, email_messages):
+        if not self.connected or self.dropped:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        if self.count >= self.DROP_AFTER:
+            self.dropped = True
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        self.count += len(email_messages)
+        self.sent.extend(email_messages)
+        return len(email_messages)
+
+
+class OutboxTests(TestCase):
+
+    def queue(self, count=1, **kwargs):
+        return [
+            OutboundEmail.objects.create(
+                subject=f'Message {number}', body='Body', from_email='clinic@example.com',
+                recipients=['patient@example.com'], **kwargs,
+            )
+            for number in range(count)
+        ]
+
+    def test_claim_batch_takes_due_messages(self):
+        due = self.queue(2)
+        self.queue(next_attempt_at=timezone.now() + datetime.timedelta(hours=1))
+        stale = self.queue(status='sending', claimed_at=timezone.now() - outbox.CLAIM_TIMEOUT * 2)
+
+        claimed = outbox.claim_batch(10)
+        self.assertEqual({message.pk for message in claimed}, {message.pk for message in due + stale})
+        self.assertEqual(OutboundEmail.objects.filter(status='sending').count(), 3)
+        self.assertEqual(outbox.claim_batch(10), [])
+
+    def test_sent_messages_are_marked_sent(self):
+        self.queue(3)
+        self.assertEqual(outbox.process_outbox(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('sent', 1)})
+
+    def test_failure_is_retried_with_backoff(self):
+        [message] = self.queue()
+        with mock.patch.object(EmailMessage, 'send', side_effect=smtplib.SMTPRecipientsRefused({})):
+            started = timezone.now()
+            self.assertEqual(outbox.process_outbox(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('queued', 1))
+        self.assertGreaterEqual(message.next_attempt_at, started + outbox.backoff_delay(1))
+        self.assertIn('SMTPRecipientsRefused', message.last_error)
+
+    def test_last_attempt_is_dead_lettered(self):
+        [message] = self.queue(attempts=outbox.MAX_ATTEMPTS - 1)
+        with mock.patch.object(EmailMessage, 'send', side_effect=smtplib.SMTPDataError(554, 'Rejected')):
+            outbox.process_outbox()
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', outbox.MAX_ATTEMPTS))
+
+    @override_settings(EMAIL_BACKEND='medical.tests.DroppingBackend')
+    def test_dropped_connection_is_reopened(self):
+        DroppingBackend.sent = []
+        self.queue(4)
+        # Each drop costs the message sent on the dead connection, not the rest of the run.
+        self.assertEqual(outbox.process_outbox(batch_size=2), (2, 2))
+        self.assertEqual(len(DroppingBackend.sent), 2)
+        self.assertEqual(
+            list(OutboundEmail.objects.order_by('pk').values_list('status', flat=True)),
+            ['sent', 'queued', 'sent', 'queued'],
+        )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class ServicesPageTests(TestCase):
+    fixtures = ['example_services']
+
+    def get_page(self):
+        # The listing is cached across tests.
+        cache.clear()
+        return self.client.get(reverse('services'))
+
+    def test_example_services_are_not_listed_until_made_available(self):
+        self.assertContains(self.get_page(), 'for information about our services')
+
+    def test_price_is_shown_when_set(self):
+        Service.objects.filter(name='Chronic Disease Management').update(is_available=True)
+        Service.objects.filter(name='Laboratory Services').update(is_available=True, price=Decimal('1500'))
+        response = self.get_page()
+        self.assertContains(response, 'card-title fw-bold mb-3">Chronic Disease Management<')
+        self.assertContains(response, 'KSh 1500.00')
+        self.assertContains(response, 'KSh ', count=1)
+
+
+class ContactFormTests(TestCase):
+
+    def form(self, **data):
+        return ContactForm({
+            'first_name': 'Amina', 'last_name': 'Otieno', 'email': 'amina@example.com',
+            'message': 'Hello', 'privacy': 'on', **data,
+        })
+
+    def test_message_is_saved(self):
+        form = self.form()
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.save().name, 'Amina Otieno')
+
+    def test_combined_name_must_fit_the_message(self):
+        form = self.form(first_name='A' * 100, last_name='B' * 100)
+        self.assertFalse(form.is_valid())
+        self.assertIn('last_name', form.errors)
+        self.assertTrue(self.form(first_name='A' * 100, last_name='B' * 99).is_valid())
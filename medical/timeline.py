@@ -0,0 +1,188 @@
+"""
+A patient's appointments, medical records, prescriptions and test results
+as one chronological stream, newest first.
+
+Each source is read with a keyset seek on its (patient, date) index,
+joined to its doctor and limited to one page plus a row, and the four
+ordered result sets are merged in Python (heapq.merge). A page therefore
+costs four short index range scans however long the patient's history is,
+and the next page continues from a cursor (date, source, id) instead of an
+OFFSET.
+
+Entries on the same day are ordered appointment, record, prescription,
+test result, then newest id first.
+"""
+
+import datetime
+import heapq
+
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import Appointment, MedicalRecord, Prescription, TestResult
+
+
+PAGE_SIZE = 50
+CURSOR_SEPARATOR = '.'
+
+# Where the entries go in the rendered page; the parts around it stream first and last.
+ENTRIES_PLACEHOLDER = '<!-- timeline entries -->'
+
+
+def _appointment_summary(appointment):
+    time = appointment.appointment_time.strftime('%H:%M')
+    return appointment.service.name, f'{time}, {appointment.get_status_display()}: {appointment.reason_for_visit}'
+
+
+def _record_summary(record):
+    severity = f', {record.get_severity_display()}' if record.severity else ''
+    return f'{record.get_record_type_display()}{severity}', record.diagnosis
+
+
+def _prescription_summary(prescription):
+    return (
+        f'{prescription.medication_name} {prescription.dosage}',
+        f'{prescription.frequency} for {prescription.duration} ({prescription.get_status_display()})',
+    )
+
+
+def _test_summary(test):
+    result = f', {test.get_result_status_display()}' if test.result_status else ''
+    return test.test_name, f'{test.test_type}: {test.get_status_display()}{result}'
+
+
+# Columns read from the related rows each source joins to.
+RELATED_FIELDS = {
+    'doctor': ('first_name', 'last_name'),
+    'service': ('name',),
+}
+
+
+class Source:
+    """One model shown in the timeline, read by its patient and date_field."""
+
+    def __init__(self, kind, model, date_field, fields, summary, related=('doctor',)):
+        self.kind = kind
+        self.model = model
+        self.date_field = date_field
+        self.fields = fields
+        self.summary = summary
+        self.related = related
+
+    def queryset(self, patient_id, cursor, rank, limit):
+        """Return up to limit rows that sort after cursor, newest first."""
+        rows = (
+            self.model.objects
+            .filter(patient_id=patient_id)
+            .select_related(*self.related)
+            .only(
+                self.date_field, *self.fields, *self.related,
+                *(f'{name}__{field}' for name in self.related for field in RELATED_FIELDS[name]),
+            )
+            .order_by(f'-{self.date_field}', '-id')
+        )
+        if cursor is not None:
+            rows = rows.filter(self._seek(cursor, rank))
+        return rows[:limit]
+
+    def _seek(self, cursor, rank):
+        day, cursor_rank, pk = cursor
+        before = Q(**{f'{self.date_field}__lt': day})
+        if rank < cursor_rank:
+            return before
+        if rank > cursor_rank:
+            return Q(**{f'{self.date_field}__lte': day})
+        # The redundant bound lets the planner seek into the index (see medical.pagination).
+        return Q(**{f'{self.date_field}__lte': day}) & (before | Q(**{self.date_field: day, 'id__lt': pk}))
+
+
+SOURCES = (
+    Source(
+        'appointment', Appointment, 'appointment_date',
+        ('appointment_time', 'status', 'reason_for_visit'),
+        _appointment_summary, related=('doctor', 'service'),
+    ),
+    Source(
+        'record', MedicalRecord, 'record_date',
+        ('record_type', 'severity', 'diagnosis', 'is_confidential'),
+        _record_summary,
+    ),
+    Source(
+        'prescription', Prescription, 'prescribed_date',
+        ('medication_name', 'dosage', 'frequency', 'duration', 'status'),
+        _prescription_summary,
+    ),
+    Source(
+        'test', TestResult, 'test_date',
+        ('test_name', 'test_type', 'status', 'result_status'),
+        _test_summary,
+    ),
+)
+
+
+class Entry:
+    def __init__(self, source, rank, obj):
+        self.kind = source.kind
+        self.label = source.model._meta.verbose_name
+        self.rank = rank
+        self.obj = obj
+        self.date = getattr(obj, source.date_field)
+        self.title, self.detail = source.summary(obj)
+        self.doctor = f'Dr. {obj.doctor.first_name} {obj.doctor.last_name}'
+        self.confidential = getattr(obj, 'is_confidential', False)
+        opts = source.model._meta
+        self.url = reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[obj.pk])
+
+    def sort_key(self):
+        # Merged with reverse=True: date and id descending, rank ascending.
+        return (self.date, -self.rank, self.obj.pk)
+
+    @property
+    def cursor(self):
+        return CURSOR_SEPARATOR.join((self.date.isoformat(), str(self.rank), str(self.obj.pk)))
+
+
+def parse_cursor(value):
+    """Return (date, rank, id) from a cursor string, None for none, raising ValueError if invalid."""
+    if not value:
+        return None
+    day, rank, pk = value.split(CURSOR_SEPARATOR)
+    rank = int(rank)
+    if not 0 <= rank < len(SOURCES):
+        raise ValueError('Unknown timeline source.')
+    return datetime.date.fromisoformat(day), rank, int(pk)
+
+
+class TimelinePage:
+    """
+    A page of a patient's timeline, read lazily.
+
+    Iterating runs the source queries and yields up to page_size entries;
+    next_cursor is set afterwards when older entries remain.
+    """
+
+    def __init__(self, patient_id, cursor=None, kinds=None, page_size=PAGE_SIZE):
+        self.patient_id = patient_id
+        self.cursor = cursor
+        self.kinds = kinds
+        self.page_size = page_size
+        self.next_cursor = None
+
+    def _source_entries(self, rank, source):
+        for obj in source.queryset(self.patient_id, self.cursor, rank, self.page_size + 1):
+            yield Entry(source, rank, obj)
+
+    def __iter__(self):
+        streams = [
+            self._source_entries(rank, source)
+            for rank, source in enumerate(SOURCES)
+            if self.kinds is None or source.kind in self.kinds
+        ]
+        merged = heapq.merge(*streams, key=Entry.sort_key, reverse=True)
+        last = None
+        for count, entry in enumerate(merged):
+            if count == self.page_size:
+                self.next_cursor = last.cursor
+                return
+            last = entry
+            yield entry
@@ -0,0 +1,299 @@
+"""
+Bulk import and export of patients and appointments as CSV or NDJSON.
+
+Imports read the stream one chunk of rows at a time, validate each value
+with its model field (types, lengths and choices) and insert the valid
+rows with bulk_create, so memory stays bounded by the chunk size. Model
+save() and signals are bypassed: appointment end times and double-booking
+checks come from medical.scheduling, and new rows are added to the search
+index, the reporting rollups and the reminder schedule explicitly.
+
+Appointment rows refer to their patient by id, their doctor by license
+number and their service by id or name; exports use the same columns, so
+an exported file can be imported again.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+
+from .models import Appointment, Doctor, Patient, Service
+from .reminders import schedule_created_reminders
+from .reporting import record_appointments
+from .scheduling import book_available_appointments, describe_conflict
+from .search import SEARCH_FIELDS, get_search_backend
+
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+BATCH_SIZE = 2000
+# Row errors kept for the report; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+
+def read_rows(stream, format):
+    """Yield (line_number, row_dict) from a text stream; row_dict is None for unparseable lines."""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ImportResult:
+    """Counts, timing and the first errors of one import."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.seconds = 0
+
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+    @property
+    def rows_per_minute(self):
+        return (self.created + self.failed) * 60 / self.seconds if self.seconds else 0
+
+    def __str__(self):
+        return (
+            f'{self.created} created, {self.failed} rejected in {self.seconds:.1f}s '
+            f'({self.rows_per_minute:,.0f} rows/min)'
+        )
+
+
+class Importer:
+    """Validate rows with the model fields and insert them in chunks."""
+    model = None
+    fields = ()
+
+    def clean_row(self, row):
+        """Return a dict of cleaned field values, raising ValidationError per field."""
+        values = {}
+        errors = {}
+        for name in self.fields:
+            field = self.model._meta.get_field(name)
+            raw = row.get(name)
+            if raw is None or raw == '':
+                if field.has_default():
+                    values[field.attname] = field.get_default()
+                    continue
+                raw = '' if field.blank or not field.null else None
+            try:
+                values[field.attname] = field.clean(raw, None)
+            except ValidationError as error:
+                errors[name] = error.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def prepare(self, chunk):
+        """Hook to resolve references for a whole chunk before rows are built."""
+
+    def insert(self, instances, result):
+        """Insert instances and return those that were created."""
+        return self.model.objects.bulk_create(instances)
+
+    def run(self, stream, format, batch_size=BATCH_SIZE):
+        result = ImportResult()
+        backend = get_search_backend()
+        indexed = self.model in SEARCH_FIELDS
+        for chunk in chunked(read_rows(stream, format), batch_size):
+            self.prepare(chunk)
+            instances = []
+            for line_number, row in chunk:
+                if row is None:
+                    result.add_error(line_number, 'Not a valid JSON object.')
+                    continue
+                try:
+                    instance = self.model(**self.clean_row(row))
+                except ValidationError as error:
+                    result.add_error(line_number, '; '.join(
+                        f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+                    ))
+                    continue
+                instance._import_line = line_number
+                instances.append(instance)
+
+            with transaction.atomic():
+                last_pk = None
+                if indexed and not connection.features.can_return_rows_from_bulk_insert:
+                    # The backend returns no ids (MySQL); the new rows are the ones after the current last id.
+                    last_pk = self.model.objects.aggregate(last=Max('pk'))['last'] or 0
+                created = self.insert(instances, result)
+                if indexed and created:
+                    if created[0].pk is None and last_pk is not None:
+                        backend.index_many(self.model.objects.filter(pk__gt=last_pk).order_by('pk'))
+                    else:
+                        backend.index_many(created)
+            result.created += len(created)
+
+        result.seconds = time.perf_counter() - result.started
+        return result
+
+
+class PatientImporter(Importer):
+    """
+    Columns: first_name, last_name, phone, email, date_of_birth (YYYY-MM-DD),
+    gender (M/F/O), plus any optional patient field. An id column is ignored.
+    """
+    model = Patient
+    fields = (
+        'first_name', 'last_name', 'phone', 'email', 'date_of_birth', 'gender', 'blood_type',
+        'marital_status', 'address', 'emergency_contact_name', 'emergency_contact_phone',
+        'emergency_contact_relationship', 'medical_history', 'allergies', 'current_medications',
+        'insurance_provider', 'insurance_policy_number', 'is_active',
+    )
+
+
+class AppointmentImporter(Importer):
+    """
+    Columns: patient (id), doctor (license number), service (id or name),
+    appointment_date, appointment_time, reason_for_visit, plus optional
+    status, priority, notes and symptoms. Overlapping bookings are rejected.
+    """
+    model = Appointment
+    fields = (
+        'appointment_date', 'appointment_time', 'status', 'priority',
+        'notes', 'reason_for_visit', 'symptoms', 'cancelled_reason',
+    )
+
+    def __init__(self):
+        # Doctors and services are small tables, resolved once per import.
+        self.doctors = dict(Doctor.objects.values_list('license_number', 'pk'))
+        self.service_ids = set()
+        self.service_names = {}
+        for pk, name in Service.objects.values_list('pk', 'name'):
+            self.service_ids.add(pk)
+            self.service_names.setdefault(name, []).append(pk)
+        self.patient_ids = set()
+
+    def prepare(self, chunk):
+        ids = set()
+        for _, row in chunk:
+            if row and str(row.get('patient', '')).strip().isdigit():
+                ids.add(int(row['patient']))
+        self.patient_ids = set(Patient.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+    def resolve_service(self, value):
+        value = str(value or '').strip()
+        if value.isdigit() and int(value) in self.service_ids:
+            return int(value)
+        matches = self.service_names.get(value, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValidationError(f'Service name "{value}" is ambiguous; use its id.')
+        raise ValidationError(f'Unknown service "{value}".')
+
+    def clean_row(self, row):
+        try:
+            values, errors = super().clean_row(row), {}
+        except ValidationError as error:
+            values, errors = {}, error.message_dict
+        patient = str(row.get('patient', '')).strip()
+        if patient.isdigit() and int(patient) in self.patient_ids:
+            values['patient_id'] = int(patient)
+        else:
+            errors['patient'] = [f'Unknown patient "{patient}".']
+        doctor = str(row.get('doctor', '')).strip()
+        if doctor in self.doctors:
+            values['doctor_id'] = self.doctors[doctor]
+        else:
+            errors['doctor'] = [f'Unknown doctor license number "{doctor}".']
+        try:
+            values['service_id'] = self.resolve_service(row.get('service'))
+        except ValidationError as error:
+            errors['service'] = error.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def insert(self, instances, result):
+        created, conflicts = book_available_appointments(instances)
+        for appointment, other in conflicts:
+            result.add_error(appointment._import_line, describe_conflict(other))
+        record_appointments(created)
+        schedule_created_reminders(created)
+        return created
+
+
+IMPORTERS = {
+    'patients': PatientImporter,
+    'appointments': AppointmentImporter,
+}
+
+# (column, queryset lookup) pairs written by exports.
+EXPORT_COLUMNS = {
+    'patients': [('id', 'id'), *((name, name) for name in PatientImporter.fields)],
+    'appointments': [
+        ('id', 'id'),
+        ('patient', 'patient_id'),
+        ('doctor', 'doctor__license_number'),
+        ('service', 'service_id'),
+        *((name, name) for name in AppointmentImporter.fields),
+        ('end_time', 'end_time'),
+    ],
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, kind, format, chunk_size=BATCH_SIZE):
+    """Yield the export of queryset line by line, reading it chunk_size rows at a time."""
+    columns = EXPORT_COLUMNS[kind]
+    names = [column for column, _ in columns]
+    rows = queryset.order_by('pk').values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=chunk_size)
+    if format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow(['' if value is None else value for value in row])
+    else:
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def export_response(queryset, kind, format):
+    """Stream an export as a file download."""
+    response = StreamingHttpResponse(
+        export_rows(queryset, kind, format),
+        content_type=f'{CONTENT_TYPES[format]}; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{format}"'
+    return response
@@ -7,4 +7,7 @@ urlpatterns = [
     path('services/', views.services, name='services'),
     path('contact/', views.contact, name='contact'),
     path('appointments/', views.appointments, name='appointments'),
+    path('appointments/slots/', views.appointment_slots, name='appointment_slots'),
+    path('doctors/<int:doctor_id>/schedule.ics', views.doctor_schedule_ical, name='doctor_schedule_ical'),
+    path('doctors/<int:doctor_id>/schedule.json', views.doctor_schedule_json, name='doctor_schedule_json'),
 ]
\ No newline at end of file
@@ -3,12 +3,13 @@ Utility functions for the medical app.
 """
 
 import datetime
-from django.core.mail import send_mail
 from django.conf import settings
 
+from .outbox import queue_email
+
 
 def send_appointment_email(appointment, user_email):
-    """Send appointment confirmation email."""
+    """Queue appointment confirmation email for background delivery."""
     subject = f'Appointment Confirmation - {settings.SITE_NAME}'
     message = f'''
     Dear {appointment.patient_name},
@@ -26,7 +27,73 @@ def send_appointment_email(appointment, user_email):
     {settings.SITE_NAME}
     '''
     
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user_email])
+    return queue_email(subject, message, [user_email])
+
+
+def send_appointment_request_emails(appointment_request):
+    """Queue the clinic notification and the acknowledgement for a booking request."""
+    name = f'{appointment_request.first_name} {appointment_request.last_name}'
+    urgency = 'URGENT ' if appointment_request.is_emergency else ''
+    queue_email(
+        f'{urgency}Appointment request from {name}',
+        f'''
+    Name: {name}
+    Phone: {appointment_request.phone}
+    Email: {appointment_request.email}
+    Preferred: {appointment_request.preferred_date} at {appointment_request.preferred_time:%H:%M}
+    Service: {appointment_request.get_service_type_display()}
+    Doctor: {appointment_request.get_preferred_doctor_display()}
+    First visit: {'Yes' if appointment_request.is_first_visit else 'No'}
+    
+    Reason for visit:
+    {appointment_request.reason_for_visit}
+    ''',
+        [settings.CONTACT_EMAIL],
+    )
+    queue_email(
+        f'Appointment Request Received - {settings.SITE_NAME}',
+        f'''
+    Dear {name},
+    
+    We have received your request for an appointment on {appointment_request.preferred_date}
+    at {appointment_request.preferred_time:%H:%M}. Our team will contact you to confirm it.
+    
+    For urgent matters, call us at {settings.CONTACT_PHONE}.
+    
+    Best regards,
+    {settings.SITE_NAME}
+    ''',
+        [appointment_request.email],
+    )
+
+
+def send_contact_message_emails(contact_message):
+    """Queue the clinic notification and the acknowledgement for a contact message."""
+    queue_email(
+        f'{contact_message.subject} from {contact_message.name}',
+        f'''
+    Name: {contact_message.name}
+    Phone: {contact_message.phone or 'Not provided'}
+    Email: {contact_message.email}
+    
+    {contact_message.message}
+    ''',
+        [settings.CONTACT_EMAIL],
+    )
+    queue_email(
+        f'We received your message - {settings.SITE_NAME}',
+        f'''
+    Dear {contact_message.name},
+    
+    Thank you for contacting us. We will get back to you as soon as possible.
+    
+    For urgent matters, call us at {settings.CONTACT_PHONE}.
+    
+    Best regards,
+    {settings.SITE_NAME}
+    ''',
+        [contact_message.email],
+    )
 
 
 def format_phone_number(phone):
@@ -0,0 +1,231 @@
+"""
+Self-hosted copies of the third-party CSS, JavaScript and fonts in base.html.
+
+The vendor_assets command downloads pinned releases into
+STATICFILES_DIRS[0]/vendor/, so pages load them from the site's own origin
+(no extra DNS lookups or TLS handshakes) with the hashed names and
+precompressed copies collectstatic gives every static file:
+
+- Bootstrap CSS and JS bundle, checked against their published SRI hashes;
+- Font Awesome cut down to the icons the templates use: one stylesheet
+  with only those icon rules, and solid/brands fonts subset to their glyphs
+  (needs fontTools and brotli for WOFF2);
+- Inter from Google Fonts, keeping the latin and latin-ext files.
+
+Like the image derivatives, vendor/ is a build artifact and is not in git.
+Until it has been built, vendor_url() returns the public CDN URLs.
+"""
+
+import base64
+import functools
+import hashlib
+import io
+import re
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from .caching import CATEGORY_ICONS, DEFAULT_CATEGORY_ICON
+
+
+VENDOR_DIR = 'vendor'
+
+# name: (static path once vendored, CDN URL used until then)
+ASSETS = {
+    'bootstrap.css': (
+        'vendor/bootstrap/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    ),
+    'bootstrap.js': (
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    ),
+    'fontawesome.css': (
+        'vendor/fontawesome/css/fontawesome.css',
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+    ),
+    'inter.css': (
+        'vendor/inter/inter.css',
+        'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap',
+    ),
+}
+
+# Files copied as published: static path -> (URL, SRI hash from the vendor's docs).
+PINNED_FILES = {
+    'vendor/bootstrap/bootstrap.min.css': (
+        ASSETS['bootstrap.css'][1],
+        'sha384-9ndCyUaIbzAi2FUVXJi0CjmCapSmO7SnpJef0486qhLnuZ2cdeRhO02iuK6FUUVM',
+    ),
+    'vendor/bootstrap/bootstrap.bundle.min.js': (
+        ASSETS['bootstrap.js'][1],
+        'sha384-geWF76RCwLtnZ8qwWowPQNguL3RmwHVBC9FhGdlKrxdiJJigb/j/68SIy3Te4Bkz',
+    ),
+}
+
+FONTAWESOME_URL = 'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.4.0/'
+# Style stylesheet and font for each family the templates use (fas, fab).
+FONTAWESOME_STYLES = {
+    'solid': ('css/solid.min.css', 'webfonts/fa-solid-900.ttf', 'fa-solid-900.woff2'),
+    'brands': ('css/brands.min.css', 'webfonts/fa-brands-400.ttf', 'fa-brands-400.woff2'),
+}
+
+INTER_SUBSETS = ('latin', 'latin-ext')
+# Google Fonts picks the font format from the User-Agent; this one gets WOFF2.
+WOFF2_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+ICON_CLASS = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)')
+ICON_RULE = re.compile(r'^((?:\.fa-[a-z0-9-]+:(?:before|after),?)+)\{content:"\\([0-9a-f]+)"\}$')
+LICENSE_COMMENT = re.compile(r'/\*!.*?\*/', re.S)
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+SOURCE_MAP = re.compile(rb'\n?/[/*]# sourceMappingURL=[^\n]*')
+FONT_FACE = re.compile(r'/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{[^}]*\})')
+FONT_URL = re.compile(r'url\((https://[^)]+)\)')
+
+
+@functools.lru_cache(maxsize=None)
+def is_vendored(path):
+    return finders.find(path) is not None
+
+
+def vendor_url(name):
+    """Return the self-hosted URL of a vendor asset, or its CDN URL if it hasn't been built."""
+    path, cdn_url = ASSETS[name]
+    return static(path) if is_vendored(path) else cdn_url
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def check_integrity(data, integrity):
+    algorithm, expected = integrity.split('-', 1)
+    actual = base64.b64encode(hashlib.new(algorithm, data).digest()).decode()
+    return actual == expected
+
+
+def write_static(path, data):
+    target = Path(settings.STATICFILES_DIRS[0]) / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data if isinstance(data, bytes) else data.encode())
+    return len(data)
+
+
+def vendor_pinned_files():
+    """Download the pinned files, verify them and strip their source map comments; return sizes."""
+    sizes = {}
+    for path, (url, integrity) in PINNED_FILES.items():
+        data = fetch(url)
+        if not check_integrity(data, integrity):
+            raise ValueError(f'{url} does not match its pinned {integrity.split("-")[0]} hash.')
+        # The .map files aren't vendored, and collectstatic would fail on the reference.
+        sizes[path] = write_static(path, SOURCE_MAP.sub(b'', data))
+    return sizes
+
+
+def used_icons():
+    """Return the Font Awesome icon names in the project's templates and service categories."""
+    names = {*CATEGORY_ICONS.values(), DEFAULT_CATEGORY_ICON}
+    template_dirs = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', [])]
+    template_dirs.append(Path(__file__).resolve().parent / 'templates')
+    for directory in template_dirs:
+        if not directory.is_dir():
+            continue
+        for path in directory.rglob('*.html'):
+            names.update(ICON_CLASS.findall(path.read_text(encoding='utf-8')))
+    return names
+
+
+def css_rules(css):
+    """Split minified CSS into top-level rules; nested blocks such as @media stay whole."""
+    rules, depth, start = [], 0, 0
+    for index, char in enumerate(css):
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:index + 1].strip())
+                start = index + 1
+    return rules
+
+
+def filter_icon_rules(css, icons):
+    """Return (rules, codepoints): css without the rules of unused icons, and the used glyphs."""
+    kept, codepoints = [], set()
+    for rule in css_rules(COMMENT.sub('', css)):
+        match = ICON_RULE.match(rule)
+        if not match:
+            kept.append(rule)
+            continue
+        selectors = [
+            selector for selector in match[1].split(',')
+            if selector.split(':')[0][len('.fa-'):] in icons
+        ]
+        if selectors:
+            kept.append(f'{",".join(selectors)}{{content:"\\{match[2]}"}}')
+            codepoints.add(int(match[2], 16))
+    return kept, codepoints
+
+
+def subset_font(data, codepoints):
+    """Return a WOFF2 font holding only the glyphs for codepoints."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(data))
+    subsetter = subset.Subsetter(subset.Options())
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    font.flavor = 'woff2'
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def vendor_fontawesome():
+    """Build the Font Awesome subset stylesheet and fonts; return (sizes, icon count)."""
+    icons = used_icons()
+    core = fetch(FONTAWESOME_URL + 'css/fontawesome.min.css').decode()
+    license_comment = LICENSE_COMMENT.search(core)[0]
+    rules, solid_codepoints = filter_icon_rules(core, icons)
+
+    sizes = {}
+    for style, (css_name, font_name, output_name) in FONTAWESOME_STYLES.items():
+        style_rules, codepoints = filter_icon_rules(fetch(FONTAWESOME_URL + css_name).decode(), icons)
+        # Brand icons are defined in brands.css; everything else draws from the solid font.
+        codepoints = codepoints if style == 'brands' else solid_codepoints
+        if not codepoints:
+            continue
+        src = f'src:url(../webfonts/{output_name}) format("woff2")'
+        rules += [re.sub(r'src:[^;}]+', src, rule) if rule.startswith('@font-face') else rule for rule in style_rules]
+        path = f'{VENDOR_DIR}/fontawesome/webfonts/{output_name}'
+        sizes[path] = write_static(path, subset_font(fetch(FONTAWESOME_URL + font_name), codepoints))
+
+    path = ASSETS['fontawesome.css'][0]
+    sizes[path] = write_static(path, license_comment + '\n' + ''.join(rules) + '\n')
+    found = sum(1 for rule in rules if ICON_RULE.match(rule))
+    return sizes, found
+
+
+def vendor_inter():
+    """Self-host the Inter @font-face rules and WOFF2 files for INTER_SUBSETS; return sizes."""
+    css = fetch(ASSETS['inter.css'][1], {'User-Agent': WOFF2_USER_AGENT}).decode()
+    sizes, faces, files = {}, [], {}
+    for subset_name, face in FONT_FACE.findall(css):
+        if subset_name not in INTER_SUBSETS:
+            continue
+        for url in FONT_URL.findall(face):
+            if url not in files:
+                files[url] = f'inter-{subset_name}-{len(files) + 1}.woff2'
+                path = f'{VENDOR_DIR}/inter/{files[url]}'
+                sizes[path] = write_static(path, fetch(url))
+            face = face.replace(url, files[url])
+        faces.append(f'/* {subset_name} */\n{face}')
+    path = ASSETS['inter.css'][0]
+    sizes[path] = write_static(path, '\n'.join(faces) + '\n')
+    return sizes
@@ -1,6 +1,24 @@
-from django.shortcuts import render
-from django.http import JsonResponse
+import datetime
+from functools import wraps
 
+from django.contrib import messages
+from django.db import transaction
+from django.shortcuts import redirect, render, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.urls import reverse
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+
+from . import schedules
+from .caching import cache_page_response, get_services_listing
+from .forms import AppointmentRequestForm, ContactForm
+from .models import Doctor, Service
+from .ratelimit import client_ip, rate_limit
+from .scheduling import get_available_slots
+from .utils import send_appointment_request_emails, send_contact_message_emails
+
+@cache_page_response
 def home(request):
     """Home page view"""
     context = {
@@ -10,6 +28,7 @@ def home(request):
     }
     return render(request, 'home.html', context)
 
+@cache_page_response
 def about(request):
     """About page view"""
     context = {
@@ -23,49 +42,37 @@ def about(request):
     }
     return render(request, 'about.html', context)
 
+@cache_page_response
 def services(request):
     """Services page view"""
     context = {
         'title': 'Our Services',
-        'services': [
-            {
-                'title': 'General Consultations',
-                'description': 'Comprehensive medical consultations for all ages',
-                'icon': 'stethoscope'
-            },
-            {
-                'title': 'Preventive Care',
-                'description': 'Regular health checkups and screenings',
-                'icon': 'shield'
-            },
-            {
-                'title': 'Pediatric Care',
-                'description': 'Specialized healthcare for children',
-                'icon': 'baby'
-            },
-            {
-                'title': 'Emergency Care',
-                'description': '24/7 emergency medical services',
-                'icon': 'ambulance'
-            },
-            {
-                'title': 'Chronic Disease Management',
-                'description': 'Ongoing care for chronic conditions',
-                'icon': 'heart'
-            },
-            {
-                'title': 'Laboratory Services',
-                'description': 'Comprehensive diagnostic testing',
-                'icon': 'flask'
-            }
-        ]
+        'service_groups': get_services_listing(),
     }
     return render(request, 'services.html', context)
 
+@rate_limit('contact')
 def contact(request):
-    """Contact page view"""
-    context = {
+    """Contact page view; stores posted messages"""
+    if request.method == 'POST':
+        form = ContactForm(request.POST)
+        if request.rate_limited:
+            return _rate_limited(request, 'contact.html', _contact_context(form), request.rate_limited)
+        if form.is_valid():
+            with transaction.atomic():
+                message = form.save()
+                send_contact_message_emails(message)
+            messages.success(request, 'Thank you for your message. We will get back to you as soon as possible.')
+            return redirect(f"{reverse('contact')}#contactForm")
+    else:
+        form = ContactForm()
+    return render(request, 'contact.html', _contact_context(form))
+
+
+def _contact_context(form):
+    return {
         'title': 'Contact Us',
+        'form': form,
         'contact_info': {
             'phone': '+254708101604',
             'whatsapp': 'wa.me/+254708101604',
@@ -74,12 +81,155 @@ def contact(request):
             'hours': 'Monday - Friday: 8:00 AM - 6:00 PM\nSaturday: 9:00 AM - 4:00 PM\nSunday: Emergency Only'
         }
     }
-    return render(request, 'contact.html', context)
 
+@rate_limit('appointment_request')
 def appointments(request):
-    """Appointments page view"""
-    context = {
+    """Appointments page view; stores posted appointment requests"""
+    if request.method == 'POST':
+        form = AppointmentRequestForm(request.POST)
+        if request.rate_limited:
+            return _rate_limited(request, 'appointments.html', _appointments_context(form), request.rate_limited)
+        if form.is_valid():
+            with transaction.atomic():
+                appointment_request = form.save(commit=False)
+                appointment_request.client_ip = client_ip(request) or None
+                appointment_request.save()
+                send_appointment_request_emails(appointment_request)
+            messages.success(
+                request,
+                'Thank you for your appointment request! Our team will contact you to confirm your appointment.',
+            )
+            return redirect(f"{reverse('appointments')}#appointmentForm")
+    else:
+        form = AppointmentRequestForm()
+    return render(request, 'appointments.html', _appointments_context(form))
+
+
+def _appointments_context(form):
+    return {
         'title': 'Book Appointment',
         'appointment_text': 'Schedule your appointment with our healthcare professionals',
+        'form': form,
     }
-    return render(request, 'appointments.html', context)
+
+
+def _rate_limited(request, template, context, retry_after):
+    """Re-render a form page with a 429 status."""
+    context['rate_limited'] = True
+    response = render(request, template, context, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+@require_GET
+def appointment_slots(request):
+    """Return free appointment slots for a doctor on a given day as JSON"""
+    try:
+        day = datetime.date.fromisoformat(request.GET.get('date', ''))
+        doctor_id = int(request.GET.get('doctor', ''))
+        service_id = int(request.GET['service']) if request.GET.get('service') else None
+    except ValueError:
+        return JsonResponse({'error': 'doctor and date (YYYY-MM-DD) are required.'}, status=400)
+
+    doctor = get_object_or_404(Doctor, pk=doctor_id)
+    service = None
+    if service_id is not None:
+        service = get_object_or_404(Service, pk=service_id, is_available=True)
+
+    slots = get_available_slots(doctor, day, service)
+    return JsonResponse({
+        'doctor': doctor.pk,
+        'date': day.isoformat(),
+        'duration_minutes': service.duration_minutes if service else None,
+        'slots': [slot.strftime('%H:%M') for slot in slots],
+    })
+
+
+def schedule_view(view_func):
+    """
+    Serve a doctor's schedule to staff or feed-token holders, with conditional GET.
+
+    view_func(request, doctor, start, end) returns (etag_parts, render) and
+    render() builds the response; it is only called when the client's copy
+    is stale, so a 304 costs one aggregate query.
+    """
+    @wraps(view_func)
+    def wrapper(request, doctor_id):
+        if not (request.user.is_staff or schedules.check_feed_token(doctor_id, request.GET.get('token'))):
+            return JsonResponse({'error': 'Staff login or a valid feed token is required.'}, status=403)
+        try:
+            start, end = schedules.parse_window(request.GET)
+        except ValueError as error:
+            return JsonResponse({'error': f'start and end must be YYYY-MM-DD dates; {error}'}, status=400)
+        doctor = schedules.get_schedule_state(doctor_id, start, end)
+        if doctor is None:
+            raise Http404('No such doctor.')
+
+        etag_parts, render_response = view_func(request, doctor, start, end)
+        etag = schedules.schedule_etag(doctor, start, end, *etag_parts)
+        modified = int(schedules.last_modified(doctor).timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=modified)
+        if response is None:
+            response = render_response()
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(modified)
+        # Schedules name patients: shared caches must not keep them.
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+    return wrapper
+
+
+@require_GET
+@schedule_view
+def doctor_schedule_ical(request, doctor, start, end):
+    """iCalendar feed of a doctor's appointments"""
+    def render_response():
+        appointments = schedules.get_appointments(doctor.pk, start, end)
+        response = HttpResponse(
+            schedules.render_ical(doctor, appointments, request.get_host()),
+            content_type='text/calendar; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'inline; filename="doctor-{doctor.pk}.ics"'
+        return response
+
+    return [request.get_host()], render_response
+
+
+@require_GET
+@schedule_view
+def doctor_schedule_json(request, doctor, start, end):
+    """Paginated JSON list of a doctor's appointments"""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    def render_response():
+        # One row past the page tells whether there is a next page without a COUNT.
+        offset = (page - 1) * schedules.PAGE_SIZE
+        appointments = list(schedules.get_appointments(doctor.pk, start, end)[offset:offset + schedules.PAGE_SIZE + 1])
+        params = request.GET.copy()
+        links = {}
+        for name, number, exists in (
+            ('next', page + 1, len(appointments) > schedules.PAGE_SIZE),
+            ('previous', page - 1, page > 1),
+        ):
+            params['page'] = number
+            links[name] = request.build_absolute_uri(f'?{params.urlencode()}') if exists else None
+        return JsonResponse({
+            'doctor': {
+                'id': doctor.pk,
+                'name': doctor.doctor_name,
+                'specialization': doctor.specialization,
+            },
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'count': doctor.appointment_count,
+            'page': page,
+            'next': links['next'],
+            'previous': links['previous'],
+            'appointments': [schedules.appointment_data(appointment) for appointment in appointments[:schedules.PAGE_SIZE]],
+        })
+
+    return [page], render_response